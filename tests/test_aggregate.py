@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+  test_aggregate.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 17:20:44
+
+  Purpose: Tests for customer aggregation.
+"""
+
+import logging
+import random
+import time
+
+from array import array
+from unittest import TestCase, skipIf
+
+from uke_pit2.aggregate import CustomerAggregator, np
+
+
+# timings, shown by pytest for failed tests or with --log-cli-level=INFO
+logger = logging.getLogger(__name__)
+
+
+class TestCustomerAggregator(TestCase):
+    """CustomerAggregator class test unit."""
+
+    CUSTOMERS: int = 60000
+    ROUTERS: int = 2000
+    NODES: int = 300
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        rnd = random.Random(34)
+        self.rids = array(
+            "q", (rnd.randint(1, self.ROUTERS) for _ in range(self.CUSTOMERS))
+        )
+        self.ips = array(
+            "q", (rnd.randint(0x64400000, 0x647FFFFF) for _ in range(self.CUSTOMERS))
+        )
+        # every tenth router is not assigned, router 7 in two nodes
+        self.a_rids = array("q")
+        self.a_nids = array("q")
+        for rid in range(1, self.ROUTERS + 1):
+            if rid % 10:
+                self.a_rids.append(rid)
+                self.a_nids.append(rid % self.NODES + 1)
+            if rid == 7:
+                self.a_rids.append(rid)
+                self.a_nids.append(self.NODES + 1)
+
+    def __expected(self):
+        """Returns aggregates computed the straightforward way."""
+        out = {}
+        for rid, ip in zip(self.rids, self.ips):
+            if rid % 10 == 0:
+                continue
+            nids = [rid % self.NODES + 1]
+            if rid == 7:
+                nids.append(self.NODES + 1)
+            for nid in nids:
+                item = out.setdefault(nid, [set(), 0, ip, ip])
+                item[0].add(rid)
+                item[1] += 1
+                item[2] = min(item[2], ip)
+                item[3] = max(item[3], ip)
+        return [(k, len(v[0]), v[1], v[2], v[3]) for k, v in sorted(out.items())]
+
+    def __run(self, use_numpy: bool):
+        """Returns result and time of aggregation."""
+        obj = CustomerAggregator(use_numpy=use_numpy)
+        self.assertEqual(obj.numpy, use_numpy)
+        start: float = time.perf_counter()
+        out = obj.aggregate(self.rids, self.ips, self.a_rids, self.a_nids)
+        return out, time.perf_counter() - start
+
+    def test_01_python(self) -> None:
+        """Test nr 01."""
+        out, seconds = self.__run(False)
+        logger.info(
+            "pure Python aggregation of %d customers: %.1fms",
+            self.CUSTOMERS,
+            seconds * 1000,
+        )
+        self.assertEqual(out, self.__expected())
+
+    @skipIf(np is None, "NumPy is not installed")
+    def test_02_numpy(self) -> None:
+        """Test nr 02."""
+        out, seconds = self.__run(True)
+        logger.info(
+            "NumPy aggregation of %d customers: %.1fms", self.CUSTOMERS, seconds * 1000
+        )
+        self.assertEqual(out, self.__expected())
+
+    def test_03_empty(self) -> None:
+        """Test nr 03."""
+        for flag in (False, np is not None):
+            obj = CustomerAggregator(use_numpy=flag)
+            self.assertEqual(obj.aggregate([], [], [1], [1]), [])
+            self.assertEqual(obj.aggregate([5], [1], [1], [1]), [])
+
+    def test_04_multiple(self) -> None:
+        """Test nr 04."""
+        for flag in (False, np is not None):
+            obj = CustomerAggregator(use_numpy=flag)
+            # router 7 in nodes 1 and 2, router 8 twice in node 2
+            self.assertEqual(
+                obj.aggregate([7, 8, 7, 9], [3, 2, 1, 4], [7, 7, 8, 8], [1, 2, 2, 2]),
+                [(1, 1, 2, 1, 3), (2, 2, 4, 1, 3)],
+            )
+            # sparse record ids
+            big: int = 1 << 40
+            self.assertEqual(
+                obj.aggregate(
+                    [big + 7, big + 8, big + 7],
+                    [3, 2, 1],
+                    [big + 7, big + 7, big + 8],
+                    [1, 2, 2],
+                ),
+                [(1, 1, 2, 1, 3), (2, 2, 3, 1, 3)],
+            )
+
+
+# #[EOF]#######################################################################
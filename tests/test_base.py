@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+  test_base.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 19:48:30
+
+  Purpose: Tests for project base classes.
+"""
+
+import time
+
+from typing import Optional
+from unittest import TestCase
+
+from jsktoolbox.libs.base_data import BData
+from jsktoolbox.logstool.logs import LoggerClient
+from jsktoolbox.netaddresstool.ipv4 import Address
+
+from uke_pit2.base import BDebug, BFastData, BLogs, BVerbose
+
+
+class _Plain(BLogs, BDebug, BVerbose):
+    """BData based test class."""
+
+    @property
+    def host(self) -> Optional[Address]:
+        return self._get_data(key="__host__", set_default_type=Optional[Address])
+
+    @host.setter
+    def host(self, value: Optional[Address]) -> None:
+        self._set_data(key="__host__", value=value)
+
+
+class _Fast(_Plain, BFastData):
+    """BFastData based test class."""
+
+
+class TestBFastData(TestCase):
+    """BFastData class test unit."""
+
+    LOOPS: int = 20000
+
+    def test_01_api(self) -> None:
+        """Test nr 01."""
+        obj = _Fast()
+        self.assertFalse(obj.debug)
+        self.assertIsNone(obj.host)
+        obj.debug = True
+        obj.host = Address("10.0.0.1")
+        self.assertTrue(obj.debug)
+        self.assertEqual(obj.host, Address("10.0.0.1"))
+        obj.host = None
+        self.assertIsNone(obj.host)
+        with self.assertRaises(TypeError):
+            obj.host = "10.0.0.1"  # type: ignore
+        with self.assertRaises(TypeError):
+            obj.verbose = 1  # type: ignore
+        with self.assertRaises(AttributeError):
+            obj.other = 1  # type: ignore
+        obj._data = {"__host__": Address("10.0.0.2")}
+        self.assertEqual(obj.host, Address("10.0.0.2"))
+        self.assertNotIsInstance(_Plain(), BFastData)
+        self.assertIsInstance(obj, BData)
+
+    def __run(self, obj: _Plain) -> float:
+        """Returns time of property access loop."""
+        obj.logs = LoggerClient()
+        obj.debug = False
+        obj.host = Address("10.0.0.1")
+        start: float = time.perf_counter()
+        for _ in range(self.LOOPS):
+            obj.debug
+            obj.verbose
+            obj.host
+            obj.logs
+            obj.debug = True
+        return time.perf_counter() - start
+
+    def test_02_benchmark(self) -> None:
+        """Test nr 02."""
+        plain: float = self.__run(_Plain())
+        fast: float = self.__run(_Fast())
+        self.assertLess(
+            fast,
+            plain,
+            f"property access x{self.LOOPS * 5}: BData {plain * 1000:.1f} ms, "
+            f"BFastData {fast * 1000:.1f} ms",
+        )
+
+
+# #[EOF]#######################################################################
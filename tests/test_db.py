@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+  test_db.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 20.10.2026, 08:41:26
+
+  Purpose: Tests for SQLite database backend.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from queue import Queue
+from typing import Type
+from unittest import TestCase
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from jsktoolbox.netaddresstool.ipv4 import Address
+
+from uke_pit2.db import Database, DbBackends, DbConfig
+from uke_pit2.db_models.spider import TConnection, TCustomer, TRouter
+from uke_pit2.logs import LogsQueue
+from uke_pit2.processor import DbProcessor
+from uke_pit2.rb import CustomerColumns, RBData, RouterColumns
+
+
+# timings, shown by pytest for failed tests or with --log-cli-level=INFO
+logger = logging.getLogger(__name__)
+
+
+class _SingleProcessor(DbProcessor):
+    """DbProcessor committing every router separately."""
+
+    BATCH: int = 1
+
+
+class TestSQLite(TestCase):
+    """SQLite backend test unit."""
+
+    ROUTERS: int = 200
+    CUSTOMERS: int = 20
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Clean up."""
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def __data(self, nr: int) -> RBData:
+        """Returns router data with one link and CUSTOMERS customers."""
+        routers = RouterColumns()
+        routers.add(
+            0x0A010000 + nr + 1,
+            0x0A000002 + nr * 4,
+            "ether1",
+            10 + nr,
+            (0x0A000000 + nr * 4, 30),
+        )
+        customers = CustomerColumns()
+        for idx in range(self.CUSTOMERS):
+            customers.add(f"c{nr}-{idx}", 0x64400000 + nr * 100 + idx)
+        out = RBData(routers, customers)
+        out.router_id = Address(0x0A010000 + nr)
+        return out
+
+    def __run(self, proc_class: Type[DbProcessor], path: str) -> float:
+        """Returns time of writing ROUTERS items with DbProcessor."""
+        queue: Queue = Queue()
+        for nr in range(self.ROUTERS):
+            queue.put(self.__data(nr))
+        proc: DbProcessor = proc_class(LogsQueue(), queue)
+        proc.db_backend = DbBackends.SQLITE
+        proc.db_database = path
+        start: float = time.perf_counter()
+        proc.start()
+        proc.stop()
+        proc.join()
+        return time.perf_counter() - start
+
+    def test_01_database(self) -> None:
+        """Test nr 01."""
+        conf = DbConfig()
+        conf.backend = DbBackends.SQLITE
+        conf.database = DbBackends.MEMORY
+        database = Database(LogsQueue(), conf)
+        self.assertEqual(str(database.url), "sqlite+pysqlite:///:memory:")
+        self.assertTrue(database.create_connection())
+        session = database.session
+        self.assertIsNotNone(session)
+        session.execute(text("SELECT count(*) FROM uke_pit_routers"))  # type: ignore
+        session.close()  # type: ignore
+        with self.assertRaises(ValueError):
+            conf.backend = "oracle"
+
+    def test_02_processor(self) -> None:
+        """Test nr 02."""
+        single: float = self.__run(
+            _SingleProcessor, os.path.join(self.tmp, "single.db")
+        )
+        path: str = os.path.join(self.tmp, "batched.db")
+        batched: float = self.__run(DbProcessor, path)
+        logger.info(
+            "sqlite write %d routers: commit per router %.0f routers/s, "
+            "batched %.0f routers/s",
+            self.ROUTERS,
+            self.ROUTERS / single,
+            self.ROUTERS / batched,
+        )
+
+        engine = create_engine(f"sqlite:///{path}")
+        with Session(engine) as session:
+            self.assertEqual(
+                session.execute(text("PRAGMA journal_mode")).scalar(), "wal"
+            )
+            self.assertEqual(
+                session.scalar(select(func.count()).select_from(TRouter)),
+                self.ROUTERS,
+            )
+            self.assertEqual(
+                session.scalar(select(func.count()).select_from(TConnection)),
+                self.ROUTERS,
+            )
+            self.assertEqual(
+                session.scalar(select(func.count()).select_from(TCustomer)),
+                self.ROUTERS * self.CUSTOMERS,
+            )
+        engine.dispose()
+
+
+# #[EOF]#######################################################################
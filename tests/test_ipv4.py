@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+  test_ipv4.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 19:05:13
+
+  Purpose: Tests for integer IPv4 helpers.
+"""
+
+import random
+import time
+
+from unittest import TestCase
+
+from jsktoolbox.netaddresstool.ipv4 import Address, Network
+
+from uke_pit2.ipv4 import (
+    broadcast,
+    in_network,
+    int_to_str,
+    str_to_int,
+    str_to_network,
+)
+
+
+class TestIPv4(TestCase):
+    """ipv4 module test unit."""
+
+    COUNT: int = 5000
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        rnd = random.Random(36)
+        self.ints = [rnd.randint(0, 0xFFFFFFFF) for _ in range(self.COUNT)]
+        self.strs = [str(Address(ip)) for ip in self.ints]
+        self.nets = [f"{ip}/{rnd.randint(8, 32)}" for ip in self.strs[:500]]
+
+    def test_01_compatibility(self) -> None:
+        """Test nr 01."""
+        for ip, text in zip(self.ints, self.strs):
+            self.assertEqual(str_to_int(text), ip)
+            self.assertEqual(int_to_str(ip), text)
+        for text in self.nets:
+            net = Network(text)
+            network, prefix = str_to_network(text)
+            self.assertEqual(network, int(net.network))
+            self.assertEqual(broadcast(network, prefix), int(net.broadcast))
+            self.assertTrue(in_network(int(net.broadcast), network, prefix))
+        self.assertEqual(str_to_network("10.0.0.1"), (0x0A000001, 32))
+        self.assertFalse(in_network(0x0A000004, *str_to_network("10.0.0.1/30")))
+        for text in ("10.1", "1.2.3.256", "a.b.c.d", "1.2.3.-1", ""):
+            with self.assertRaises(ValueError):
+                str_to_int(text)
+        with self.assertRaises(ValueError):
+            str_to_network("10.0.0.1/33")
+
+    def test_02_benchmark(self) -> None:
+        """Test nr 02."""
+        start: float = time.perf_counter()
+        for text in self.strs:
+            int(Address(text))
+        for ip in self.ints:
+            str(Address(ip))
+        for text in self.nets:
+            net = Network(text)
+            int(net.network) <= self.ints[0] <= int(net.broadcast)
+        objects: float = time.perf_counter() - start
+
+        str_to_int.cache_clear()
+        str_to_network.cache_clear()
+        start = time.perf_counter()
+        for text in self.strs:
+            str_to_int(text)
+        for ip in self.ints:
+            int_to_str(ip)
+        for text in self.nets:
+            in_network(self.ints[0], *str_to_network(text))
+        helpers: float = time.perf_counter() - start
+
+        self.assertLess(
+            helpers,
+            objects,
+            f"IPv4 conversions: Address/Network {objects * 1000:.1f} ms, "
+            f"int helpers {helpers * 1000:.1f} ms",
+        )
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+  test_logs.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 21:02:44
+
+  Purpose: Tests for logging pipeline.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from unittest import TestCase
+
+from jsktoolbox.logstool.engines import LoggerEngineFile
+from jsktoolbox.logstool.formatters import LogFormatterDateTime
+from jsktoolbox.logstool.logs import (
+    LoggerClient,
+    LoggerEngine,
+    LogsLevelKeys,
+    ThLoggerProcessor,
+)
+
+from uke_pit2.logs import (
+    LEVELS,
+    LoggerEngineBufferedFile,
+    LogsClient,
+    LogsEngine,
+    LogsQueue,
+    ThLogsProcessor,
+)
+
+
+class _Counter(object):
+    """Counts string conversions."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __str__(self) -> str:
+        self.count += 1
+        return "counter"
+
+
+class TestLogs(TestCase):
+    """Logging pipeline test unit."""
+
+    THREADS: int = 8
+    MESSAGES: int = 2000
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Clean up."""
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_01_levels(self) -> None:
+        """Test nr 01."""
+        queue = LogsQueue(LEVELS - {LogsLevelKeys.DEBUG})
+        client = LogsClient(queue, "test")
+        counter = _Counter()
+        client.debug("value: %s", counter)
+        client.message_debug = "dropped"
+        self.assertEqual(counter.count, 0)
+        self.assertEqual(queue.size, 0)
+        client.info("value: %s", counter)
+        client.message_notice = "kept"
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(
+            queue.get_batch(),
+            [
+                (LogsLevelKeys.INFO, "[test] value: counter"),
+                (LogsLevelKeys.NOTICE, "[test] kept"),
+            ],
+        )
+        self.assertIsNone(queue.get())
+        with self.assertRaises(KeyError):
+            queue.put("message", "TRACE")
+
+    def __run(self, engine: LoggerEngine, client: LoggerClient, th) -> float:
+        """Returns time of logging THREADS * MESSAGES messages to file."""
+        th.sleep_period = 0.2
+        th.logger_engine = engine
+        th.logger_client = client
+        th.start()
+
+        def producer(idx: int) -> None:
+            for nr in range(self.MESSAGES):
+                client.message_info = f"worker {idx} message {nr}"
+
+        start: float = time.perf_counter()
+        workers = [
+            threading.Thread(target=producer, args=(idx,))
+            for idx in range(self.THREADS)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        th.stop()
+        th.join()
+        return time.perf_counter() - start
+
+    def __lines(self, name: str) -> int:
+        """Returns number of lines in log file."""
+        with open(os.path.join(self.tmp, name), encoding="utf-8") as file:
+            return len(file.readlines())
+
+    def test_02_benchmark(self) -> None:
+        """Test nr 02."""
+        total: int = self.THREADS * self.MESSAGES
+
+        engine = LoggerEngine()
+        file_engine = LoggerEngineFile(formatter=LogFormatterDateTime())
+        file_engine.logdir = self.tmp
+        file_engine.logfile = "stock.log"
+        engine.add_engine(LogsLevelKeys.INFO, file_engine)
+        stock: float = self.__run(
+            engine, LoggerClient(engine.logs_queue, "test"), ThLoggerProcessor()
+        )
+
+        engine = LogsEngine()
+        file_engine = LoggerEngineBufferedFile(formatter=LogFormatterDateTime())
+        file_engine.logdir = self.tmp
+        file_engine.logfile = "buffered.log"
+        engine.add_engine(LogsLevelKeys.INFO, file_engine)
+        buffered: float = self.__run(
+            engine, LogsClient(engine.logs_queue, "test"), ThLogsProcessor()
+        )
+
+        self.assertEqual(self.__lines("stock.log"), total)
+        self.assertEqual(self.__lines("buffered.log"), total)
+        self.assertLess(
+            buffered,
+            stock,
+            f"logging {self.THREADS} threads: "
+            f"stock {total / stock:.0f} msg/s, buffered {total / buffered:.0f} msg/s",
+        )
+
+
+# #[EOF]#######################################################################
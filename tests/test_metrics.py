@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+  test_metrics.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 22:05:31
+
+  Purpose: Tests for crawl metrics.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from unittest import TestCase
+
+from uke_pit2.base import BMetrics
+from uke_pit2.metrics import CrawlMetrics, Histogram
+
+
+class _Job(BMetrics):
+    """BMetrics based test class."""
+
+
+class TestMetrics(TestCase):
+    """CrawlMetrics class test unit."""
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Clean up."""
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_01_histogram(self) -> None:
+        """Test nr 01."""
+        item = Histogram()
+        self.assertEqual(item.quantile(0.5), 0.0)
+        for value in (0.002, 0.003, 0.2, 0.4, 100.0):
+            item.observe(value)
+        self.assertEqual(item.count, 5)
+        self.assertEqual(item.min, 0.002)
+        self.assertEqual(item.max, 100.0)
+        self.assertEqual(item.quantile(0.4), 0.005)
+        self.assertEqual(item.quantile(0.6), 0.25)
+        self.assertEqual(item.quantile(1.0), 100.0)
+        self.assertEqual(item.counts[-1], 1)
+
+    def test_02_metrics(self) -> None:
+        """Test nr 02."""
+        metrics = CrawlMetrics()
+
+        def worker() -> None:
+            for _ in range(100):
+                metrics.observe("fetch", 0.01, "/ip/address/")
+                metrics.count("collected")
+
+        workers = [threading.Thread(target=worker) for _ in range(4)]
+        for th in workers:
+            th.start()
+        for th in workers:
+            th.join()
+
+        job = _Job()
+        with job._timer("icmp"):
+            pass
+        job._count("icmp_failed")
+        job.metrics = metrics
+        with job._timer("connect", "password 1"):
+            pass
+        job._count("icmp_failed")
+
+        self.assertEqual(metrics.counters, {"collected": 400, "icmp_failed": 1})
+        self.assertEqual(
+            list(metrics.histograms),
+            [("connect", "password 1"), ("fetch", "/ip/address/")],
+        )
+        self.assertEqual(metrics.histograms[("fetch", "/ip/address/")].count, 400)
+        self.assertTrue(
+            any(
+                line.startswith("* fetch /ip/address/: n=400")
+                for line in metrics.summary()
+            )
+        )
+
+        path: str = os.path.join(self.tmp, "metrics.json")
+        metrics.write_json(path)
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data["counters"]["collected"], 400)
+        self.assertEqual(data["phases"][1]["buckets"]["0.01"], 400)
+
+        path = os.path.join(self.tmp, "metrics.prom")
+        metrics.write_prometheus(path)
+        with open(path, encoding="utf-8") as file:
+            text: str = file.read()
+        self.assertIn(
+            'uke_pit_spider_phase_seconds_bucket{phase="fetch",'
+            'detail="/ip/address/",le="+Inf"} 400',
+            text,
+        )
+        self.assertIn("uke_pit_spider_collected 400", text)
+        self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+
+# #[EOF]#######################################################################
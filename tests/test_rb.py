@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+  test_rb.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 18:12:36
+
+  Purpose: Tests for router board data container.
+"""
+
+import tracemalloc
+
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from jsktoolbox.netaddresstool.ipv4 import Address, Network
+
+from uke_pit2.rb import RBData
+
+
+class TestRBData(TestCase):
+    """RBData class test unit."""
+
+    ROUTERS: int = 1000
+    CUSTOMERS: int = 10000
+
+    def __routers(self) -> List[Dict[str, Any]]:
+        """Returns routers records in collector format."""
+        out: List[Dict[str, Any]] = []
+        for idx in range(self.ROUTERS):
+            address = Address(0x0A000000 + idx * 4 + 2)
+            out.append(
+                {
+                    "router-id": Address(0x0A010000 + idx),
+                    "address": address,
+                    "interface": f"vlan{idx % 8}",
+                    "vlan-id": idx % 8 or None,
+                    "network": Network(f"{Address(int(address) - 1)}/30"),
+                }
+            )
+        out.append({"router-id": Address("10.255.0.1")})
+        return out
+
+    def __customers(self) -> List[Dict[str, str]]:
+        """Returns customers records in collector format."""
+        return [
+            {
+                "name": f"48:8F:5A:{idx >> 16 & 0xFF:02X}:{idx >> 8 & 0xFF:02X}:{idx & 0xFF:02X}",
+                "address": str(Address(0x0A1E0000 + idx)),
+            }
+            for idx in range(self.CUSTOMERS)
+        ]
+
+    def test_01_compatibility(self) -> None:
+        """Test nr 01."""
+        routers = self.__routers()
+        customers = self.__customers()
+        rb = RBData()
+        for item in routers:
+            rb.routers.append(item)
+        for item in customers:
+            rb.customers.append(item)
+        self.assertEqual(len(rb.routers), len(routers))
+        self.assertEqual(len(rb.customers), len(customers))
+        self.assertEqual(list(rb.customers), customers)
+        for item, expected in zip(rb.routers, routers):
+            self.assertEqual(item.keys(), expected.keys())
+            for key in expected:
+                self.assertEqual(str(item[key]), str(expected[key]))
+        self.assertEqual(rb.routers[0]["network"].network, Address("10.0.0.0"))
+        self.assertFalse(RBData().routers)
+
+    def test_02_memory(self) -> None:
+        """Test nr 02."""
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        old_routers = [dict(item) for item in self.__routers()]
+        old_customers = self.__customers()
+        dicts: int = tracemalloc.get_traced_memory()[0] - base
+        del old_routers, old_customers
+
+        base = tracemalloc.get_traced_memory()[0]
+        rb = RBData()
+        for item in self.__routers():
+            rb.routers.append(item)
+        for item in self.__customers():
+            rb.customers.append(item)
+        compact: int = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+        self.assertLess(
+            compact,
+            dicts / 2,
+            f"RBData memory: dicts {dicts / 1024:.0f} KiB, "
+            f"columns {compact / 1024:.0f} KiB",
+        )
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+  test_report.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 15:31:07
+
+  Purpose: Tests for report generator.
+"""
+
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from typing import Optional
+from unittest import TestCase
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from jsktoolbox.logstool.logs import LoggerQueue
+
+from uke_pit2.base import LmsBase, LmsExtBase
+from uke_pit2.db import Database, DbConfig
+from uke_pit2.db_models.lms import TLmsDivision, TNetNode
+from uke_pit2.db_models.spider import (
+    TConnection,
+    TCustomer,
+    TDivisions,
+    TInterface,
+    TInterfaceName,
+    TNodeAssignment,
+    TRouter,
+)
+from uke_pit2.report import Report
+
+
+# timings, shown by pytest for failed tests or with --log-cli-level=INFO
+logger = logging.getLogger(__name__)
+
+
+class TestReport(TestCase):
+    """Report class test unit."""
+
+    ROUTERS: int = 300
+    CUSTOMERS: int = 20
+    NODES: int = 20
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        self.tmp = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp, 'lms.db')}")
+        LmsBase.metadata.create_all(self.engine)
+        LmsExtBase.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add(TLmsDivision(id=1, shortname="ISP", name="ISP", ten="0"))
+            session.add(TDivisions(did=1, ident="ISP", main=True))
+            for nid in range(1, self.NODES + 1):
+                session.add(TNetNode(id=nid, name=f"node{nid}", divisionid=1))
+            ifname = TInterfaceName(name="ether1")
+            session.add(ifname)
+            session.flush()
+            for rid in range(1, self.ROUTERS + 1):
+                session.add(TRouter(id=rid, router_id=0x0A000000 + rid, last_update=1))
+                session.add(TNodeAssignment(nid=rid % self.NODES + 1, rid=rid))
+                conn = TConnection(
+                    rid=rid, vlan_id=1, network=0xAC100000 + rid // 2 * 4, last_update=1
+                )
+                session.add(conn)
+                session.flush()
+                session.add(TInterface(cid=conn.id, if_id=ifname.id, last_update=1))
+                for idx in range(self.CUSTOMERS):
+                    session.add(
+                        TCustomer(
+                            rid=rid,
+                            name=f"c{rid}-{idx}",
+                            ip=0x64400000 + rid * 32 + idx,
+                            last_update=1,
+                        )
+                    )
+            session.commit()
+        self.database = Database(LoggerQueue(), DbConfig())
+        self.database._set_data("__pool__", value=self.engine)
+
+    def tearDown(self) -> None:
+        """Clean up."""
+        self.engine.dispose()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def __generate(
+        self, workers: int, name: Optional[str] = None, incremental: bool = False
+    ) -> float:
+        """Generates report and returns wall-clock time."""
+        report = Report(
+            LoggerQueue(),
+            self.database,
+            os.path.join(self.tmp, name or f"out{workers}"),
+            workers=workers,
+            incremental=incremental,
+        )
+        start: float = time.perf_counter()
+        self.assertTrue(report.generate())
+        return time.perf_counter() - start
+
+    def __compare(self, first: str, second: str) -> None:
+        """Compares report files of two output dirs."""
+        names = sorted(
+            name
+            for name in os.listdir(os.path.join(self.tmp, first))
+            if name.endswith(".csv")
+        )
+        _, mismatch, errors = filecmp.cmpfiles(
+            os.path.join(self.tmp, first),
+            os.path.join(self.tmp, second),
+            names,
+            shallow=False,
+        )
+        self.assertEqual(mismatch, [])
+        self.assertEqual(errors, [])
+
+    def test_01_sections(self) -> None:
+        """Test nr 01."""
+        # router 1 is assigned to two nodes
+        with Session(self.engine) as session:
+            session.add(TNodeAssignment(nid=5, rid=1))
+            session.commit()
+        self.__generate(1)
+        out: str = os.path.join(self.tmp, "out1")
+        with open(os.path.join(out, "customers.csv"), encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[0], "node_id,router_id,name,ip")
+        self.assertEqual(len(lines), (self.ROUTERS + 1) * self.CUSTOMERS + 1)
+        # node totals agree with the customers detail rows
+        with open(os.path.join(out, "node_customers.csv"), encoding="utf-8") as file:
+            totals = [line.split(",") for line in file.read().splitlines()[1:]]
+        self.assertEqual(sum(int(row[2]) for row in totals), len(lines) - 1)
+        self.assertEqual(
+            {row[0]: int(row[1]) for row in totals}["5"],
+            self.ROUTERS // self.NODES + 1,
+        )
+        with open(os.path.join(out, "nodes.csv"), encoding="utf-8") as file:
+            self.assertEqual(len(file.read().splitlines()), self.NODES + 1)
+        self.assertFalse([name for name in os.listdir(out) if ".part" in name])
+
+    def test_02_parallel(self) -> None:
+        """Test nr 02."""
+        sequential: float = self.__generate(1)
+        parallel: float = self.__generate(4)
+        logger.info(
+            "report wall-clock: sequential %.3fs, 4 workers %.3fs",
+            sequential,
+            parallel,
+        )
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.tmp, "out1"))),
+            sorted(os.listdir(os.path.join(self.tmp, "out4"))),
+        )
+        self.__compare("out1", "out4")
+
+    def test_03_incremental(self) -> None:
+        """Test nr 03."""
+        full: float = self.__generate(2, "inc", True)
+        reused: float = self.__generate(2, "inc", True)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "inc", "manifest.json")))
+        # move one router to another node
+        with Session(self.engine) as session:
+            session.execute(
+                update(TNodeAssignment).where(TNodeAssignment.rid == 5).values(nid=1)
+            )
+            session.commit()
+        changed: float = self.__generate(2, "inc", True)
+        logger.info(
+            "incremental report: full %.3fs, unchanged %.3fs, one router moved %.3fs",
+            full,
+            reused,
+            changed,
+        )
+        self.__generate(1)
+        self.__compare("out1", "inc")
+
+
+# #[EOF]#######################################################################
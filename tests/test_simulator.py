@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+  test_simulator.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 23:12:09
+
+  Purpose: Tests for RouterOS API simulator and crawl benchmark.
+"""
+
+import gc
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from queue import Queue
+from typing import Dict, List, Optional
+from unittest import TestCase
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from jsktoolbox.devices.mikrotik.routerboard import RouterBoard
+from jsktoolbox.devices.network.connectors import API
+from jsktoolbox.netaddresstool.ipv4 import Address
+
+from uke_pit2.checkpoint import CrawlCheckpoint, CrawlState
+from uke_pit2.db import DbBackends
+from uke_pit2.db_models.spider import TRouterVersion
+from uke_pit2.frontier import FrontierOrder, RouterHistory, create_frontier
+from uke_pit2.logs import LogsQueue
+from uke_pit2.metrics import CrawlMetrics
+from uke_pit2.network import Deadline, PipelinedAPI, RouterTimeouts
+from uke_pit2.processor import Crawler, DbProcessor, Processor
+from uke_pit2.rb import (
+    CollectorCache,
+    CollectorRegistry,
+    RouterBoardCollector7,
+    release_elements,
+)
+from uke_pit2.simulator import RouterOSSimulator, Topology
+
+
+# timings, shown by pytest for failed tests or with --log-cli-level=INFO
+logger = logging.getLogger(__name__)
+
+
+class _QuickStopCrawler(Crawler):
+    """Crawler with short shutdown deadline."""
+
+    STOP_TIMEOUT: float = 0.3
+
+
+class _CountingAPI(PipelinedAPI):
+    """PipelinedAPI counting socket factory calls made by API."""
+
+    sockets: int = 0
+
+    def _API__get_socket(self) -> bool:
+        _CountingAPI.sockets += 1
+        return PipelinedAPI._API__get_socket(self)
+
+
+class TestSimulator(TestCase):
+    """RouterOSSimulator class test unit."""
+
+    ROUTERS: int = 60
+    WORKERS: int = 8
+
+    def test_01_protocol(self) -> None:
+        """Test nr 01."""
+        topology = Topology(routers=5, extra_links=2, vlan_depth=2, ppp_sessions=3)
+        self.assertEqual(len(topology.routers), 5)
+        self.assertEqual(topology.customers, 15)
+        with RouterOSSimulator(topology, password="secret") as sim:
+            conn = API(
+                ip_address=topology.start_ip,
+                port=sim.port,
+                login="admin",
+                password="wrong",
+            )
+            self.assertFalse(conn.connect())
+            conn.disconnect()
+
+            conn = API(
+                ip_address=topology.start_ip,
+                port=sim.port,
+                login="admin",
+                password="secret",
+            )
+            self.assertTrue(conn.connect())
+            self.assertTrue(conn.execute("/ip/address/print"))
+            out, _ = conn.outputs()
+            self.assertEqual(out[0][0]["address"], "127.1.0.1/32")
+            self.assertFalse(conn.execute("/no/such/print"))
+            conn.disconnect()
+
+            self.assertTrue(sim.pinger.is_alive(topology.start_ip))
+            self.assertFalse(sim.pinger.is_alive(Address("127.2.0.1")))
+
+    def __crawl(
+        self,
+        sim: RouterOSSimulator,
+        metrics: CrawlMetrics,
+        bootstrap: bool = False,
+        versions: Optional[CollectorCache] = None,
+        comms_queue: Optional[Queue] = None,
+    ) -> Queue:
+        """Returns queue with collected data."""
+        queue = LogsQueue()
+        processor = Processor(
+            queue,
+            ["other", "secret"],
+            metrics=metrics,
+            port=sim.port,
+            pinger=sim.pinger,
+            versions=versions,
+        )
+        if comms_queue is None:
+            comms_queue = Queue()
+        start: float = time.perf_counter()
+        count: int = Crawler(queue, processor, comms_queue, self.WORKERS).run(
+            sim.topology.start_ip, bootstrap=bootstrap
+        )
+        metrics.observe("crawl", time.perf_counter() - start)
+        metrics.count("processed", count)
+        return comms_queue
+
+    def test_02_benchmark(self) -> None:
+        """Test nr 02."""
+        topology = Topology(
+            routers=self.ROUTERS,
+            extra_links=self.ROUTERS // 2,
+            vlan_depth=2,
+            concentrators=4,
+            ppp_sessions=500,
+        )
+        metrics = CrawlMetrics()
+        with RouterOSSimulator(topology, password="secret", latency=0.002) as sim:
+            comms_queue: Queue = self.__crawl(sim, metrics)
+        crawl: float = metrics.histograms[("crawl", "")].total
+        logger.info(
+            "crawl %d routers, %d workers: %.1f routers/s",
+            self.ROUTERS,
+            self.WORKERS,
+            self.ROUTERS / crawl,
+        )
+        self.assertEqual(comms_queue.qsize(), self.ROUTERS)
+        customers: int = 0
+        while not comms_queue.empty():
+            customers += len(comms_queue.get().customers)
+        self.assertEqual(customers, topology.customers)
+
+    def test_03_failures(self) -> None:
+        """Test nr 03."""
+        topology = Topology(routers=30, extra_links=15, ppp_sessions=10)
+        metrics = CrawlMetrics()
+        with RouterOSSimulator(
+            topology, password="secret", failure_rate=0.02, down_rate=0.2, seed=3
+        ) as sim:
+            comms_queue: Queue = self.__crawl(sim, metrics)
+        counters = metrics.counters
+        self.assertLess(comms_queue.qsize(), 30)
+        self.assertEqual(counters.get("collected", 0), comms_queue.qsize())
+        self.assertGreater(counters.get("icmp_failed", 0), 0)
+
+    def test_04_bootstrap(self) -> None:
+        """Test nr 04."""
+        topology = Topology(
+            routers=self.ROUTERS, extra_links=10, ppp_sessions=10, area_ratio=0.75
+        )
+        crawls: List[float] = []
+        for bootstrap in (False, True):
+            metrics = CrawlMetrics()
+            with RouterOSSimulator(topology, password="secret", latency=0.002) as sim:
+                comms_queue: Queue = self.__crawl(sim, metrics, bootstrap)
+            self.assertEqual(comms_queue.qsize(), self.ROUTERS)
+            crawls.append(metrics.histograms[("crawl", "")].total)
+        self.assertEqual(metrics.counters["bootstrap_routers"], 45)
+        logger.info(
+            "crawl %d routers, %d workers: neighbors walk %.1f routers/s, "
+            "LSDB bootstrap %.1f routers/s",
+            self.ROUTERS,
+            self.WORKERS,
+            self.ROUTERS / crawls[0],
+            self.ROUTERS / crawls[1],
+        )
+
+    def test_05_pipeline(self) -> None:
+        """Test nr 05."""
+        topology = Topology(routers=3, ppp_sessions=3)
+        commands: List[str] = [
+            "/ip/address/print",
+            "/no/such/print",
+            "/ppp/active/print",
+        ]
+        with RouterOSSimulator(topology, password="secret", latency=0.1) as sim:
+            conn = PipelinedAPI(
+                ip_address=topology.start_ip,
+                port=sim.port,
+                login="admin",
+                password="secret",
+            )
+            self.assertTrue(conn.connect())
+            start: float = time.perf_counter()
+            self.assertTrue(conn.prefetch(commands))
+            # one round trip for all commands
+            self.assertLess(time.perf_counter() - start, 0.2)
+            start = time.perf_counter()
+            self.assertTrue(conn.execute(commands[0]))
+            out, err = conn.outputs()
+            self.assertEqual(out[0][0]["address"], "127.1.0.1/32")
+            self.assertFalse(conn.execute(commands[1]))
+            out, err = conn.outputs()
+            self.assertEqual(err[0][0]["message"], "no such command")
+            self.assertTrue(conn.execute(commands[2]))
+            out, err = conn.outputs()
+            self.assertEqual(len(out[0]), 3)
+            self.assertLess(time.perf_counter() - start, 0.1)
+            # not prefetched, goes through API
+            self.assertTrue(conn.execute(commands[0]))
+            out, err = conn.outputs()
+            self.assertEqual(
+                len(out[0]), len(topology.menu(0x7F010001, "/ip/address/"))
+            )
+            conn.disconnect()
+
+    def test_06_versions(self) -> None:
+        """Test nr 06."""
+        self.assertIs(CollectorRegistry.find("7.14.3"), RouterBoardCollector7)
+        self.assertIsNone(CollectorRegistry.find("5.26"))
+        topology = Topology(routers=10, extra_links=5, ppp_sessions=3)
+        tmp: str = tempfile.mkdtemp()
+        path: str = os.path.join(tmp, "spider.db")
+        try:
+            for nr in range(2):
+                versions = CollectorCache(revalidate=1)
+                comms_queue: Queue = Queue()
+                db_proc = DbProcessor(LogsQueue(), comms_queue, versions=versions)
+                db_proc.db_backend = DbBackends.SQLITE
+                db_proc.db_database = path
+                db_proc.start()
+                self.assertTrue(versions.wait(5))
+                metrics = CrawlMetrics()
+                with RouterOSSimulator(topology, password="secret") as sim:
+                    self.__crawl(
+                        sim, metrics, versions=versions, comms_queue=comms_queue
+                    )
+                db_proc.stop()
+                db_proc.join()
+                self.assertEqual(metrics.counters.get("version_cached", 0), nr * 10)
+
+            engine = create_engine(f"sqlite:///{path}")
+            with Session(engine) as session:
+                rows = session.execute(
+                    select(TRouterVersion.collector, TRouterVersion.runs)
+                ).all()
+            engine.dispose()
+            self.assertEqual(len(rows), 10)
+            self.assertEqual({runs for _, runs in rows}, {1})
+            self.assertTrue(
+                all(name.startswith("RouterBoardCollector") for name, _ in rows)
+            )
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        # unknown collector class falls back to the version check
+        versions = CollectorCache()
+        versions.load([(int(topology.start_ip), "Nope", "9.0", 0)])
+        metrics = CrawlMetrics()
+        with RouterOSSimulator(topology, password="secret") as sim:
+            self.__crawl(sim, metrics, versions=versions)
+        self.assertEqual(metrics.counters["version_invalidated"], 1)
+        self.assertEqual(metrics.counters["collected"], 10)
+
+    def test_07_resume(self) -> None:
+        """Test nr 07."""
+        topology = Topology(routers=40, extra_links=20, ppp_sessions=3)
+        tmp: str = tempfile.mkdtemp()
+        checkpoint = CrawlCheckpoint(os.path.join(tmp, "crawl.json"), 3600.0)
+        self.assertIsNone(checkpoint.load())
+        collected: List[int] = []
+        try:
+            with RouterOSSimulator(topology, password="secret") as sim:
+                for resume in (False, True):
+                    queue = LogsQueue()
+                    comms_queue: Queue = Queue()
+                    crawler = Crawler(
+                        queue,
+                        Processor(queue, ["secret"], port=sim.port, pinger=sim.pinger),
+                        comms_queue,
+                        self.WORKERS,
+                        checkpoint=checkpoint,
+                    )
+                    crawler.run(
+                        topology.start_ip,
+                        stop=None if resume else lambda: comms_queue.qsize() >= 15,
+                        resume=resume,
+                    )
+                    while not comms_queue.empty():
+                        collected.append(int(comms_queue.get().router_id))
+                    if resume:
+                        break
+                    # interrupted
+                    self.assertFalse(crawler.complete)
+                    state: Optional[CrawlState] = checkpoint.load()
+                    self.assertIsNotNone(state)
+                    self.assertEqual(state.start, int(topology.start_ip))  # type: ignore
+                    self.assertEqual(
+                        sorted(state.completed + state.frontier),  # type: ignore
+                        sorted(state.visited),  # type: ignore
+                    )
+            self.assertTrue(crawler.complete)
+            self.assertFalse(os.path.exists(checkpoint.path))
+            self.assertEqual(sorted(collected), topology.routers)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_08_shutdown(self) -> None:
+        """Test nr 08."""
+        topology = Topology(routers=10, ppp_sessions=3)
+        metrics = CrawlMetrics()
+        with RouterOSSimulator(topology, password="secret", latency=3.0) as sim:
+            queue = LogsQueue()
+            crawler = _QuickStopCrawler(
+                queue,
+                Processor(
+                    queue, ["secret"], metrics=metrics, port=sim.port, pinger=sim.pinger
+                ),
+                Queue(),
+                self.WORKERS,
+            )
+            start: float = time.perf_counter()
+            crawler.run(topology.start_ip, stop=lambda: True)
+            duration: float = time.perf_counter() - start
+        # hung login dialog was cancelled, not waited for
+        self.assertLess(duration, 2.0)
+        self.assertFalse(crawler.complete)
+        self.assertEqual(metrics.counters["cancelled"], 1)
+        workers, cancel = crawler.shutdown.stages
+        self.assertEqual((workers.name, workers.finished), ("workers", False))
+        self.assertEqual((cancel.name, cancel.finished), ("cancel", True))
+        self.assertEqual(
+            crawler.shutdown.summary()[0],
+            f"* shutdown workers: {workers.duration:.3f}s (timeout)",
+        )
+
+    def test_09_timeouts(self) -> None:
+        """Test nr 09."""
+        topology = Topology(routers=30, extra_links=30, ppp_sessions=3)
+        with RouterOSSimulator(
+            topology, password="secret", hung_rate=0.2, seed=5
+        ) as sim:
+            self.assertGreater(len(sim.hung), 0)
+            for timeouts, stage in (
+                (RouterTimeouts(command=0.3, total=5.0), "timeout_command"),
+                (RouterTimeouts(command=5.0, total=0.3), "timeout_total"),
+            ):
+                metrics = CrawlMetrics()
+                queue = LogsQueue()
+                processor = Processor(
+                    queue,
+                    ["secret"],
+                    metrics=metrics,
+                    port=sim.port,
+                    pinger=sim.pinger,
+                    timeouts=timeouts,
+                )
+                comms_queue: Queue = Queue()
+                start: float = time.perf_counter()
+                count: int = Crawler(queue, processor, comms_queue, self.WORKERS).run(
+                    topology.start_ip
+                )
+                # hung routers do not hold workers longer than the budget
+                self.assertLess(time.perf_counter() - start, 5.0)
+                counters = metrics.counters
+                self.assertGreater(counters[stage], 0)
+                self.assertEqual(counters["collected"], comms_queue.qsize())
+                self.assertEqual(counters["collected"] + counters[stage], count)
+                while not comms_queue.empty():
+                    self.assertNotIn(int(comms_queue.get().router_id), sim.hung)
+
+    def test_10_frontier(self) -> None:
+        """Test nr 10."""
+        history = RouterHistory()
+        history.load([(1, 2, 0), (2, 9, 0), (3, 1, 500)])
+        frontier = create_frontier(FrontierOrder.DEGREE, history)
+        for rid in (4, 1, 2, 3):
+            frontier.push(rid)
+        self.assertEqual([frontier.pop() for _ in range(4)], [2, 1, 3, 4])
+        frontier = create_frontier(FrontierOrder.CUSTOMERS, history)
+        for rid in (4, 1, 2, 3):
+            frontier.push(rid)
+        # unknown routers are taken depth-first
+        self.assertEqual([frontier.pop() for _ in range(4)], [3, 2, 1, 4])
+        frontier = create_frontier(
+            FrontierOrder.SUBNET, subnets=["10.0.1.0/24", "10.0.0.0/16"]
+        )
+        for ip in ("10.1.0.1", "10.0.0.1", "10.0.1.1"):
+            frontier.push(int(Address(ip)))
+        self.assertEqual(
+            [str(Address(frontier.pop())) for _ in range(3)],
+            ["10.0.1.1", "10.0.0.1", "10.1.0.1"],
+        )
+        with self.assertRaises(ValueError):
+            create_frontier("random")
+
+        # makespan with previous run history
+        topology = Topology(routers=100, extra_links=10, ppp_sessions=50)
+        timings: Dict[str, float] = {}
+        with RouterOSSimulator(topology, password="secret", latency=0.01) as sim:
+            for order in (FrontierOrder.LIFO, FrontierOrder.DEGREE):
+                queue = LogsQueue()
+                comms_queue: Queue = Queue()
+                crawler = Crawler(
+                    queue,
+                    Processor(queue, ["secret"], port=sim.port, pinger=sim.pinger),
+                    comms_queue,
+                    self.WORKERS,
+                    frontier=create_frontier(order, history),
+                )
+                start: float = time.perf_counter()
+                self.assertEqual(crawler.run(topology.start_ip), 100)
+                timings[order] = time.perf_counter() - start
+                history = RouterHistory()
+                history.load(
+                    (int(rb.router_id), len(rb.routers), len(rb.customers))
+                    for rb in (comms_queue.get() for _ in range(comms_queue.qsize()))
+                )
+        logger.info(
+            "crawl 100 routers, %d workers: %s",
+            self.WORKERS,
+            ", ".join(f"{name} {value:.2f}s" for name, value in timings.items()),
+        )
+
+    def test_11_memory(self) -> None:
+        """Test nr 11."""
+        topology = Topology(routers=10, ppp_sessions=10)
+        queue = LogsQueue()
+        retained: Dict[bool, int] = {}
+        with RouterOSSimulator(topology, password="secret") as sim:
+            conn = PipelinedAPI(
+                ip_address=topology.start_ip,
+                port=sim.port,
+                login="admin",
+                password="secret",
+            )
+            self.assertTrue(conn.connect())
+            gc.collect()
+            gc.disable()
+            try:
+                for release in (False, True):
+                    tracemalloc.start()
+                    for _ in range(10):
+                        rb = RouterBoard(connector=conn, qlog=queue)
+                        if release:
+                            self.assertGreater(release_elements(rb), 100)
+                        del rb
+                    retained[release] = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.stop()
+                    gc.collect()
+            finally:
+                gc.enable()
+                conn.disconnect()
+
+            # collected routers leave no element trees behind
+            processor = Processor(queue, ["secret"], port=sim.port, pinger=sim.pinger)
+            processor.collect(topology.start_ip)
+            gc.collect()
+            gc.disable()
+            try:
+                tracemalloc.start()
+                for rid in topology.routers:
+                    self.assertIsNotNone(processor.collect(Address(rid)))
+                collected: int = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+            finally:
+                gc.enable()
+        memory: str = (
+            f"retained by 10 router boards without gc: {retained[False] // 1024} KiB,"
+            f" released: {retained[True] // 1024} KiB,"
+            f" after {len(topology.routers)} collects: {collected // 1024} KiB"
+        )
+        self.assertLess(retained[True] * 10, retained[False], memory)
+        self.assertLess(collected, retained[False], memory)
+
+    def test_12_api_internals(self) -> None:
+        """Test nr 12."""
+        # PipelinedAPI depends on these private members of jsktoolbox API
+        for name in PipelinedAPI.API_INTERNALS:
+            self.assertTrue(
+                hasattr(API, name),
+                f"jsktoolbox API has no '{name}', check the pinned jsktoolbox version",
+            )
+        self.assertIsInstance(getattr(API, "_API__socket"), property)
+        api = API(timeout=12.5)
+        for key in PipelinedAPI.API_DATA_KEYS:
+            self.assertIn(
+                key,
+                api._data,
+                f"jsktoolbox API has no '{key}' data key, check the pinned jsktoolbox version",
+            )
+        # command limit written by PipelinedAPI.execute
+        self.assertEqual(api._data[PipelinedAPI.API_DATA_KEYS[0]], 12.5)
+        topology = Topology(routers=2)
+        with RouterOSSimulator(topology, password="secret") as sim:
+            conn = _CountingAPI(
+                ip_address=topology.start_ip,
+                port=sim.port,
+                login="admin",
+                password="secret",
+            )
+            conn.deadline = Deadline(RouterTimeouts(login=7.0))
+            # API opens the socket through the overridden factory
+            self.assertTrue(conn.connect())
+            self.assertEqual(_CountingAPI.sockets, 1)
+            self.assertIsNotNone(conn._API__socket)
+            self.assertTrue(conn.prefetch(["/system/identity/print"]))
+            # abort shuts down the same socket
+            conn.abort()
+            self.assertFalse(conn.prefetch(["/system/identity/print"]))
+
+
+# #[EOF]#######################################################################
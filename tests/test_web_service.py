@@ -0,0 +1,585 @@
+# -*- coding: utf-8 -*-
+"""
+  test_web_service.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 14:02:16
+
+  Purpose: Tests for web service startup.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+
+from typing import Any, Dict, Optional
+from unittest import TestCase, mock
+
+from flask import Flask
+
+with warnings.catch_warnings():
+    # passlib 1.7.4 imports the deprecated 'crypt' module
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from passlib.hash import md5_crypt
+
+from web_service import create_app
+from web_service.tools import WebConfig
+
+
+class TestImportTime(TestCase):
+    """Import time benchmark for the wsgi entry point."""
+
+    # upper limit for cumulative import time of web_service.wsgi [us]
+    LIMIT: int = 1_500_000
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import web_service.wsgi"],
+            cwd=os.path.join(os.path.dirname(__file__), ".."),
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        self.assertEqual(out.returncode, 0, out.stderr)
+        # import time: self [us] | cumulative | imported package
+        self.modules: Dict[str, int] = {}
+        for line in out.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = line[len("import time:") :].split("|")
+            if parts[1].strip().isdigit():
+                self.modules[parts[2].strip()] = int(parts[1])
+
+    def test_01_deferred_modules(self) -> None:
+        """Test nr 01."""
+        for name in (
+            "sqlalchemy",
+            "flask_sqlalchemy",
+            "web_service.routes",
+            "web_service.models",
+            "turtle",
+            "tkinter",
+        ):
+            self.assertNotIn(name, self.modules, f"'{name}' imported at startup")
+
+    def test_02_import_time(self) -> None:
+        """Test nr 02."""
+        self.assertIn("web_service.wsgi", self.modules)
+        self.assertLess(
+            self.modules["web_service.wsgi"],
+            self.LIMIT,
+            f"web_service.wsgi import time: {self.modules['web_service.wsgi']} us",
+        )
+
+
+class _WebApp(TestCase):
+    """Web service on a temporary SQLite database."""
+
+    # additional configuration variables
+    CONFIG: Dict[str, Any] = {}
+
+    app: Flask
+    tmp: str
+    __file_name: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up tests."""
+        cls.tmp = tempfile.mkdtemp()
+        variables: Dict[str, Any] = {
+            "salt": 123456,
+            "db_backend": '"sqlite"',
+            "db_database": f'"{os.path.join(cls.tmp, "web.db")}"',
+        }
+        variables.update(cls.CONFIG)
+        with open(os.path.join(cls.tmp, "web.conf"), "w") as file:
+            file.write("[uke-pit2]\n")
+            for name, value in variables.items():
+                file.write(f"{name} = {value}\n")
+        cls.__file_name = WebConfig.__file_name__
+        WebConfig.__file_name__ = os.path.join(cls.tmp, "web.conf")
+        cls.app = create_app()
+        cls.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+        cls.app.extensions["deferred_init"].init()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Clean up tests."""
+        from web_service.extensions import db
+
+        with cls.app.app_context():
+            db.engine.dispose()
+        WebConfig.__file_name__ = cls.__file_name
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    @classmethod
+    def add(cls, *rows: Any) -> None:
+        """Stores rows in the database."""
+        from web_service.extensions import db
+
+        with cls.app.app_context():
+            db.session.add_all(rows)
+            db.session.commit()
+
+
+class TestPasswordHash(TestCase):
+    """PasswordHash class test unit."""
+
+    def test_01_bcrypt(self) -> None:
+        """Test nr 01."""
+        import bcrypt
+
+        from web_service.auth import PasswordHash
+
+        hashed: str = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+        # PHP password_hash prefix
+        hashed = "$2y$" + hashed[4:]
+        self.assertTrue(PasswordHash.verify("secret", hashed))
+        self.assertFalse(PasswordHash.verify("wrong", hashed))
+
+    def test_02_crypt(self) -> None:
+        """Test nr 02."""
+        from web_service.auth import PasswordHash
+
+        hashed: str = md5_crypt.hash("secret")
+        self.assertTrue(PasswordHash.verify("secret", hashed))
+        self.assertFalse(PasswordHash.verify("wrong", hashed))
+        self.assertFalse(PasswordHash.verify("secret", "plain"))
+        self.assertFalse(PasswordHash.verify("", hashed))
+
+
+class TestLogin(_WebApp):
+    """Login view test unit."""
+
+    CONFIG: Dict[str, Any] = {"proxy_count": 1}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up tests."""
+        super().setUpClass()
+        from web_service import models
+
+        for login in ("admin", "user"):
+            user = models.LmsUser(
+                login=login,
+                passwd=md5_crypt.hash("secret"),
+                ntype=0,
+                rights="",
+                settings="",
+                persistentsettings="",
+            )
+            cls.add(user)
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        from web_service import routes
+        from web_service.auth import LoginThrottle
+
+        routes.login_throttle = LoginThrottle(limit=3, window=60, lockout=60)
+        routes.address_throttle = LoginThrottle(limit=6, window=60, lockout=60)
+
+    def attempt(self, login: str, password: str, address: str) -> Optional[str]:
+        """Returns redirect location or None for rejected login."""
+        with self.app.test_client() as client:
+            out = client.post(
+                "/login",
+                data={"login": login, "passwd": password},
+                headers={"X-Forwarded-For": address},
+                environ_base={"REMOTE_ADDR": "127.0.0.1"},
+            )
+            return out.location if out.status_code == 302 else None
+
+    def test_01_login(self) -> None:
+        """Test nr 01."""
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.1"), "/")
+        self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        self.assertIsNone(self.attempt("nobody", "secret", "10.0.0.1"))
+
+    def test_02_lockout(self) -> None:
+        """Test nr 02."""
+        for _ in range(3):
+            self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        # locked for the pair, even with a valid password
+        self.assertIsNone(self.attempt("admin", "secret", "10.0.0.1"))
+        # other clients behind the same proxy and other users are not locked
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.2"), "/")
+        self.assertEqual(self.attempt("user", "secret", "10.0.0.1"), "/")
+
+    def test_03_window(self) -> None:
+        """Test nr 03."""
+        from web_service import routes
+        from web_service.auth import LoginThrottle
+
+        routes.login_throttle = LoginThrottle(limit=3, window=0, lockout=60)
+        routes.address_throttle = LoginThrottle(limit=6, window=0, lockout=60)
+        # failures older than the window are not counted
+        for _ in range(5):
+            self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.1"), "/")
+        routes.login_throttle = LoginThrottle(limit=3, window=60, lockout=0)
+        routes.address_throttle = LoginThrottle(limit=6, window=60, lockout=0)
+        for _ in range(3):
+            self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        # lockout expired
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.1"), "/")
+
+    def test_04_reset(self) -> None:
+        """Test nr 04."""
+        for _ in range(2):
+            self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.1"), "/")
+        # counter cleared by the successful login
+        for _ in range(2):
+            self.assertIsNone(self.attempt("admin", "wrong", "10.0.0.1"))
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.1"), "/")
+
+    def test_05_spraying(self) -> None:
+        """Test nr 05."""
+        # one password against many logins from one address
+        for nr in range(6):
+            self.assertIsNone(self.attempt(f"user{nr}", "secret", "10.0.0.1"))
+        self.assertIsNone(self.attempt("admin", "secret", "10.0.0.1"))
+        self.assertEqual(self.attempt("admin", "secret", "10.0.0.2"), "/")
+
+    def test_06_size(self) -> None:
+        """Test nr 06."""
+        from web_service.auth import LoginThrottle
+
+        throttle = LoginThrottle(limit=2, window=60, lockout=60, size=10)
+        for nr in range(100):
+            throttle.failure(throttle.key(f"user{nr}", "10.0.0.1"))
+        self.assertLessEqual(len(throttle), 10)
+        # the last keys are kept
+        throttle.failure(throttle.key("user99", "10.0.0.1"))
+        self.assertTrue(throttle.is_blocked(throttle.key("user99", "10.0.0.1")))
+        with mock.patch("web_service.auth.time.monotonic", return_value=1e9):
+            # expired windows and blocks are dropped
+            for nr in range(10):
+                throttle.failure(throttle.key(f"admin{nr}", "10.0.0.1"))
+            self.assertLessEqual(len(throttle), 10)
+            self.assertFalse(throttle.is_blocked(throttle.key("user99", "10.0.0.1")))
+
+
+class TestAssignmentIndex(_WebApp):
+    """AssignmentIndex class test unit."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up tests."""
+        super().setUpClass()
+        from web_service import models
+
+        cls.add(
+            *(
+                models.Router(id=nr, router_id=0x0A000000 + nr, last_update=0)
+                for nr in range(1, 6)
+            )
+        )
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        from web_service import models
+        from web_service.extensions import db
+
+        with self.app.app_context():
+            db.session.query(models.NodeAssignment).delete()
+            db.session.commit()
+        models.AssignmentIndex.invalidate()
+
+    def unbound(self) -> list:
+        """Returns ids of the unbound routers from the index and database."""
+        from web_service import models
+
+        with self.app.app_context():
+            out = [rid for rid, _ in models.AssignmentIndex.unbound()]
+            self.assertEqual(
+                out, [rid for rid, _ in models.Router.get_unbound_list_db()]
+            )
+            return out
+
+    def other_worker(self, *rows: Any) -> None:
+        """Adds assignments as another worker, not reported to the index."""
+        from web_service import models
+        from web_service.extensions import db
+
+        with self.app.app_context():
+            db.session.add_all(rows)
+            models.AssignmentVersion.bump()
+            db.session.commit()
+
+    def test_01_assign_release(self) -> None:
+        """Test nr 01."""
+        from web_service import models
+
+        self.assertEqual(self.unbound(), [1, 2, 3, 4, 5])
+        with self.app.test_client() as client:
+            with client.session_transaction() as session:
+                session["username"] = "admin"
+            client.post("/nodes", data={"nodes": "7", "routers": "2"})
+            # router may be assigned to more than one node
+            client.post("/nodes", data={"nodes": "8", "routers": "2"})
+            self.assertEqual(self.unbound(), [1, 3, 4, 5])
+            with self.app.app_context():
+                self.assertEqual(models.AssignmentIndex.routers(7), [(2, "10.0.0.2")])
+                self.assertEqual(models.AssignmentIndex.routers(8), [(2, "10.0.0.2")])
+                self.assertEqual(models.AssignmentIndex.assigned(), [(2, "10.0.0.2")])
+            client.post("/nodes", data={"nodes": "7", "connections": "2"})
+            self.assertEqual(self.unbound(), [1, 3, 4, 5])
+            with self.app.app_context():
+                self.assertEqual(models.AssignmentIndex.routers(7), [])
+                self.assertEqual(models.AssignmentIndex.routers(8), [(2, "10.0.0.2")])
+                self.assertEqual(
+                    models.NodeAssignment.query.filter_by(rid=2).count(), 1
+                )
+            client.post("/nodes", data={"nodes": "8", "connections": "2"})
+            self.assertEqual(self.unbound(), [1, 2, 3, 4, 5])
+
+    def test_02_other_worker(self) -> None:
+        """Test nr 02."""
+        from web_service import models
+
+        self.assertEqual(self.unbound(), [1, 2, 3, 4, 5])
+        self.other_worker(models.NodeAssignment(nid=1, rid=3))
+        self.assertEqual(self.unbound(), [1, 2, 4, 5])
+        self.other_worker(
+            models.NodeAssignment(nid=2, rid=1),
+            models.NodeAssignment(nid=1, rid=4),
+            models.NodeAssignment(nid=2, rid=4),
+        )
+        with self.app.app_context():
+            # the same routers as the join of both tables
+            self.assertEqual(
+                models.AssignmentIndex.assigned(),
+                [
+                    (item.id, str(models.Address(item.router_id)))
+                    for item in models.Router.query.join(
+                        models.NodeAssignment,
+                        models.Router.id == models.NodeAssignment.rid,
+                    )
+                    .order_by(models.Router.router_id)
+                    .all()
+                ],
+            )
+            self.assertEqual(
+                [rid for rid, _ in models.AssignmentIndex.assigned()], [1, 3, 4]
+            )
+            self.assertEqual(
+                [rid for rid, _ in models.AssignmentIndex.routers(1)], [3, 4]
+            )
+            self.assertEqual(
+                [rid for rid, _ in models.AssignmentIndex.routers(2)], [1, 4]
+            )
+
+    def test_03_invalidate(self) -> None:
+        """Test nr 03."""
+        from web_service import models
+        from web_service.extensions import db
+
+        # host with less than 'ttl' seconds of monotonic uptime
+        with mock.patch("web_service.models.time.monotonic", return_value=1.0):
+            self.assertEqual(self.unbound(), [1, 2, 3, 4, 5])
+            with self.app.app_context():
+                db.session.add(models.Router(id=6, router_id=0x0A000006, last_update=0))
+                db.session.commit()
+            # new routers are picked up after ttl or invalidation
+            with self.app.app_context():
+                self.assertEqual(len(models.AssignmentIndex.unbound()), 5)
+            models.AssignmentIndex.invalidate()
+            self.assertEqual(self.unbound(), [1, 2, 3, 4, 5, 6])
+        with self.app.app_context():
+            db.session.query(models.Router).filter(models.Router.id == 6).delete()
+            db.session.commit()
+        models.AssignmentIndex.invalidate()
+
+    def test_04_version_per_request(self) -> None:
+        """Test nr 04."""
+        from web_service import models
+
+        with mock.patch.object(
+            models.AssignmentVersion,
+            "current",
+            wraps=models.AssignmentVersion.current,
+        ) as current:
+            with self.app.test_request_context("/nodes"):
+                models.AssignmentIndex.unbound()
+                models.AssignmentIndex.routers(1)
+                models.AssignmentIndex.assigned()
+            self.assertEqual(current.call_count, 1)
+            with self.app.test_request_context("/nodes"):
+                models.AssignmentIndex.unbound()
+            self.assertEqual(current.call_count, 2)
+
+
+class TestExport(_WebApp):
+    """Export endpoints test unit."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up tests."""
+        super().setUpClass()
+        from web_service import models
+
+        cls.add(
+            *(
+                models.Router(id=nr, router_id=0x0A000000 + nr, last_update=0)
+                for nr in (1, 2, 3)
+            ),
+            models.NodeAssignment(nid=1, rid=1),
+            models.NodeAssignment(nid=2, rid=2),
+            models.NodeAssignment(nid=2, rid=3),
+            models.Customer(rid=1, name="c1", ip=0xC0A8000A, last_update=10),
+            models.Customer(rid=3, name="c3", ip=0xC0A80114, last_update=30),
+            models.Customer(rid=2, name="c2", ip=0xC0A8010A, last_update=20),
+            models.InterfaceName(id=1, name="ether1"),
+            models.InterfaceName(id=2, name="ether2"),
+            models.Connection(
+                id=1, rid=1, vlan_id=1, network=0x0A010000, last_update=0
+            ),
+            models.Connection(
+                id=2, rid=2, vlan_id=1, network=0x0A010000, last_update=0
+            ),
+            models.Interface(cid=1, if_id=1, last_update=0),
+            models.Interface(cid=2, if_id=2, last_update=0),
+        )
+
+    def get(self, url: str) -> Any:
+        """Returns response of the logged in client."""
+        with self.app.test_client() as client:
+            with client.session_transaction() as session:
+                session["username"] = "admin"
+            return client.get(url)
+
+    def test_01_customers(self) -> None:
+        """Test nr 01."""
+        out = self.get("/export/customers?nid=2")
+        self.assertEqual(out.status_code, 200)
+        self.assertEqual(out.mimetype, "text/csv")
+        self.assertIn("filename=customers_2.csv", out.headers["Content-Disposition"])
+        self.assertEqual(
+            out.get_data(as_text=True).splitlines(),
+            [
+                "nid,name,ip,last_update",
+                "2,c2,192.168.1.10,20",
+                "2,c3,192.168.1.20,30",
+            ],
+        )
+        out = self.get("/export/customers?format=ndjson")
+        self.assertEqual(out.mimetype, "application/x-ndjson")
+        rows = [json.loads(line) for line in out.get_data(as_text=True).splitlines()]
+        self.assertEqual([row["name"] for row in rows], ["c1", "c2", "c3"])
+        self.assertEqual(rows[0]["ip"], "192.168.0.10")
+
+    def test_02_links(self) -> None:
+        """Test nr 02."""
+        out = self.get("/export/links")
+        self.assertEqual(
+            out.get_data(as_text=True).splitlines(),
+            [
+                "node1_id,node2_id,router1,interface1,router2,interface2,network,vlan_id",
+                "1,2,10.0.0.1,ether1,10.0.0.2,ether2,10.1.0.0,1",
+            ],
+        )
+        out = self.get("/export/links?nid=2&format=ndjson")
+        rows = [json.loads(line) for line in out.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["node1_id"], 2)
+        self.assertEqual(rows[0]["router1"], "10.0.0.2")
+
+    def test_03_gzip(self) -> None:
+        """Test nr 03."""
+        out = self.get("/export/customers?nid=1&gzip=1")
+        self.assertEqual(out.status_code, 200)
+        self.assertEqual(out.mimetype, "application/gzip")
+        self.assertNotIn("Content-Encoding", out.headers)
+        self.assertIn("filename=customers_1.csv.gz", out.headers["Content-Disposition"])
+        self.assertEqual(
+            gzip.decompress(out.get_data()).decode("utf-8").splitlines()[1],
+            "1,c1,192.168.0.10,10",
+        )
+
+    def test_04_errors(self) -> None:
+        """Test nr 04."""
+        self.assertEqual(self.get("/export/customers?nid=x").status_code, 400)
+        self.assertEqual(self.get("/export/links?format=xml").status_code, 400)
+        with self.app.test_client() as client:
+            self.assertEqual(client.get("/export/customers").status_code, 302)
+        # pool metrics are disabled by default
+        self.assertEqual(self.get("/internal/pool").status_code, 404)
+
+
+class TestPoolMetrics(_WebApp):
+    """PoolMetrics class test unit."""
+
+    CONFIG: Dict[str, Any] = {"pool_metrics": True}
+
+    def test_01_endpoint(self) -> None:
+        """Test nr 01."""
+        with self.app.test_client() as client:
+            self.assertEqual(
+                client.get(
+                    "/internal/pool", environ_base={"REMOTE_ADDR": "127.0.0.1"}
+                ).status_code,
+                403,
+            )
+            with client.session_transaction() as session:
+                session["username"] = "admin"
+            out = client.get("/internal/pool")
+            self.assertEqual(out.status_code, 200)
+            for key in ("checkouts", "connects", "wait_avg", "size", "overflow"):
+                self.assertIn(key, out.json)
+
+    def test_02_recreate(self) -> None:
+        """Test nr 02."""
+        from web_service.extensions import db
+        from web_service.tools import MeteredQueuePool, PoolMetrics
+
+        with self.app.app_context():
+            for _ in range(3):
+                # pool is recreated, listeners are registered once
+                db.engine.dispose()
+                PoolMetrics.register(db.engine)
+                self.assertIsInstance(db.engine.pool, MeteredQueuePool)
+                before = PoolMetrics.dump()
+                with db.engine.connect() as connection:
+                    connection.exec_driver_sql("SELECT 1")
+                after = PoolMetrics.dump()
+                for key in ("checkins", "checkouts", "connects"):
+                    self.assertEqual(after[key] - before[key], 1, key)
+
+
+class TestWebConfig(TestCase):
+    """WebConfig class test unit."""
+
+    def setUp(self) -> None:
+        """Set up tests."""
+        self.tmp = tempfile.mkdtemp()
+        self.file_name = WebConfig.__file_name__
+        WebConfig.__file_name__ = os.path.join(self.tmp, "web.conf")
+
+    def tearDown(self) -> None:
+        """Clean up."""
+        WebConfig.__file_name__ = self.file_name
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def config(self, database: str) -> WebConfig:
+        """Returns WebConfig for sqlite backend with the database path."""
+        with open(WebConfig.__file_name__, "w") as file:
+            file.write(
+                f'[uke-pit2]\nsalt = 1\ndb_backend = "sqlite"\ndb_database = "{database}"\n'
+            )
+        return WebConfig()
+
+    def test_01_sqlite_database(self) -> None:
+        """Test nr 01."""
+        # default value of the generated config file
+        self.assertTrue(self.config("").errors)
+        self.assertFalse(self.config(":memory:").errors)
+        self.assertFalse(self.config(os.path.join(self.tmp, "web.db")).errors)
+
+
+# #[EOF]#######################################################################
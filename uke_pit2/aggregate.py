@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+  aggregate.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 16:48:21
+
+  Purpose: Per node aggregation of customer endpoints.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.libs.base_data import BData
+
+from uke_pit2.db_models.spider import TCustomer, TNodeAssignment
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    NUMPY: str = "__numpy__"
+    YIELD_PER: str = "__yield_per__"
+
+
+class CustomerAggregator(BData):
+    """Per node customer counts and address ranges.
+
+    Customers '(rid, ip)' and the routers assignment are loaded as integer
+    columns and joined in memory, without ORM objects or Address instances.
+    NumPy is used if available (lookup table or 'searchsorted' for the join,
+    'bincount' and 'minimum.at'/'maximum.at' for aggregates), otherwise the
+    pure Python implementation.
+
+    A router assigned to more than one node is counted in every one of them,
+    the same way as the customers section joins customers with assignment.
+    """
+
+    def __init__(self, use_numpy: Optional[bool] = None, yield_per: int = 5000) -> None:
+        """CustomerAggregator constructor.
+
+        ### Arguments:
+        - use_numpy [Optional[bool]] - force implementation, None for NumPy if available,
+        - yield_per [int] - number of rows fetched from cursor at once.
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        self._set_data(
+            key=_Keys.NUMPY, set_default_type=bool, value=use_numpy and np is not None
+        )
+        self._set_data(key=_Keys.YIELD_PER, set_default_type=int, value=yield_per)
+
+    @property
+    def numpy(self) -> bool:
+        """Returns True if NumPy implementation is used."""
+        return self._get_data(key=_Keys.NUMPY)  # type: ignore
+
+    def load(
+        self, session: Session
+    ) -> Tuple[Sequence[int], Sequence[int], Sequence[int], Sequence[int]]:
+        """Returns customers rid and ip columns, assignment rid and nid columns.
+
+        Assignment columns are ordered by router id.
+        """
+        rids = array("q")
+        ips = array("q")
+        result = session.execute(
+            select(TCustomer.rid, TCustomer.ip),
+            execution_options={"yield_per": self._get_data(key=_Keys.YIELD_PER)},
+        )
+        for partition in result.partitions():
+            for rid, ip in partition:
+                rids.append(rid)
+                ips.append(ip)
+        a_rids = array("q")
+        a_nids = array("q")
+        for rid, nid in session.execute(
+            select(TNodeAssignment.rid, TNodeAssignment.nid).order_by(
+                TNodeAssignment.rid, TNodeAssignment.nid
+            )
+        ):
+            a_rids.append(rid)
+            a_nids.append(nid)
+        return rids, ips, a_rids, a_nids
+
+    def aggregate(
+        self,
+        rids: Sequence[int],
+        ips: Sequence[int],
+        a_rids: Sequence[int],
+        a_nids: Sequence[int],
+    ) -> List[Tuple[int, int, int, int, int]]:
+        """Returns list of (nid, routers, customers, first ip, last ip) ordered by nid.
+
+        ### Arguments:
+        - rids [Sequence[int]] - customers router record ids,
+        - ips [Sequence[int]] - customers IPv4 addresses as int,
+        - a_rids [Sequence[int]] - assigned router record ids in ascending order,
+        - a_nids [Sequence[int]] - node ids for 'a_rids'.
+        """
+        if self.numpy:
+            return self.__aggregate_numpy(rids, ips, a_rids, a_nids)
+        return self.__aggregate_python(rids, ips, a_rids, a_nids)
+
+    def nodes(self, session: Session) -> List[Tuple[int, int, int, int, int]]:
+        """Loads data and returns per node aggregates."""
+        return self.aggregate(*self.load(session))
+
+    def __aggregate_numpy(
+        self,
+        rids: Sequence[int],
+        ips: Sequence[int],
+        a_rids: Sequence[int],
+        a_nids: Sequence[int],
+    ) -> List[Tuple[int, int, int, int, int]]:
+        """NumPy implementation of aggregate."""
+        c_rids = self.__column(rids)
+        c_ips = self.__column(ips)
+        n_rids = self.__column(a_rids)
+        n_nids = self.__column(a_nids)
+        if not len(c_rids) or not len(n_rids):
+            return []
+
+        # join customers with assignment: index of router in u_rids
+        u_rids, first, counts = np.unique(n_rids, return_index=True, return_counts=True)
+        top: int = int(max(u_rids[-1], c_rids.max()))
+        if 0 <= int(c_rids.min()) and top <= 8 * (len(c_rids) + len(u_rids)):
+            # dense record ids: direct lookup table
+            lookup = np.full(top + 1, -1, dtype=np.int64)
+            lookup[u_rids] = np.arange(len(u_rids))
+            idx = lookup[c_rids]
+            found = idx >= 0
+        else:
+            idx = np.searchsorted(u_rids, c_rids)
+            idx[idx == len(u_rids)] = 0
+            found = u_rids[idx] == c_rids
+        idx = idx[found]
+        c_ips = c_ips[found]
+        if not len(idx):
+            return []
+        # position of the first assignment row of the customer router
+        pos = first[idx]
+        multiple: bool = len(u_rids) < len(n_rids)
+        if multiple:
+            # one row per customer and assignment row of its router
+            repeat = counts[idx]
+            c_ips = np.repeat(c_ips, repeat)
+            pos = np.repeat(pos, repeat)
+            ends = np.cumsum(repeat)
+            pos += np.arange(len(pos)) - np.repeat(ends - repeat, repeat)
+
+        # group by node
+        keys, node_of = np.unique(n_nids, return_inverse=True)
+        group = node_of[pos]
+        customers = np.bincount(group, minlength=len(keys))
+        seen = np.zeros(len(n_rids), dtype=bool)
+        seen[pos] = True
+        if multiple:
+            # routers with repeated assignment rows are counted once
+            pairs = np.unique(np.stack((node_of[seen], n_rids[seen]), axis=1), axis=0)
+            routers = np.bincount(pairs[:, 0], minlength=len(keys))
+        else:
+            routers = np.bincount(node_of[seen], minlength=len(keys))
+        first_ip = np.full(len(keys), np.iinfo(np.int64).max, dtype=np.int64)
+        last_ip = np.full(len(keys), np.iinfo(np.int64).min, dtype=np.int64)
+        np.minimum.at(first_ip, group, c_ips)
+        np.maximum.at(last_ip, group, c_ips)
+        used = customers > 0
+        return list(
+            zip(
+                keys[used].tolist(),
+                routers[used].tolist(),
+                customers[used].tolist(),
+                first_ip[used].tolist(),
+                last_ip[used].tolist(),
+            )
+        )
+
+    @staticmethod
+    def __column(values: Sequence[int]):
+        """Returns int64 NumPy array for values, without copy for array('q')."""
+        if isinstance(values, array) and values.typecode == "q":
+            return np.frombuffer(values, dtype=np.int64)
+        return np.asarray(values, dtype=np.int64)
+
+    def __aggregate_python(
+        self,
+        rids: Sequence[int],
+        ips: Sequence[int],
+        a_rids: Sequence[int],
+        a_nids: Sequence[int],
+    ) -> List[Tuple[int, int, int, int, int]]:
+        """Pure Python implementation of aggregate."""
+        assignment: Dict[int, List[int]] = {}
+        for rid, nid in zip(a_rids, a_nids):
+            assignment.setdefault(rid, []).append(nid)
+        stats: Dict[int, List[int]] = {}
+        routers: Dict[int, Set[int]] = {}
+        for rid, ip in zip(rids, ips):
+            nids: Optional[List[int]] = assignment.get(rid)
+            if nids is None:
+                continue
+            for nid in nids:
+                item: Optional[List[int]] = stats.get(nid)
+                if item is None:
+                    stats[nid] = [1, ip, ip]
+                    routers[nid] = {rid}
+                    continue
+                item[0] += 1
+                if ip < item[1]:
+                    item[1] = ip
+                elif ip > item[2]:
+                    item[2] = ip
+                routers[nid].add(rid)
+        return [
+            (nid, len(routers[nid]), item[0], item[1], item[2])
+            for nid, item in sorted(stats.items())
+        ]
+
+
+# #[EOF]#######################################################################
@@ -9,7 +9,20 @@
 
 import sys
 
-from typing import List, Dict, Optional, Any
+from contextlib import nullcontext
+from functools import lru_cache
+from inspect import currentframe
+from types import UnionType
+from typing import (
+    ContextManager,
+    List,
+    Dict,
+    Optional,
+    Any,
+    Union,
+    get_args,
+    get_origin,
+)
 
 from sqlalchemy.orm import DeclarativeBase
 
@@ -20,6 +33,9 @@ from jsktoolbox.attribtool import ReadOnlyClass
 from jsktoolbox.configtool.main import Config as ConfigTool
 from jsktoolbox.logstool.logs import LoggerClient, ThLoggerProcessor
 from jsktoolbox.devices.mikrotik.routerboard import RouterBoard
+from jsktoolbox.raisetool import Raise
+
+from uke_pit2.metrics import CrawlMetrics
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
@@ -31,12 +47,23 @@ class _Keys(object, metaclass=ReadOnlyClass):
     CONFIG_HANDLER: str = "__cfh__"
     DEBUG: str = "__debug__"
     LOGGER_CLIENT: str = "__logger_client__"
+    METRICS: str = "__metrics__"
     PROC_LOGS: str = "__logger_processor__"
     RB: str = "__rbh__"
     SECTION: str = "__config_section__"
     VERBOSE: str = "__verbose__"
 
 
+class DbBackends(object, metaclass=ReadOnlyClass):
+    """Database backends container class."""
+
+    MYSQL: str = "mysql"
+    SQLITE: str = "sqlite"
+
+    # sqlite database name for in-memory database
+    MEMORY: str = ":memory:"
+
+
 class BConfigSection(BData):
     """Base class for Config Section."""
 
@@ -135,11 +162,12 @@ class BLogs(BData):
     @property
     def logs(self) -> LoggerClient:
         """Returns LoggerClient object."""
-        return self._get_data(
-            key=_Keys.LOGGER_CLIENT,
-            set_default_type=LoggerClient,
-            default_value=LoggerClient(),
-        )  # type: ignore
+        out: Optional[LoggerClient] = self._get_data(
+            key=_Keys.LOGGER_CLIENT, set_default_type=LoggerClient
+        )
+        if out is None:
+            return LoggerClient()
+        return out
 
     @logs.setter
     def logs(self, logger_client: LoggerClient) -> None:
@@ -147,6 +175,35 @@ class BLogs(BData):
         self._set_data(key=_Keys.LOGGER_CLIENT, value=logger_client)
 
 
+class BMetrics(BData):
+    """Base class for CrawlMetrics property."""
+
+    @property
+    def metrics(self) -> Optional[CrawlMetrics]:
+        """Returns CrawlMetrics object or None."""
+        return self._get_data(
+            key=_Keys.METRICS, set_default_type=Optional[CrawlMetrics]
+        )
+
+    @metrics.setter
+    def metrics(self, value: Optional[CrawlMetrics]) -> None:
+        """Sets CrawlMetrics object."""
+        self._set_data(key=_Keys.METRICS, value=value)
+
+    def _timer(self, phase: str, detail: str = "") -> ContextManager[None]:
+        """Returns phase timer, or dummy context manager if metrics is not set."""
+        metrics: Optional[CrawlMetrics] = self.metrics
+        if metrics is None:
+            return nullcontext()
+        return metrics.timer(phase, detail)
+
+    def _count(self, name: str, value: int = 1) -> None:
+        """Increments metrics counter if metrics is set."""
+        metrics: Optional[CrawlMetrics] = self.metrics
+        if metrics is not None:
+            metrics.count(name, value)
+
+
 class BRouterBoard(BData):
     """Base class for router board property."""
 
@@ -161,6 +218,128 @@ class BRouterBoard(BData):
         self._set_data(key=_Keys.RB, value=value)
 
 
+@lru_cache(maxsize=None)
+def _plain_type(kind: Any) -> Any:
+    """Returns class or tuple of classes for typing annotation."""
+    origin: Any = get_origin(kind)
+    if origin is Union or origin is UnionType:
+        out: List[Any] = []
+        for arg in get_args(kind):
+            tmp: Any = _plain_type(arg)
+            out.extend(tmp if isinstance(tmp, tuple) else (tmp,))
+        return tuple(out)
+    if origin is not None:
+        return origin
+    return kind
+
+
+class BFastData(BData):
+    """BData with cheaper key access for objects used on hot paths.
+
+    The property API and type restrictions of BData are kept. Values are held
+    in slot dicts and restricted types are reduced once to plain classes, so
+    reading a stored key is a single dict lookup. New attributes are refused
+    after a class level check, without calling the property getter.
+    """
+
+    __slots__ = ("__store", "__kinds")
+
+    def __storage(self) -> Dict[str, Any]:
+        """Returns values dict, creates storage on first use."""
+        try:
+            return self.__store
+        except AttributeError:
+            object.__setattr__(self, "_BFastData__store", {})
+            object.__setattr__(self, "_BFastData__kinds", {})
+        return self.__store
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not hasattr(self.__class__, name):
+            raise AttributeError(
+                f"Cannot add new attribute '{name}' to {self.__class__.__name__} object"
+            )
+        object.__setattr__(self, name, value)
+
+    def __type_error(self, kind: Any, value: Any, frame: Any) -> Exception:
+        """Returns TypeError for value."""
+        return Raise.error(
+            f"Expected '{kind}' type, received: '{type(value)}'",
+            TypeError,
+            self._c_name,
+            frame,
+        )
+
+    def _get_data(
+        self,
+        key: str,
+        set_default_type: Optional[Any] = None,
+        default_value: Any = None,
+    ) -> Optional[Any]:
+        """Gets data from internal dict.
+
+        ### Arguments:
+        - key [str] - variable name,
+        - set_default_type [Optional[Any]] - sets and restrict default type of variable if not None,
+        - default_value [Any] - returns it if variable not found.
+        """
+        try:
+            store: Dict[str, Any] = self.__store
+        except AttributeError:
+            store = self.__storage()
+        if key in store:
+            return store[key]
+        if set_default_type and key not in self.__kinds:
+            self.__kinds[key] = _plain_type(set_default_type)
+        if default_value is not None:
+            kind: Any = self.__kinds.get(key)
+            if kind is not None and not isinstance(default_value, kind):
+                raise self.__type_error(kind, default_value, currentframe())
+        return default_value
+
+    def _set_data(
+        self, key: str, value: Any, set_default_type: Optional[Any] = None
+    ) -> None:
+        """Sets data to internal dict.
+
+        ### Arguments:
+        - key [str] - variable name,
+        - value [Any] - value of variable,
+        - set_default_type [Optional[Any]] - sets and restrict default type of variable if not None.
+        """
+        try:
+            store: Dict[str, Any] = self.__store
+        except AttributeError:
+            store = self.__storage()
+        kind: Any = self.__kinds.get(key)
+        if kind is None and set_default_type:
+            kind = self.__kinds[key] = _plain_type(set_default_type)
+        if kind is not None and not isinstance(value, kind):
+            raise self.__type_error(kind, value, currentframe())
+        store[key] = value
+
+    @property
+    def _data(self) -> Dict:
+        """Returns data dict."""
+        return self.__storage()
+
+    @_data.setter
+    def _data(self, value: Optional[Dict]) -> None:
+        """Sets data dict."""
+        store: Dict[str, Any] = self.__storage()
+        if value is None:
+            store.clear()
+            return None
+        if not isinstance(value, Dict):
+            raise Raise.error(
+                f"Expected Dict type, received: '{type(value)}'.",
+                AttributeError,
+                self._c_name,
+                currentframe(),
+            )
+        for key in value.keys():
+            self._set_data(key, value[key])
+
+
 class BaseApp(BLogs, BConfigSection):
     """Main app base class."""
 
@@ -260,4 +439,11 @@ class LmsBase(DeclarativeBase):
     """Declarative Base class."""
 
 
+class LmsExtBase(DeclarativeBase):
+    """Declarative Base class for tables owned by LMS.
+
+    Kept separate from LmsBase, so 'create_all' never touches them.
+    """
+
+
 # #[EOF]#######################################################################
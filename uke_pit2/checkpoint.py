@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+  checkpoint.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 20.10.2026, 11:02:37
+
+  Purpose: Crawl state checkpoint for resuming interrupted runs.
+"""
+
+import json
+import os
+import time
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from uke_pit2.base import BFastData
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    INTERVAL: str = "__interval__"
+    PATH: str = "__path__"
+    SAVED: str = "__saved__"
+
+    # file keys
+    COMPLETED: str = "completed"
+    FRONTIER: str = "frontier"
+    START: str = "start"
+    TIME: str = "time"
+    VERSION: str = "version"
+    VISITED: str = "visited"
+
+
+class CrawlState(object):
+    """Crawl state: start router, run list, seen and collected router-ids."""
+
+    __slots__ = ("start", "frontier", "visited", "completed")
+
+    def __init__(
+        self,
+        start: int,
+        frontier: List[int],
+        visited: List[int],
+        completed: List[int],
+    ) -> None:
+        """CrawlState constructor."""
+        self.start: int = start
+        self.frontier: List[int] = frontier
+        self.visited: List[int] = visited
+        self.completed: List[int] = completed
+
+
+class CrawlCheckpoint(BFastData):
+    """Crawl state file.
+
+    The state is written with 'save' at most once per 'interval' seconds,
+    unless forced, to a temporary file renamed over the checkpoint, so an
+    interrupted write never leaves a broken file.
+    """
+
+    VERSION: int = 1
+
+    def __init__(self, path: str, interval: float = 30.0) -> None:
+        """CrawlCheckpoint constructor.
+
+        ### Arguments:
+        - path [str] - checkpoint file path,
+        - interval [float] - minimal time between writes in seconds.
+        """
+        self._data[_Keys.PATH] = path
+        self._data[_Keys.INTERVAL] = interval
+        self._data[_Keys.SAVED] = time.monotonic()
+
+    @property
+    def path(self) -> str:
+        """Returns checkpoint file path."""
+        return self._data[_Keys.PATH]
+
+    def load(self) -> Optional[CrawlState]:
+        """Returns saved crawl state, None if not found or not valid."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data: Dict[str, Any] = json.load(file)
+            if data.get(_Keys.VERSION) != self.VERSION:
+                return None
+            return CrawlState(
+                int(data[_Keys.START]),
+                [int(item) for item in data[_Keys.FRONTIER]],
+                [int(item) for item in data[_Keys.VISITED]],
+                [int(item) for item in data[_Keys.COMPLETED]],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(
+        self,
+        start: int,
+        frontier: Iterable[int],
+        visited: Iterable[int],
+        completed: Iterable[int],
+        force: bool = False,
+    ) -> bool:
+        """Writes crawl state, returns True if the file was written."""
+        now: float = time.monotonic()
+        if not force and now - self._data[_Keys.SAVED] < self._data[_Keys.INTERVAL]:
+            return False
+        data: Dict[str, Any] = {
+            _Keys.VERSION: self.VERSION,
+            _Keys.TIME: int(time.time()),
+            _Keys.START: start,
+            _Keys.FRONTIER: list(frontier),
+            _Keys.VISITED: list(visited),
+            _Keys.COMPLETED: list(completed),
+        }
+        tmp: str = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp, self.path)
+        self._data[_Keys.SAVED] = now
+        return True
+
+    def remove(self) -> None:
+        """Removes checkpoint file after a complete crawl."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# #[EOF]#######################################################################
@@ -17,7 +17,13 @@ from jsktoolbox.logstool.logs import LoggerQueue, LoggerClient
 from jsktoolbox.stringtool.crypto import SimpleCrypto
 from jsktoolbox.netaddresstool.ipv4 import Address
 
-from uke_pit2.base import BLogs, BConfigHandler, BModuleConfig, BConfigSection
+from uke_pit2.base import (
+    BLogs,
+    BConfigHandler,
+    BModuleConfig,
+    BConfigSection,
+    DbBackends,
+)
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
@@ -28,6 +34,7 @@ class _Keys(object, metaclass=ReadOnlyClass):
     MAIN: str = "__main__"
 
     DEBUG: str = "debug"
+    LMS_BACKEND: str = "db_backend"
     LMS_DB: str = "db_database"
     LMS_HOST: str = "db_host"
     LMS_PASS: str = "db_password"
@@ -52,6 +59,14 @@ class _ModuleConf(BModuleConfig):
             return False
         return var
 
+    @property
+    def lms_backend(self) -> str:
+        """Returns database backend name, 'mysql' if not set."""
+        var: Optional[str] = self._get(_Keys.LMS_BACKEND)
+        if not var:
+            return DbBackends.MYSQL
+        return var
+
     @property
     def lms_host(self) -> Optional[Address]:
         """Returns lms_host ip address as optional Address."""
@@ -160,6 +175,22 @@ class Config(BLogs, BConfigHandler, BConfigSection):
                         self.logs.message_critical = (
                             f"'{_Keys.SALT}' is not set properly."
                         )
+                    # lms_backend
+                    if self.module_conf.lms_backend not in (
+                        DbBackends.MYSQL,
+                        DbBackends.SQLITE,
+                    ):
+                        self.logs.message_critical = (
+                            f"'{_Keys.LMS_BACKEND}' is not set properly."
+                        )
+                    # lms_database
+                    if not self.module_conf.lms_database:
+                        self.logs.message_critical = (
+                            f"'{_Keys.LMS_DB}' is not set properly."
+                        )
+                    # sqlite needs the database path only
+                    if self.module_conf.lms_backend == DbBackends.SQLITE:
+                        return out
                     # lms_host
                     if not self.module_conf.lms_host:
                         self.logs.message_critical = (
@@ -172,11 +203,6 @@ class Config(BLogs, BConfigHandler, BConfigSection):
                         self.logs.message_critical = (
                             f"'{_Keys.LMS_PORT}' is not set properly."
                         )
-                    # lms_database
-                    if not self.module_conf.lms_database:
-                        self.logs.message_critical = (
-                            f"'{_Keys.LMS_DB}' is not set properly."
-                        )
                     # lms_user
                     if not self.module_conf.lms_user:
                         self.logs.message_critical = (
@@ -229,7 +255,13 @@ class Config(BLogs, BConfigHandler, BConfigSection):
             value=SimpleCrypto.salt_generator(4),
             desc="[int] salt for passwords encode/decode",
         )
-        # add mysql lms configuration
+        # add lms database configuration
+        self.cfh.set(
+            self.section,
+            varname=_Keys.LMS_BACKEND,
+            value=DbBackends.MYSQL,
+            desc="[str] database backend: 'mysql' or 'sqlite'",
+        )
         self.cfh.set(
             self.section,
             varname=_Keys.LMS_HOST,
@@ -244,7 +276,7 @@ class Config(BLogs, BConfigHandler, BConfigSection):
         self.cfh.set(
             self.section,
             varname=_Keys.LMS_DB,
-            desc="[str] lms database name",
+            desc="[str] lms database name, for sqlite: file path or ':memory:'",
         )
         self.cfh.set(
             self.section,
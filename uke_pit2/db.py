@@ -6,25 +6,78 @@
   
   Purpose: Classes for lms database connection
 """
-from typing import Optional
+from inspect import currentframe
+from typing import Any, Dict, Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import Session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.engine import URL
 from sqlalchemy.util import immutabledict
 
 from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.raisetool import Raise
 from jsktoolbox.netaddresstool.ipv4 import Address
-from jsktoolbox.logstool.logs import LoggerQueue, LoggerClient, BData
-
-from uke_pit2.base import BDebug, BLogs, BVerbose, LmsBase
+from jsktoolbox.logstool.logs import LoggerQueue
+
+from uke_pit2.base import (
+    BDebug,
+    BFastData,
+    BLogs,
+    BVerbose,
+    DbBackends,
+    LmsBase,
+    LmsExtBase,
+)
+from uke_pit2.logs import LogsClient
+
+
+def sqlite_url(path: str) -> URL:
+    """Returns SQLite URL for database file path or ':memory:'."""
+    return URL.create("sqlite+pysqlite", database=path)
+
+
+def sqlite_engine_options(path: str) -> Dict[str, Any]:
+    """Returns SQLAlchemy engine options for SQLite database.
+
+    In-memory database lives as long as its connection, so all threads share
+    a single one. File database connections may be used by another thread
+    than they were created in, SQLAlchemy pool takes care of it.
+    """
+    if not path or path == DbBackends.MEMORY:
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    return {
+        "poolclass": QueuePool,
+        "connect_args": {"check_same_thread": False, "timeout": 30},
+    }
+
+
+def _sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Sets connection pragmas for concurrent readers and batched writes."""
+    cursor = dbapi_connection.cursor()
+    # readers do not block the writer, in-memory database ignores it
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # with WAL, fsync on checkpoints only
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def sqlite_pragmas(engine: Engine) -> None:
+    """Registers pragmas set on every new SQLite connection of engine."""
+    if not event.contains(engine, "connect", _sqlite_pragmas):
+        event.listen(engine, "connect", _sqlite_pragmas)
 
 
 class DbConfigKeys(object, metaclass=ReadOnlyClass):
     """Keys container class for config dict."""
 
+    BACKEND: str = "__db_backend__"
     DATABASE: str = "__db_database__"
     HOST: str = "__db_host__"
     PASS: str = "__db_password__"
@@ -39,11 +92,12 @@ class _Keys(object, metaclass=ReadOnlyClass):
     DB_POLL: str = "__pool__"
 
 
-class DbConfig(BData):
+class DbConfig(BFastData):
     """Database configuration dict."""
 
     def __init__(self) -> None:
         """DbConfig constructor."""
+        self.backend = DbBackends.MYSQL
         self.host = Address("127.0.0.1")
         self.database = ""
         self.port = 3306
@@ -51,12 +105,36 @@ class DbConfig(BData):
         self.password = ""
 
     def __repr__(self) -> str:
-        return f"{self._c_name}(host: {self.host}, port: {self.port}, database: {self.database}, user: {self.user})"
+        return f"{self._c_name}(backend: {self.backend}, host: {self.host}, port: {self.port}, database: {self.database}, user: {self.user})"
+
+    @property
+    def backend(self) -> str:
+        """Returns database backend name.
+
+        For 'sqlite' backend 'database' is the file path or ':memory:'.
+        """
+        return self._get_data(DbConfigKeys.BACKEND, set_default_type=str, default_value=DbBackends.MYSQL)  # type: ignore
+
+    @backend.setter
+    def backend(self, value: str) -> None:
+        if value not in (DbBackends.MYSQL, DbBackends.SQLITE):
+            raise Raise.error(
+                f"Expected one of: '{DbBackends.MYSQL}', '{DbBackends.SQLITE}', received: '{value}'.",
+                ValueError,
+                self._c_name,
+                currentframe(),
+            )
+        self._set_data(DbConfigKeys.BACKEND, value=value)
 
     @property
     def host(self) -> Address:
         """Returns database IP Address."""
-        return self._get_data(DbConfigKeys.HOST, set_default_type=Address, default_value=Address("127.0.0.1"))  # type: ignore
+        out: Optional[Address] = self._get_data(
+            DbConfigKeys.HOST, set_default_type=Address
+        )
+        if out is None:
+            return Address("127.0.0.1")
+        return out
 
     @host.setter
     def host(self, value: Address) -> None:
@@ -118,7 +196,7 @@ class Database(BDebug, BVerbose, BLogs):
         - verbose [bool] - verbose debugging flag.
         """
         self._set_data(_Keys.CONF, set_default_type=DbConfig, value=config_obj)
-        self.logs = LoggerClient(logger_queue, self._c_name)
+        self.logs = LogsClient(logger_queue, self._c_name)
         self.debug = debug
         self.verbose = verbose
         self._set_data(_Keys.DB_POLL, set_default_type=Optional[Engine], value=None)
@@ -128,24 +206,34 @@ class Database(BDebug, BVerbose, BLogs):
 
     def create_connection(self) -> bool:
         """Prepare database engine."""
+        conf: DbConfig = self._get_data(_Keys.CONF)  # type: ignore
+        target: str = str(conf.host)
         # Engine
-        engine: Engine = create_engine(
-            url=self.url,
-            connect_args={},
-            pool_recycle=3600,
-            poolclass=QueuePool,
-        )
+        engine: Engine
+        if conf.backend == DbBackends.SQLITE:
+            target = conf.database if conf.database else DbBackends.MEMORY
+            engine = create_engine(url=self.url, **sqlite_engine_options(conf.database))
+            sqlite_pragmas(engine)
+        else:
+            engine = create_engine(
+                url=self.url,
+                connect_args={},
+                pool_recycle=3600,
+                poolclass=QueuePool,
+            )
         try:
             with engine.connect() as connection:
                 connection.execute(text("SELECT 1"))
                 if connection is not None:
                     LmsBase.metadata.create_all(engine)
-                if self.debug:
-                    if self.verbose:
-                        self.logs.message_debug = f"add connection to server: {self._get_data(_Keys.CONF).host} with backend: pymysql"  # type: ignore
-                    self._set_data(_Keys.DB_POLL, value=engine)
+                    if conf.backend == DbBackends.SQLITE:
+                        # local database has no LMS owning these tables
+                        LmsExtBase.metadata.create_all(engine)
+                if self.debug and self.verbose:
+                    self.logs.message_debug = f"add connection to server: {target} with backend: {engine.url.drivername}"
+                self._set_data(_Keys.DB_POLL, value=engine)
         except Exception as ex:
-            self.logs.message_critical = f"connection to server: {self._get_data(_Keys.CONF).host} with backend: pymyslq error: {ex}"  # type: ignore
+            self.logs.message_critical = f"connection to server: {target} with backend: {engine.url.drivername} error: {ex}"
         if self._get_data(_Keys.DB_POLL) is not None:
             return True
         return False
@@ -154,6 +242,8 @@ class Database(BDebug, BVerbose, BLogs):
     def url(self) -> URL:
         """Create URL object."""
         conf: DbConfig = self._get_data(_Keys.CONF)  # type: ignore
+        if conf.backend == DbBackends.SQLITE:
+            return sqlite_url(conf.database)
         return URL.create(
             "mysql+pymysql",
             username=conf.user,
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+  lms.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 14:40:12
+
+  Purpose: Read only mapping of LMS tables used by reports.
+"""
+
+from decimal import Decimal
+
+from sqlalchemy import Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from uke_pit2.base import LmsExtBase
+
+
+class TNetNode(LmsExtBase):
+    """Mapping class for LMS network nodes."""
+
+    __tablename__: str = "netnodes"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    type: Mapped[int] = mapped_column(Integer, default=0)
+    status: Mapped[int] = mapped_column(Integer, default=0)
+    longitude: Mapped[Decimal] = mapped_column(Numeric(10, 6), nullable=True)
+    latitude: Mapped[Decimal] = mapped_column(Numeric(10, 6), nullable=True)
+    ownership: Mapped[int] = mapped_column(Integer, default=0)
+    divisionid: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"id='{self.id}',"
+            f"name='{self.name}',"
+            f"divisionid='{self.divisionid}'"
+            ")"
+        )
+
+
+class TLmsDivision(LmsExtBase):
+    """Mapping class for LMS divisions."""
+
+    __tablename__: str = "divisions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shortname: Mapped[str] = mapped_column(String(255), nullable=False)
+    name: Mapped[str] = mapped_column(Text, nullable=False)
+    ten: Mapped[str] = mapped_column(String(128), nullable=False)
+    status: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"id='{self.id}',"
+            f"shortname='{self.shortname}'"
+            ")"
+        )
+
+
+# #[EOF]#######################################################################
@@ -38,6 +38,36 @@ class TRouter(LmsBase):
         )
 
 
+class TRouterVersion(LmsBase):
+    """Mapping class for cached collector selection of routers."""
+
+    __tablename__: str = "uke_pit_router_versions"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True, nullable=False, autoincrement=True
+    )
+    # router record id
+    rid: Mapped[int] = mapped_column(Integer, unique=True, nullable=False, index=True)
+    # collector class name
+    collector: Mapped[str] = mapped_column(String(40), nullable=False)
+    firmware: Mapped[str] = mapped_column(String(20), nullable=False)
+    # runs with cached collector since the last version check
+    runs: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"id='{self.id}',"
+            f"rid='{self.rid}',"
+            f"collector='{self.collector}',"
+            f"firmware='{self.firmware}',"
+            f"runs='{self.runs}'"
+            ")"
+        )
+
+
 class TCustomer(LmsBase):
     """Mapping class for customers data."""
 
@@ -155,6 +185,32 @@ class TNodeAssignment(LmsBase):
         )
 
 
+class TAssignmentVersion(LmsBase):
+    """Mapping class for version of routers assignment.
+
+    A single row, the version is incremented in the same transaction as
+    every change of uke_pit_assignment, so web service workers know when
+    their cached assignment index is stale.
+    """
+
+    __tablename__: str = "uke_pit_assignment_version"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True, nullable=False, autoincrement=False
+    )
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"id='{self.id}',"
+            f"version='{self.version}'"
+            ")"
+        )
+
+
 class TDivisions(LmsBase):
     """Mapping class for select main lms division."""
 
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+  frontier.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 20.10.2026, 16:05:44
+
+  Purpose: Crawl run list orderings.
+"""
+
+import heapq
+
+from abc import ABC, abstractmethod
+from inspect import currentframe
+from threading import Event, Lock
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.raisetool import Raise
+
+from uke_pit2.base import BFastData
+from uke_pit2.ipv4 import MASKS, str_to_network
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    COUNTER: str = "__counter__"
+    ENTRIES: str = "__entries__"
+    ITEMS: str = "__items__"
+    LOCK: str = "__lock__"
+    READY: str = "__ready__"
+    SCORE: str = "__score__"
+
+
+class FrontierOrder(object, metaclass=ReadOnlyClass):
+    """Run list orderings.
+
+    - LIFO - depth-first walk, the last discovered router goes first,
+    - DEGREE - routers with most inter-router connections in the previous
+      run go first,
+    - CUSTOMERS - routers with most customers in the previous run go
+      first, so PPPoE concentrators are collected early,
+    - SUBNET - routers from the configured subnets go first, in order of
+      the subnets list.
+    """
+
+    CUSTOMERS: str = "customers"
+    DEGREE: str = "degree"
+    LIFO: str = "lifo"
+    SUBNET: str = "subnet"
+
+    @classmethod
+    def keys(cls) -> List[str]:
+        """Returns list of the ordering names."""
+        return [cls.CUSTOMERS, cls.DEGREE, cls.LIFO, cls.SUBNET]
+
+
+class IFrontier(ABC):
+    """Crawl run list interface, routers are kept as int router-ids."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes all routers."""
+
+    @abstractmethod
+    def pop(self) -> int:
+        """Removes and returns the next router-id."""
+
+    @abstractmethod
+    def push(self, router_id: int) -> None:
+        """Adds router-id to the run list."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[int]:
+        """Returns iterator over the waiting router-ids."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Returns number of the waiting routers."""
+
+
+class LifoFrontier(IFrontier, BFastData):
+    """Depth-first run list."""
+
+    def __init__(self) -> None:
+        """LifoFrontier constructor."""
+        self._data[_Keys.ITEMS] = []
+
+    def clear(self) -> None:
+        """Removes all routers."""
+        self._data[_Keys.ITEMS].clear()
+
+    def pop(self) -> int:
+        """Removes and returns the last added router-id."""
+        return self._data[_Keys.ITEMS].pop()
+
+    def push(self, router_id: int) -> None:
+        """Adds router-id to the run list."""
+        self._data[_Keys.ITEMS].append(router_id)
+
+    def __iter__(self) -> Iterator[int]:
+        """Returns iterator over the waiting router-ids."""
+        return iter(self._data[_Keys.ITEMS])
+
+    def __len__(self) -> int:
+        """Returns number of the waiting routers."""
+        return len(self._data[_Keys.ITEMS])
+
+
+class PriorityFrontier(IFrontier, BFastData):
+    """Run list ordered by router score, highest first.
+
+    The score is computed once, when the router is added. Routers with
+    equal scores are taken in the depth-first order, so with no scores
+    known the walk is the same as with LifoFrontier.
+    """
+
+    def __init__(self, score: Callable[[int], float]) -> None:
+        """PriorityFrontier constructor.
+
+        ### Arguments:
+        - score [Callable[[int], float]] - returns score for router-id.
+        """
+        self._data[_Keys.ITEMS] = []
+        self._data[_Keys.COUNTER] = 0
+        self._data[_Keys.SCORE] = score
+
+    def clear(self) -> None:
+        """Removes all routers."""
+        self._data[_Keys.ITEMS].clear()
+
+    def pop(self) -> int:
+        """Removes and returns router-id with the highest score."""
+        return heapq.heappop(self._data[_Keys.ITEMS])[2]
+
+    def push(self, router_id: int) -> None:
+        """Adds router-id to the run list."""
+        self._data[_Keys.COUNTER] += 1
+        heapq.heappush(
+            self._data[_Keys.ITEMS],
+            (
+                -self._data[_Keys.SCORE](router_id),
+                -self._data[_Keys.COUNTER],
+                router_id,
+            ),
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        """Returns iterator over the waiting router-ids."""
+        return (item[2] for item in self._data[_Keys.ITEMS])
+
+    def __len__(self) -> int:
+        """Returns number of the waiting routers."""
+        return len(self._data[_Keys.ITEMS])
+
+
+class RouterHistory(BFastData):
+    """Per-router counts of connections and customers from the previous run.
+
+    Entries are loaded from database by DbProcessor, until then every
+    router has no history.
+    """
+
+    def __init__(self) -> None:
+        """RouterHistory constructor."""
+        self._data[_Keys.ENTRIES] = {}
+        self._data[_Keys.LOCK] = Lock()
+        self._data[_Keys.READY] = Event()
+
+    def load(self, rows: Iterable[Tuple[int, int, int]]) -> None:
+        """Loads (router-id, connections, customers) entries."""
+        with self._data[_Keys.LOCK]:
+            for router_id, connections, customers in rows:
+                self._data[_Keys.ENTRIES][router_id] = (connections, customers)
+        self._data[_Keys.READY].set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for entries loading, returns True if loaded."""
+        return self._data[_Keys.READY].wait(timeout)
+
+    def connections(self, router_id: int) -> int:
+        """Returns number of the router connections, 0 if not known."""
+        return self._data[_Keys.ENTRIES].get(router_id, (0, 0))[0]
+
+    def customers(self, router_id: int) -> int:
+        """Returns number of the router customers, 0 if not known."""
+        return self._data[_Keys.ENTRIES].get(router_id, (0, 0))[1]
+
+    def __len__(self) -> int:
+        """Returns number of entries."""
+        return len(self._data[_Keys.ENTRIES])
+
+
+def create_frontier(
+    order: str = FrontierOrder.LIFO,
+    history: Optional[RouterHistory] = None,
+    subnets: Optional[List[str]] = None,
+) -> IFrontier:
+    """Returns run list for the ordering.
+
+    ### Arguments:
+    - order [str] - one of FrontierOrder names.
+    - history [Optional[RouterHistory]] - previous run counts for DEGREE
+      and CUSTOMERS orderings.
+    - subnets [Optional[List[str]]] - 'a.b.c.d/prefix' networks for SUBNET
+      ordering, the first one has the highest priority.
+    """
+    if order == FrontierOrder.LIFO:
+        return LifoFrontier()
+    if order in (FrontierOrder.DEGREE, FrontierOrder.CUSTOMERS):
+        if history is None:
+            history = RouterHistory()
+        if order == FrontierOrder.DEGREE:
+            return PriorityFrontier(history.connections)
+        return PriorityFrontier(history.customers)
+    if order == FrontierOrder.SUBNET:
+        networks: List[Tuple[int, int]] = [
+            str_to_network(item) for item in subnets or []
+        ]
+
+        def score(router_id: int) -> float:
+            for nr, (network, prefix) in enumerate(networks):
+                if router_id & MASKS[prefix] == network:
+                    return len(networks) - nr
+            return 0
+
+        return PriorityFrontier(score)
+    raise Raise.error(
+        f"Expected one of {FrontierOrder.keys()}, received: '{order}'.",
+        ValueError,
+        "frontier",
+        currentframe(),
+    )
+
+
+# #[EOF]#######################################################################
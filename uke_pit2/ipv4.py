@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+  ipv4.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 18:40:52
+
+  Purpose: Integer based IPv4 helpers for hot paths.
+
+  Addresses are plain int, networks are (network, prefix) tuples.
+  'Address'/'Network' objects should be created only on API boundaries.
+"""
+
+import socket
+
+from functools import lru_cache
+from inspect import currentframe
+from typing import Tuple
+
+from jsktoolbox.raisetool import Raise
+
+# netmask for each prefix length
+MASKS: Tuple[int, ...] = tuple(
+    (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF for prefix in range(33)
+)
+
+
+@lru_cache(maxsize=65536)
+def str_to_int(address: str) -> int:
+    """Returns int for dotted IPv4 address string."""
+    octets = address.strip().split(".")
+    if len(octets) == 4:
+        out: int = 0
+        try:
+            for octet in octets:
+                value = int(octet)
+                if value < 0 or value > 255:
+                    break
+                out = out << 8 | value
+            else:
+                return out
+        except ValueError:
+            pass
+    raise Raise.error(
+        f"IPv4 address string expected, received: '{address}'.",
+        ValueError,
+        "ipv4",
+        currentframe(),
+    )
+
+
+def int_to_str(address: int) -> str:
+    """Returns dotted IPv4 address string for int."""
+    return socket.inet_ntoa(address.to_bytes(4, "big"))
+
+
+@lru_cache(maxsize=8192)
+def str_to_network(network: str) -> Tuple[int, int]:
+    """Returns (network, prefix) for 'a.b.c.d/prefix' string.
+
+    Address without prefix is returned as /32 network.
+    """
+    address, _, prefix = network.partition("/")
+    cidr: int = 32
+    if prefix:
+        if not prefix.strip().isdigit() or int(prefix) > 32:
+            raise Raise.error(
+                f"IPv4 network string expected, received: '{network}'.",
+                ValueError,
+                "ipv4",
+                currentframe(),
+            )
+        cidr = int(prefix)
+    return str_to_int(address) & MASKS[cidr], cidr
+
+
+def broadcast(network: int, prefix: int) -> int:
+    """Returns broadcast address of network."""
+    return network | (~MASKS[prefix] & 0xFFFFFFFF)
+
+
+def in_network(address: int, network: int, prefix: int) -> bool:
+    """Returns True if address belongs to network."""
+    return address & MASKS[prefix] == network
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+  logs.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 20:31:05
+
+  Purpose: Non-blocking logging pipeline built on jsktoolbox logstool.
+"""
+
+import os
+import sys
+import threading
+
+from collections import deque
+from inspect import currentframe
+from typing import Any, Deque, FrozenSet, Iterable, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.raisetool import Raise
+from jsktoolbox.libs.base_logs import Keys, LogsLevelKeys
+from jsktoolbox.logstool.engines import LoggerEngineFile
+from jsktoolbox.logstool.formatters import BLogFormatter
+from jsktoolbox.logstool.logs import (
+    LoggerClient,
+    LoggerEngine,
+    LoggerQueue,
+    ThLoggerProcessor,
+)
+
+LEVELS: FrozenSet[str] = frozenset(LogsLevelKeys.keys)
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    LINES: str = "__lines__"
+    SIZE: str = "__size__"
+
+
+class LogsQueue(LoggerQueue):
+    """Thread safe logger queue with levels filter.
+
+    'put' appends to a deque and never blocks the producer, messages for
+    disabled levels are dropped. The consumer drains messages in batches.
+    """
+
+    __messages: Optional[Deque[Tuple[str, str]]] = None
+    __levels: FrozenSet[str] = LEVELS
+    __ready: Optional[threading.Event] = None
+
+    def __init__(self, levels: Optional[Iterable[str]] = None) -> None:
+        """LogsQueue constructor.
+
+        ### Arguments:
+        - levels [Optional[Iterable[str]]] - enabled levels, all if None.
+        """
+        LoggerQueue.__init__(self)
+        self.__messages = deque()
+        self.__ready = threading.Event()
+        if levels is not None:
+            self.levels = levels
+
+    @property
+    def levels(self) -> FrozenSet[str]:
+        """Returns enabled levels."""
+        return self.__levels
+
+    @levels.setter
+    def levels(self, levels: Iterable[str]) -> None:
+        """Sets enabled levels."""
+        tmp: FrozenSet[str] = frozenset(levels)
+        if not tmp <= LEVELS:
+            raise Raise.error(
+                f"logs_level keys expected, received: '{sorted(tmp - LEVELS)}'.",
+                KeyError,
+                self._c_name,
+                currentframe(),
+            )
+        self.__levels = tmp
+
+    def enabled(self, log_level: str) -> bool:
+        """Returns True if messages with log_level are accepted."""
+        return log_level in self.__levels
+
+    def put(self, message: str, log_level: str = LogsLevelKeys.INFO) -> None:
+        """Put item to queue."""
+        if log_level not in self.__levels:
+            if log_level not in LEVELS:
+                raise Raise.error(
+                    f"logs_level key not found, '{log_level}' received.",
+                    KeyError,
+                    self._c_name,
+                    currentframe(),
+                )
+            return None
+        self.__messages.append((log_level, message))  # type: ignore
+        if not self.__ready.is_set():  # type: ignore
+            self.__ready.set()  # type: ignore
+
+    def get(self) -> Optional[Tuple[str, ...]]:
+        """Get item from queue.
+
+        Returns queue tuple[log_level:str, message:str] or None if empty.
+        """
+        try:
+            return self.__messages.popleft()  # type: ignore
+        except IndexError:
+            return None
+
+    def get_batch(self, size: int = 1000) -> List[Tuple[str, str]]:
+        """Returns up to size items from queue."""
+        out: List[Tuple[str, str]] = []
+        popleft = self.__messages.popleft  # type: ignore
+        try:
+            for _ in range(size):
+                out.append(popleft())
+        except IndexError:
+            pass
+        return out
+
+    def wait(self, timeout: float) -> bool:
+        """Waits for messages, returns True if queue is not empty."""
+        ready: bool = self.__ready.wait(timeout)  # type: ignore
+        self.__ready.clear()  # type: ignore
+        return ready or len(self.__messages) > 0  # type: ignore
+
+    @property
+    def size(self) -> int:
+        """Returns number of queued messages."""
+        return len(self.__messages)  # type: ignore
+
+
+class LogsClient(LoggerClient):
+    """LoggerClient with level checks and lazy formatting.
+
+    'debug', 'info', ... accept printf style arguments, the message is only
+    formatted if its level is enabled in LogsQueue.
+    The 'message_*' properties work as before.
+    """
+
+    def enabled(self, log_level: str) -> bool:
+        """Returns True if messages with log_level would be logged."""
+        queue: Optional[LoggerQueue] = self.logs_queue
+        if queue is None:
+            return False
+        if isinstance(queue, LogsQueue):
+            return queue.enabled(log_level)
+        return True
+
+    def message(self, message: Any, log_level: str = LogsLevelKeys.INFO) -> None:
+        """Send message to logging subsystem."""
+        queue: Optional[LoggerQueue] = self.logs_queue
+        if queue is None:
+            return None
+        if log_level not in LEVELS:
+            raise Raise.error(
+                f"Expected 'log_level' as key from LogsLevelKeys.keys, received: '{log_level}'.",
+                KeyError,
+                self._c_name,
+                currentframe(),
+            )
+        if isinstance(queue, LogsQueue) and not queue.enabled(log_level):
+            return None
+        if self.name is not None:
+            message = f"[{self.name}] {message}"
+        elif not isinstance(message, str):
+            message = f"{message}"
+        queue.put(message, log_level)
+
+    def log(self, log_level: str, message: str, *args: Any) -> None:
+        """Sends message formatted with 'message % args' if level is enabled."""
+        if not self.enabled(log_level):
+            return None
+        self.message(message % args if args else message, log_level)
+
+    def critical(self, message: str, *args: Any) -> None:
+        """Sends CRITICAL message."""
+        self.log(LogsLevelKeys.CRITICAL, message, *args)
+
+    def debug(self, message: str, *args: Any) -> None:
+        """Sends DEBUG message."""
+        self.log(LogsLevelKeys.DEBUG, message, *args)
+
+    def error(self, message: str, *args: Any) -> None:
+        """Sends ERROR message."""
+        self.log(LogsLevelKeys.ERROR, message, *args)
+
+    def info(self, message: str, *args: Any) -> None:
+        """Sends INFO message."""
+        self.log(LogsLevelKeys.INFO, message, *args)
+
+    def notice(self, message: str, *args: Any) -> None:
+        """Sends NOTICE message."""
+        self.log(LogsLevelKeys.NOTICE, message, *args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        """Sends WARNING message."""
+        self.log(LogsLevelKeys.WARNING, message, *args)
+
+
+class LoggerEngineBufferedFile(LoggerEngineFile):
+    """FILE Logger engine with buffered writes.
+
+    Formatted lines are collected in memory and appended to the file with
+    a single write when 'size' lines are waiting or on 'flush'.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        formatter: Optional[BLogFormatter] = None,
+        size: int = 1000,
+    ) -> None:
+        """LoggerEngineBufferedFile constructor.
+
+        ### Arguments:
+        - name [Optional[str]] - engine name,
+        - formatter [Optional[BLogFormatter]] - messages formatter,
+        - size [int] - number of lines kept in buffer.
+        """
+        LoggerEngineFile.__init__(self, name=name, formatter=formatter, buffered=True)
+        self._data[_Keys.LINES] = []
+        self._data[_Keys.SIZE] = size
+
+    def send(self, message: str) -> None:
+        """Send message to buffer."""
+        if self._data[Keys.FORMATTER]:
+            message = self._data[Keys.FORMATTER].format(message, self.name)
+        lines: List[str] = self._data[_Keys.LINES]
+        lines.append(message)
+        if len(lines) >= self._data[_Keys.SIZE]:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered lines to file."""
+        lines: List[str] = self._data[_Keys.LINES]
+        if not lines:
+            return None
+        if self.logfile is None:
+            raise Raise.error(
+                f"The {self._c_name} is not configured correctly.",
+                ValueError,
+                self._c_name,
+                currentframe(),
+            )
+        log_dir: str = self.logdir if self.logdir else ""
+        with open(os.path.join(log_dir, self.logfile), "a") as file:
+            file.write("\n".join(lines))
+            file.write("\n")
+        lines.clear()
+
+
+class LogsEngine(LoggerEngine):
+    """LoggerEngine draining LogsQueue in batches.
+
+    Engines with 'flush' method and stdout are flushed after every drain.
+    """
+
+    BATCH: int = 1000
+
+    def __init__(self) -> None:
+        """LogsEngine constructor."""
+        LoggerEngine.__init__(self)
+        self.logs_queue = LogsQueue()
+
+    @property
+    def levels(self) -> FrozenSet[str]:
+        """Returns levels with configured engines."""
+        return frozenset(self.__conf().keys())
+
+    def __conf(self) -> dict:
+        """Returns active level to engines mapping."""
+        if Keys.CONF in self._data and len(self._data[Keys.CONF]) > 0:
+            return self._data[Keys.CONF]
+        return self._data[Keys.NO_CONF]
+
+    def send(self) -> None:
+        """Sends queued messages to the configured logging subsystem."""
+        queue: Optional[LoggerQueue] = self.logs_queue
+        if not isinstance(queue, LogsQueue):
+            LoggerEngine.send(self)
+            return None
+        conf: dict = self.__conf()
+        sent: bool = False
+        while True:
+            batch: List[Tuple[str, str]] = queue.get_batch(self.BATCH)
+            if not batch:
+                break
+            sent = True
+            for log_level, message in batch:
+                for engine in conf.get(log_level, ()):
+                    engine.send(message)
+        if sent:
+            self.flush()
+
+    def flush(self) -> None:
+        """Flushes buffered engines."""
+        for engines in self.__conf().values():
+            for engine in engines:
+                if isinstance(engine, LoggerEngineBufferedFile):
+                    engine.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+class ThLogsProcessor(ThLoggerProcessor):
+    """Logger processor thread woken up by incoming messages.
+
+    With LogsQueue the thread waits for messages up to 'sleep_period'
+    instead of sleeping unconditionally.
+    """
+
+    def run(self) -> None:
+        """Start the procedure."""
+        engine: Optional[LoggerEngine] = self.logger_engine
+        if engine is None or not isinstance(engine.logs_queue, LogsQueue):
+            ThLoggerProcessor.run(self)
+            return None
+        queue: LogsQueue = engine.logs_queue
+        if self.logger_client is None:
+            raise Raise.error(
+                "LoggerClient not set.",
+                ValueError,
+                self._c_name,
+                currentframe(),
+            )
+        if self._debug:
+            self.logger_client.message_debug = f"[{self._c_name}] starting..."
+        while not self.stopped:
+            if queue.wait(self.sleep_period):
+                engine.send()
+        if self._debug:
+            self.logger_client.message_debug = f"[{self._c_name}] stopped."
+        engine.send()
+
+
+# #[EOF]#######################################################################
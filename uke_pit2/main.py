@@ -8,9 +8,10 @@
 """
 
 from queue import Queue
-import os, sys, time, signal
+import os, sys, signal, tempfile
 
 from inspect import currentframe
+from threading import Thread
 from typing import Optional, List
 
 from jsktoolbox.attribtool import ReadOnlyClass
@@ -19,43 +20,94 @@ from jsktoolbox.libs.system import CommandLineParser
 from jsktoolbox.netaddresstool.ipv4 import Address
 from jsktoolbox.logstool.logs import (
     LoggerEngine,
-    LoggerClient,
     LoggerEngineStdout,
-    LoggerEngineFile,
     LoggerQueue,
     LogsLevelKeys,
-    ThLoggerProcessor,
 )
 from jsktoolbox.logstool.formatters import LogFormatterNull, LogFormatterDateTime
 from jsktoolbox.libs.system import Env
 from jsktoolbox.stringtool.crypto import SimpleCrypto
 
 from uke_pit2.base import BVerbose, BaseApp, BModuleConfig
+from uke_pit2.checkpoint import CrawlCheckpoint
 from uke_pit2.conf import Config
-from uke_pit2.processor import DbProcessor, Processor
-from uke_pit2.rb import RBData
+from uke_pit2.db import Database, DbBackends, DbConfig
+from uke_pit2.frontier import FrontierOrder, RouterHistory, create_frontier
+from uke_pit2.ipv4 import str_to_network
+from uke_pit2.logs import (
+    LEVELS,
+    LoggerEngineBufferedFile,
+    LogsClient,
+    LogsEngine,
+    LogsQueue,
+    ThLogsProcessor,
+)
+from uke_pit2.metrics import CrawlMetrics
+from uke_pit2.network import RouterTimeouts
+from uke_pit2.processor import Crawler, DbProcessor, Processor
+from uke_pit2.rb import CollectorCache
+from uke_pit2.report import Report
+from uke_pit2.shutdown import ShutdownCoordinator
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
     """Internal _Keys container class."""
 
+    CHECKPOINT: str = "checkpoint_file"
+    COMMAND_TIMEOUT: str = "command_timeout"
     CONFIGURED: str = "__conf_ok__"
-    OUTPUT_DIR: str = "__output_dir__"
+    CONNECT_TIMEOUT: str = "connect_timeout"
+    FRONTIER_ORDER: str = "frontier_order"
+    LOGIN_TIMEOUT: str = "login_timeout"
+    METRICS_JSON: str = "metrics_json"
+    METRICS_TEXTFILE: str = "metrics_textfile"
+    OSPF_BOOTSTRAP: str = "ospf_bootstrap"
+    OUTPUT_DIR: str = "output_dir"
     PASSWORDS: str = "router_passwords"
+    PRIORITY_SUBNETS: str = "priority_subnets"
+    ROUTER_TIMEOUT: str = "router_timeout"
     SET_DB_PASS: str = "__set_db_pass__"
+    SET_FULL: str = "__set_full__"
     SET_IP: str = "__set_ip__"
+    SET_OUTPUT_DIR: str = "__set_output_dir__"
     SET_PASS: str = "__set_pass__"
+    SET_RESUME: str = "__set_resume__"
     SET_STOP: str = "__set_stop__"
     SET_TEST: str = "__set_test__"
     START_IP: str = "start_ip"
     TEST_RANGE: str = "__test_routers_range__"
     TEST_START_IP: str = "__test_start_ip__"
     VERBOSE: str = "__verbose__"
+    VERSION_CHECK: str = "version_check_runs"
+    WORKERS: str = "workers"
 
 
 class _ModuleConf(BModuleConfig):
     """Module config private class."""
 
+    @property
+    def checkpoint_file(self) -> str:
+        """Returns path of the crawl checkpoint file."""
+        var: Optional[str] = self._get(_Keys.CHECKPOINT)
+        if not var:
+            return os.path.join(tempfile.gettempdir(), "uke-pit-spider.checkpoint")
+        return var
+
+    @property
+    def router_timeouts(self) -> RouterTimeouts:
+        """Returns per-router time budget, defaults for missing values."""
+        out = RouterTimeouts()
+        for key, name in (
+            (_Keys.CONNECT_TIMEOUT, "connect"),
+            (_Keys.LOGIN_TIMEOUT, "login"),
+            (_Keys.COMMAND_TIMEOUT, "command"),
+            (_Keys.ROUTER_TIMEOUT, "total"),
+        ):
+            var: Optional[float] = self._get(key)
+            if isinstance(var, (int, float)) and var > 0:
+                setattr(out, name, float(var))
+        return out
+
     @property
     def start_ip(self) -> Optional[Address]:
         """Returns starting IP address for procedure."""
@@ -72,6 +124,53 @@ class _ModuleConf(BModuleConfig):
             return []
         return var
 
+    @property
+    def frontier_order(self) -> str:
+        """Returns run list ordering name."""
+        var: Optional[str] = self._get(_Keys.FRONTIER_ORDER)
+        if var not in FrontierOrder.keys():
+            return FrontierOrder.DEGREE
+        return var  # type: ignore
+
+    @property
+    def priority_subnets(self) -> List[str]:
+        """Returns list of networks collected first with 'subnet' ordering."""
+        var: Optional[List[str]] = self._get(_Keys.PRIORITY_SUBNETS)
+        if not var or not isinstance(var, List):
+            return []
+        out: List[str] = []
+        for item in var:
+            try:
+                str_to_network(item)
+            except ValueError:
+                continue
+            out.append(item)
+        return out
+
+    @property
+    def metrics_json(self) -> Optional[str]:
+        """Returns path of the crawl metrics JSON file."""
+        var: Optional[str] = self._get(_Keys.METRICS_JSON)
+        if not var:
+            return None
+        return var
+
+    @property
+    def metrics_textfile(self) -> Optional[str]:
+        """Returns path of the crawl metrics Prometheus textfile."""
+        var: Optional[str] = self._get(_Keys.METRICS_TEXTFILE)
+        if not var:
+            return None
+        return var
+
+    @property
+    def ospf_bootstrap(self) -> bool:
+        """Returns flag of the run list seeding from OSPF LSDB."""
+        var: Optional[bool] = self._get(_Keys.OSPF_BOOTSTRAP)
+        if var is None:
+            return False
+        return var
+
     @property
     def output_dir(self) -> Optional[str]:
         """Returns output dir string for reports."""
@@ -80,10 +179,29 @@ class _ModuleConf(BModuleConfig):
             return None
         return var
 
+    @property
+    def version_check_runs(self) -> int:
+        """Returns number of runs using cached collector selection."""
+        var: Optional[int] = self._get(_Keys.VERSION_CHECK)
+        if var is None or not isinstance(var, int):
+            return 10
+        return var
+
+    @property
+    def workers(self) -> int:
+        """Returns number of concurrent report generation jobs."""
+        var: Optional[int] = self._get(_Keys.WORKERS)
+        if not var or not isinstance(var, int):
+            return 4
+        return var
+
 
 class SpiderApp(BaseApp, BVerbose):
     """Spider main class."""
 
+    DB_STOP_TIMEOUT: float = 120.0
+    LOGS_STOP_TIMEOUT: float = 5.0
+
     def __init__(self) -> None:
         """SpiderAdd constructor."""
 
@@ -91,20 +209,20 @@ class SpiderApp(BaseApp, BVerbose):
         self.section = self._c_name
 
         # logging subsystem
-        log_engine = LoggerEngine()
+        log_engine = LogsEngine()
         log_queue: Optional[LoggerQueue] = log_engine.logs_queue
         if not log_queue:
-            log_queue = LoggerQueue()
+            log_queue = LogsQueue()
             log_engine.logs_queue = log_queue
 
         # logger levels
         self.__init_log_levels(log_engine)
 
         # logger client
-        self.logs = LoggerClient()
+        self.logs = LogsClient()
 
         # logger processor
-        thl = ThLoggerProcessor()
+        thl = ThLogsProcessor()
         thl.sleep_period = 0.2
         thl.logger_engine = log_engine
         thl.logger_client = self.logs
@@ -130,6 +248,13 @@ class SpiderApp(BaseApp, BVerbose):
 
         # update debug
         self.logs_processor._debug = self.conf.debug
+        if (
+            not self.conf.debug
+            and not self.verbose
+            and isinstance(log_queue, LogsQueue)
+        ):
+            # DEBUG messages are dropped before formatting
+            log_queue.levels = LEVELS - {LogsLevelKeys.DEBUG}
 
         # signal handling
         signal.signal(signal.SIGTERM, self.__sig_exit)
@@ -149,11 +274,7 @@ class SpiderApp(BaseApp, BVerbose):
         self.logs_processor.start()
 
         # data
-        ips: List[Address] = []
         run_limit: int = 5
-        th_proc: List[Processor] = []
-        th_run: List[Processor] = []
-        count: int = 0
         count_limit: int = 0
         comms_queue: Queue = Queue()
 
@@ -175,10 +296,33 @@ class SpiderApp(BaseApp, BVerbose):
             else:
                 start_ip = self.module_conf.start_ip
 
+            # phase timings
+            metrics = CrawlMetrics()
+
+            # collector selection cache, loaded by database processor
+            versions: Optional[CollectorCache] = None
+            if self.module_conf.version_check_runs > 0:
+                versions = CollectorCache(self.module_conf.version_check_runs)
+
+            # previous run counts for run list ordering
+            history: Optional[RouterHistory] = None
+            if self.module_conf.frontier_order in (
+                FrontierOrder.DEGREE,
+                FrontierOrder.CUSTOMERS,
+            ):
+                history = RouterHistory()
+
             # set up database processor
             db_proc: DbProcessor = DbProcessor(
-                self.logs.logs_queue, comms_queue, self.conf.debug, self.verbose
+                self.logs.logs_queue,
+                comms_queue,
+                self.conf.debug,
+                self.verbose,
+                metrics,
+                versions,
+                history,
             )
+            db_proc.db_backend = self.conf.module_conf.lms_backend
             db_proc.db_host = self.conf.module_conf.lms_host
             db_proc.db_port = self.conf.module_conf.lms_port
             db_proc.db_database = self.conf.module_conf.lms_database
@@ -188,100 +332,92 @@ class SpiderApp(BaseApp, BVerbose):
                     [self.conf.module_conf.lms_password]
                 )[0]
             db_proc.start()
+            # crawl does not need to wait for a slow database
+            if versions is not None:
+                versions.wait(5.0)
+            if history is not None:
+                history.wait(5.0)
 
             # starting data
-            ips.append(start_ip)
             passwords: List[str] = self.__password_decryptor(
                 self.module_conf.router_passwords
             )
-            th_proc.append(
-                Processor(
-                    self.logs.logs_queue,
-                    start_ip,
-                    passwords,
-                    self.conf.debug,
-                    self.verbose,
-                )
+            processor = Processor(
+                self.logs.logs_queue,
+                passwords,
+                self.conf.debug,
+                self.verbose,
+                metrics,
+                versions=versions,
+                timeouts=self.module_conf.router_timeouts,
+            )
+            shutdown = ShutdownCoordinator()
+            crawler = Crawler(
+                self.logs.logs_queue,
+                processor,
+                comms_queue,
+                run_limit,
+                self.conf.debug,
+                CrawlCheckpoint(self.module_conf.checkpoint_file),
+                shutdown,
+                create_frontier(
+                    self.module_conf.frontier_order,
+                    history,
+                    self.module_conf.priority_subnets,
+                ),
+            )
+            crawler.run(
+                start_ip,
+                count_limit,
+                lambda: self.stop,
+                self.module_conf.ospf_bootstrap,
+                _Keys.SET_RESUME in self._data,
             )
 
-            while th_proc or th_run:
-
-                # add new processor to run list
-                if len(th_run) < run_limit:
-                    if th_proc:
-                        obj: Processor = th_proc.pop()
-                        obj.start()
-                        th_run.append(obj)
-
-                # check run list
-                for obj in th_run:
-                    if not obj.is_alive():
-                        count += 1
-                        # add neighbor routers
-                        rb: Optional[RBData] = obj.router_data()
-                        if rb:
-                            # add router-id
-                            rb.router_id = obj.ip
-                            # add to database queue
-                            comms_queue.put(rb)
-                        if rb and rb.routers:
-                            for item in rb.routers:
-                                if "router-id" in item and item["router-id"] not in ips:
-                                    ip: Address = item["router-id"]
-                                    self.logs.message_debug = f"add {ip} to router list"
-                                    ips.append(ip)
-                                    th_proc.append(
-                                        Processor(
-                                            self.logs.logs_queue,
-                                            ip,
-                                            passwords,
-                                            self.conf.debug,
-                                            self.verbose,
-                                        )
-                                    )
-
-                        # join
-                        obj.join()
-
-                        # remove finished processor
-                        th_run.remove(obj)
-
-                # break for coffee
-                time.sleep(0.2)
-
-                if count_limit > 0 and count == count_limit:
-                    # short procedure for debugging purpose
-                    break
-
-                if self.stop:
-                    # TERM or INT signal was set
-                    break
-
-            # cleanup after break
-            while th_run:
-                for obj in th_run:
-                    if not obj.is_alive():
-                        obj.join()
-                        time.sleep(0.2)
-                        th_run.remove(obj)
-
-            # database processor
-            db_proc.stop()
-            while db_proc.is_alive():
-                time.sleep(0.1)
-            db_proc.join()
+            # database processor, queued routers are written before exit
+            db_proc.purge = crawler.complete
+            if not shutdown.run(
+                "db_flush",
+                lambda timeout: self.__join(db_proc, timeout),
+                self.DB_STOP_TIMEOUT,
+            ):
+                self.logs.message_error = (
+                    f"database processor not stopped in {self.DB_STOP_TIMEOUT}s, "
+                    f"{comms_queue.qsize()} routers left in queue"
+                )
 
-        # exit
-        time.sleep(1)
+            # crawl summary
+            self.__metrics_report(metrics, shutdown)
 
         # logger processor
-        self.logs_processor.stop()
-        while not self.logs_processor.is_stopped:
-            self.logs_processor.join()
-            time.sleep(0.1)
+        self.__join(self.logs_processor, self.LOGS_STOP_TIMEOUT)
 
         sys.exit(0)
 
+    @staticmethod
+    def __join(thread: Thread, timeout: float) -> bool:
+        """Stops thread, returns True if it ended before timeout."""
+        thread.stop()  # type: ignore
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def __metrics_report(
+        self, metrics: CrawlMetrics, shutdown: ShutdownCoordinator
+    ) -> None:
+        """Logs crawl summary and writes configured metrics files."""
+        self.logs.message_notice = "########################"
+        self.logs.message_notice = "Crawl summary"
+        for line in metrics.summary() + shutdown.summary():
+            self.logs.message_notice = line
+        self.logs.message_notice = "########################"
+        try:
+            if self.module_conf.metrics_json:
+                metrics.write_json(self.module_conf.metrics_json)
+            if self.module_conf.metrics_textfile:
+                metrics.write_prometheus(self.module_conf.metrics_textfile)
+        except OSError as e:
+            self.logs.message_error = f"metrics file writing error: {e}"
+
     def __sig_exit(self, signum: int, frame) -> None:
         """Received TERM|INT signal."""
         if self.conf and self.conf.debug:
@@ -307,6 +443,9 @@ class SpiderApp(BaseApp, BVerbose):
         parser.configure_argument(
             "p", "dbpassword", "set user password for lms database connection."
         )
+        parser.configure_argument(
+            "r", "resume", "continue the crawl saved in checkpoint file."
+        )
         parser.configure_argument("T", "test", "for developer tests.")
         parser.configure_argument("v", "verbose", "verbose flag for debugging.")
 
@@ -349,6 +488,9 @@ class SpiderApp(BaseApp, BVerbose):
                     self._data[_Keys.SET_DB_PASS] = password
                     break
 
+        if parser.get_option("resume") is not None:
+            self._data[_Keys.SET_RESUME] = True
+
         if parser.get_option("test") is not None:
             # set test flag
             self.tests = True
@@ -412,6 +554,72 @@ class SpiderApp(BaseApp, BVerbose):
                 value=[],
                 desc="[List] list of passwords for routers",
             )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.METRICS_JSON,
+                value="",
+                desc="[str] optional path of the crawl metrics JSON file.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.METRICS_TEXTFILE,
+                value="",
+                desc="[str] optional path of the crawl metrics Prometheus textfile.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.OSPF_BOOTSTRAP,
+                value=False,
+                desc="[bool] seed the router list from OSPF LSDB of the originating router.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.VERSION_CHECK,
+                value=10,
+                desc="[int] runs using cached RouterOS version before checking it again, 0 disables the cache.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.CHECKPOINT,
+                value="",
+                desc="[str] crawl checkpoint file for '--resume', system temp dir if empty.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.CONNECT_TIMEOUT,
+                value=5,
+                desc="[int] router API connection timeout in seconds.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.LOGIN_TIMEOUT,
+                value=10,
+                desc="[int] router API login timeout in seconds.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.COMMAND_TIMEOUT,
+                value=30,
+                desc="[int] router API command reply timeout in seconds.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.ROUTER_TIMEOUT,
+                value=120,
+                desc="[int] time budget of a router from ICMP check to the last menu in seconds.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.FRONTIER_ORDER,
+                value=FrontierOrder.DEGREE,
+                desc=f"[str] router list ordering, one of: {', '.join(FrontierOrder.keys())}.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.PRIORITY_SUBNETS,
+                value=[],
+                desc="[List] networks collected first with 'subnet' ordering, for example: '10.0.0.0/24'.",
+            )
             if not self.conf.save():
                 raise Raise.error(
                     "Configuration file writing error.",
@@ -523,6 +731,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->ALERT",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # DEBUG
@@ -532,6 +741,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->DEBUG",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # ERROR
@@ -541,6 +751,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->ERROR",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # NOTICE
@@ -550,9 +761,10 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->NOTICE",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
-        lff_notice = LoggerEngineFile(
+        lff_notice = LoggerEngineBufferedFile(
             name=f"{self._c_name}", formatter=LogFormatterDateTime()
         )
         lff_notice.logdir = "/tmp"
@@ -569,9 +781,10 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->CRITICAL",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
-        lff_critical = LoggerEngineFile(
+        lff_critical = LoggerEngineBufferedFile(
             name=f"{self._c_name}", formatter=LogFormatterDateTime()
         )
         lff_critical.logdir = "/tmp"
@@ -587,6 +800,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->EMERGENCY",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # INFO
@@ -596,6 +810,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=self._c_name,
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # WARNING
@@ -605,6 +820,7 @@ class SpiderApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->WARNING",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
 
@@ -656,6 +872,8 @@ class SpiderApp(BaseApp, BVerbose):
 class UkeApp(BaseApp, BVerbose):
     """UKE PIT generator main class."""
 
+    LOGS_STOP_TIMEOUT: float = 5.0
+
     def __init__(self) -> None:
         """UKE generator constructor."""
 
@@ -663,20 +881,20 @@ class UkeApp(BaseApp, BVerbose):
         self.section = self._c_name
 
         # logging subsystem
-        log_engine = LoggerEngine()
+        log_engine = LogsEngine()
         log_queue: Optional[LoggerQueue] = log_engine.logs_queue
         if not log_queue:
-            log_queue = LoggerQueue()
+            log_queue = LogsQueue()
             log_engine.logs_queue = log_queue
 
         # logger levels
         self.__init_log_levels(log_engine)
 
         # logger client
-        self.logs = LoggerClient()
+        self.logs = LogsClient()
 
         # logger processor
-        thl = ThLoggerProcessor()
+        thl = ThLogsProcessor()
         thl.sleep_period = 0.2
         thl.logger_engine = log_engine
         thl.logger_client = self.logs
@@ -702,6 +920,13 @@ class UkeApp(BaseApp, BVerbose):
 
         # update debug
         self.logs_processor._debug = self.conf.debug
+        if (
+            not self.conf.debug
+            and not self.verbose
+            and isinstance(log_queue, LogsQueue)
+        ):
+            # DEBUG messages are dropped before formatting
+            log_queue.levels = LEVELS - {LogsLevelKeys.DEBUG}
 
         # signal handling
         signal.signal(signal.SIGTERM, self.__sig_exit)
@@ -717,6 +942,59 @@ class UkeApp(BaseApp, BVerbose):
         if not self.conf:
             return None
 
+        # logger processor
+        self.logs_processor.start()
+
+        # main procedure
+        if (
+            self.configured
+            and not self.stop
+            and self.logs.logs_queue
+            and self.module_conf.output_dir
+            and self.conf.module_conf
+            and (
+                self.conf.module_conf.lms_host
+                or self.conf.module_conf.lms_backend == DbBackends.SQLITE
+            )
+        ):
+            # database connection
+            conf = DbConfig()
+            conf.backend = self.conf.module_conf.lms_backend
+            conf.host = self.conf.module_conf.lms_host  # type: ignore
+            conf.port = self.conf.module_conf.lms_port  # type: ignore
+            conf.database = self.conf.module_conf.lms_database  # type: ignore
+            conf.user = self.conf.module_conf.lms_user  # type: ignore
+            if self.conf.module_conf.lms_password:
+                conf.password = self.__password_decryptor(
+                    [self.conf.module_conf.lms_password]
+                )[0]
+            database = Database(
+                self.logs.logs_queue, conf, self.conf.debug, self.verbose
+            )
+            if database.create_connection():
+                report = Report(
+                    self.logs.logs_queue,
+                    database,
+                    self.module_conf.output_dir,
+                    self.conf.debug,
+                    self.verbose,
+                    workers=self.module_conf.workers,
+                    incremental=True,
+                )
+                if not report.generate(force=_Keys.SET_FULL in self._data):
+                    self.logs.message_error = "report was generated with errors"
+                if self.verbose:
+                    for name, value in report.timings.items():
+                        self.logs.message_debug = f"{name}: {value:.3f}s"
+            else:
+                self.logs.message_critical = "connection to database error."
+
+        # logger processor
+        self.logs_processor.stop()
+        self.logs_processor.join(self.LOGS_STOP_TIMEOUT)
+
+        sys.exit(0)
+
     def __sig_exit(self, signum: int, frame) -> None:
         """Received TERM|INT signal."""
         if self.conf and self.conf.debug:
@@ -733,12 +1011,93 @@ class UkeApp(BaseApp, BVerbose):
                 currentframe(),
             )
 
+        if self.conf.cfh.has_section(self.section):
+            self.logs.message_debug = f"Found section: [{self.section}]"
+        else:
+            self.logs.message_debug = f"Section: [{self.section}] not found..."
+            self.logs.message_debug = "...creating a default module configuration"
+            # create section
+            self.conf.cfh.set(self.section, desc="The generator configuration section")
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.OUTPUT_DIR,
+                value="",
+                desc="[str] output directory for reports.",
+            )
+            self.conf.cfh.set(
+                self.section,
+                varname=_Keys.WORKERS,
+                value=4,
+                desc="[int] number of concurrent report jobs, 1 for sequential run.",
+            )
+            if not self.conf.save():
+                raise Raise.error(
+                    "Configuration file writing error.",
+                    OSError,
+                    self._c_name,
+                    currentframe(),
+                )
+
+        # check command line updates
+        if _Keys.SET_OUTPUT_DIR in self._data:
+            self.conf.cfh.set(
+                section=self.section,
+                varname=_Keys.OUTPUT_DIR,
+                value=self._data[_Keys.SET_OUTPUT_DIR],
+            )
+            if not self.conf.save():
+                raise Raise.error(
+                    "Configuration file writing error.",
+                    OSError,
+                    self._c_name,
+                    currentframe(),
+                )
+            self.conf.reload()
+
+        # set module conf
+        self.module_conf = _ModuleConf(self.conf.cfh, self.section)
+
+        # check configuration
+        configured: bool = True
+        if not self.module_conf.output_dir:
+            self.logs.message_alert = f"'{_Keys.OUTPUT_DIR}' is not set."
+            configured = False
+
+        self.configured = configured
+
+        if not configured:
+            self.logs.message_critical = (
+                f"module [{self.section}] is not configured properly."
+            )
+            self.logs.message_critical = "use command line options"
+
+    def __password_decryptor(self, passwords: List[str]) -> List[str]:
+        """Decrypt configured passwords."""
+        if not isinstance(passwords, list):
+            raise Raise.error(
+                f"Expecter list type, received: '{type(passwords)}'",
+                TypeError,
+                self._c_name,
+                currentframe(),
+            )
+        out: List[str] = []
+        if self.conf and self.conf.module_conf:
+            for item in passwords:
+                if item and len(item) > 6:
+                    out.append(
+                        SimpleCrypto.multiple_decrypt(self.conf.module_conf.salt, item)
+                    )
+        return out
+
     def __init_command_line(self) -> None:
         """Initialize command line."""
         parser = CommandLineParser()
 
         # configuration for arguments
         parser.configure_argument("h", "help", "this information.")
+        parser.configure_argument(
+            "f", "full", "regenerate all report sections, ignore previous results."
+        )
         parser.configure_argument(
             "o",
             "output_dir",
@@ -761,11 +1120,16 @@ class UkeApp(BaseApp, BVerbose):
         if parser.get_option("test") is not None:
             # set test flag
             self.tests = True
+        if parser.get_option("full") is not None:
+            # ignore manifest of the previous report
+            self._data[_Keys.SET_FULL] = True
         if parser.get_option("output_dir") is not None:
             # set new output dir for reports
             out = parser.get_option("output_dir")
             if out:
-                print(out)
+                self._data[_Keys.SET_OUTPUT_DIR] = os.path.abspath(
+                    os.path.expanduser(out)
+                )
             else:
                 self.logs.message_critical = f"'output_dir' is required."
                 self.stop = True
@@ -779,6 +1143,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->ALERT",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # DEBUG
@@ -788,6 +1153,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->DEBUG",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # ERROR
@@ -797,6 +1163,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->ERROR",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # NOTICE
@@ -806,6 +1173,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->NOTICE",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # CRITICAL
@@ -815,6 +1183,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->CRITICAL",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # EMERGENCY
@@ -824,6 +1193,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->EMERGENCY",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # INFO
@@ -833,6 +1203,7 @@ class UkeApp(BaseApp, BVerbose):
                 name=self._c_name,
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
         # WARNING
@@ -842,8 +1213,53 @@ class UkeApp(BaseApp, BVerbose):
                 name=f"{self._c_name}->WARNING",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
+                buffered=True,
             ),
         )
 
+    @property
+    def module_conf(self) -> _ModuleConf:
+        """Return module conf object."""
+        return self._get_data(key=_ModuleConf.Keys.MODCONF, set_default_type=_ModuleConf)  # type: ignore
+
+    @module_conf.setter
+    def module_conf(self, value: _ModuleConf) -> None:
+        """Sets ModuleConf object."""
+        self._set_data(key=_ModuleConf.Keys.MODCONF, value=value)
+
+    @property
+    def configured(self) -> bool:
+        """Returns configured flag."""
+        return self._get_data(key=_Keys.CONFIGURED, set_default_type=bool, default_value=False)  # type: ignore
+
+    @configured.setter
+    def configured(self, flag: bool) -> None:
+        """Sets configured flag."""
+        self._set_data(key=_Keys.CONFIGURED, value=flag)
+
+    @property
+    def stop(self) -> bool:
+        """Returns STOP flag."""
+        return self._get_data(
+            key=_Keys.SET_STOP, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @stop.setter
+    def stop(self, flag: bool) -> None:
+        """Sets STOP flag."""
+        self._set_data(key=_Keys.SET_STOP, value=flag)
+
+    @property
+    def tests(self) -> bool:
+        """Returns tests flag."""
+        return self._get_data(
+            key=_Keys.SET_TEST, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @tests.setter
+    def tests(self, flag: bool) -> None:
+        """Sets tests flag."""
+        self._set_data(key=_Keys.SET_TEST, set_default_type=bool, value=flag)
+
 
 # #[EOF]#######################################################################
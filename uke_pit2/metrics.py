@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+  metrics.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 21:40:18
+
+  Purpose: Crawl metrics, per phase timing histograms.
+"""
+
+import json
+import os
+import time
+
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.libs.base_data import BData
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    COUNTERS: str = "__counters__"
+    HISTOGRAMS: str = "__histograms__"
+    LOCK: str = "__lock__"
+    START: str = "__start__"
+
+
+class Histogram(object):
+    """Timing histogram with fixed buckets in seconds."""
+
+    BUCKETS: Tuple[float, ...] = (
+        0.001,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+    )
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        """Histogram constructor."""
+        # last item counts values over the last bucket
+        self.counts: List[int] = [0] * (len(self.BUCKETS) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Adds value to histogram."""
+        idx: int = 0
+        for idx, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                break
+        else:
+            idx = len(self.BUCKETS)
+        self.counts[idx] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Returns estimated quantile, upper bound of the matching bucket."""
+        if not self.count:
+            return 0.0
+        rank: float = q * self.count
+        cumulative: int = 0
+        for idx, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                if idx < len(self.BUCKETS):
+                    return min(self.BUCKETS[idx], self.max)
+                break
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns histogram as dict."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min, 6),
+            "max": round(self.max, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "buckets": dict(
+                zip([str(bound) for bound in self.BUCKETS] + ["+Inf"], self.counts)
+            ),
+        }
+
+
+class CrawlMetrics(BData):
+    """Thread safe registry of crawl phase timings and counters.
+
+    Timings are kept per (phase, detail) pair, for example
+    ('connect', 'password 1') or ('fetch', '/ip/address/').
+    """
+
+    PREFIX: str = "uke_pit_spider"
+
+    def __init__(self) -> None:
+        """CrawlMetrics constructor."""
+        self._data[_Keys.COUNTERS] = {}
+        self._data[_Keys.HISTOGRAMS] = {}
+        self._data[_Keys.LOCK] = Lock()
+        self._data[_Keys.START] = time.time()
+
+    def observe(self, phase: str, seconds: float, detail: str = "") -> None:
+        """Adds timing of phase."""
+        histograms: Dict[Tuple[str, str], Histogram] = self._data[_Keys.HISTOGRAMS]
+        with self._data[_Keys.LOCK]:
+            item: Optional[Histogram] = histograms.get((phase, detail))
+            if item is None:
+                item = histograms[(phase, detail)] = Histogram()
+            item.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase: str, detail: str = "") -> Iterator[None]:
+        """Context manager measuring phase time."""
+        start: float = time.perf_counter()
+        try:
+            yield None
+        finally:
+            self.observe(phase, time.perf_counter() - start, detail)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increments counter."""
+        counters: Dict[str, int] = self._data[_Keys.COUNTERS]
+        with self._data[_Keys.LOCK]:
+            counters[name] = counters.get(name, 0) + value
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Returns copy of counters."""
+        with self._data[_Keys.LOCK]:
+            return dict(self._data[_Keys.COUNTERS])
+
+    @property
+    def histograms(self) -> Dict[Tuple[str, str], Histogram]:
+        """Returns histograms ordered by phase and detail."""
+        with self._data[_Keys.LOCK]:
+            return dict(sorted(self._data[_Keys.HISTOGRAMS].items()))
+
+    def summary(self) -> List[str]:
+        """Returns summary lines for logs."""
+        out: List[str] = [f"* Duration: {time.time() - self._data[_Keys.START]:.1f}s"]
+        for name, value in sorted(self.counters.items()):
+            out.append(f"* {name}: {value}")
+        for (phase, detail), item in self.histograms.items():
+            name: str = f"{phase} {detail}" if detail else phase
+            out.append(
+                f"* {name}: n={item.count} mean={item.total / item.count:.3f}s "
+                f"p50={item.quantile(0.5):.3f}s p95={item.quantile(0.95):.3f}s "
+                f"max={item.max:.3f}s"
+            )
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns metrics as dict."""
+        return {
+            "start": self._data[_Keys.START],
+            "duration": round(time.time() - self._data[_Keys.START], 3),
+            "counters": self.counters,
+            "phases": [
+                {"phase": phase, "detail": detail, **item.to_dict()}
+                for (phase, detail), item in self.histograms.items()
+            ],
+        }
+
+    def to_prometheus(self) -> str:
+        """Returns metrics in Prometheus text exposition format."""
+        name: str = f"{self.PREFIX}_phase_seconds"
+        out: List[str] = [
+            f"# HELP {name} Crawl phase duration in seconds.",
+            f"# TYPE {name} histogram",
+        ]
+        for (phase, detail), item in self.histograms.items():
+            labels: str = f'phase="{phase}",detail="{self.__escape(detail)}"'
+            cumulative: int = 0
+            for bound, count in zip(
+                [str(bound) for bound in Histogram.BUCKETS] + ["+Inf"], item.counts
+            ):
+                cumulative += count
+                out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            out.append(f"{name}_sum{{{labels}}} {item.total:.6f}")
+            out.append(f"{name}_count{{{labels}}} {item.count}")
+        for counter, value in sorted(self.counters.items()):
+            out.append(f"# TYPE {self.PREFIX}_{counter} gauge")
+            out.append(f"{self.PREFIX}_{counter} {value}")
+        out.append(f"# TYPE {self.PREFIX}_duration_seconds gauge")
+        out.append(
+            f"{self.PREFIX}_duration_seconds "
+            f"{time.time() - self._data[_Keys.START]:.3f}"
+        )
+        return "\n".join(out) + "\n"
+
+    def write_json(self, path: str) -> None:
+        """Writes metrics as JSON file."""
+        self.__write(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes metrics as Prometheus textfile collector file."""
+        self.__write(path, self.to_prometheus())
+
+    @staticmethod
+    def __escape(value: str) -> str:
+        """Returns label value escaped for Prometheus."""
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @staticmethod
+    def __write(path: str, content: str) -> None:
+        """Writes file atomically, the textfile collector never reads a partial file."""
+        tmp: str = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tmp, path)
+
+
+# #[EOF]#######################################################################
@@ -9,15 +9,19 @@
 
 
 import os
+import socket
+import time
 
 from inspect import currentframe
 from distutils.spawn import find_executable
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
 
 from jsktoolbox.attribtool import ReadOnlyClass
 from jsktoolbox.raisetool import Raise
 from jsktoolbox.netaddresstool.ipv4 import Address
-from jsktoolbox.libs.base_data import BData
+from jsktoolbox.devices.network.connectors import API
+
+from uke_pit2.base import BFastData
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
@@ -29,12 +33,64 @@ class _Keys(object, metaclass=ReadOnlyClass):
     CMD: str = "cmd"
     COMMAND: str = "__command_found__"
     COMMANDS: str = "__commands__"
+    DEADLINE: str = "__deadline__"
     MULTIPLIER: str = "__multiplier__"
     OPTS: str = "opts"
+    OUTPUTS: str = "__prefetched_outputs__"
+    PREFETCHED: str = "__prefetched__"
+    SSL: str = "__use_ssl__"
+    TIMED_OUT: str = "__timed_out__"
     TIMEOUT: str = "__timeout__"
 
+    # API private keys
+    API_TIMEOUT: str = "timeout"
+
+
+def encode_sentence(out: bytearray, words: List[str]) -> None:
+    """Appends RouterOS API sentence to buffer."""
+    for word in words + [""]:
+        data: bytes = word.encode("utf-8")
+        size: int = len(data)
+        if size < 0x80:
+            out += size.to_bytes(1, "big")
+        elif size < 0x4000:
+            out += (size | 0x8000).to_bytes(2, "big")
+        elif size < 0x200000:
+            out += (size | 0xC00000).to_bytes(3, "big")
+        elif size < 0x10000000:
+            out += (size | 0xE0000000).to_bytes(4, "big")
+        else:
+            out += b"\xf0" + size.to_bytes(4, "big")
+        out += data
+
 
-class Pinger(BData):
+def read_sentence(rfile: BinaryIO) -> Optional[List[str]]:
+    """Returns words of RouterOS API sentence or None if connection was closed."""
+    words: List[str] = []
+    while True:
+        first: bytes = rfile.read(1)
+        if not first:
+            return None
+        size: int = first[0]
+        if size & 0x80 == 0x00:
+            pass
+        elif size & 0xC0 == 0x80:
+            size = int.from_bytes(bytes([size & 0x3F]) + rfile.read(1), "big")
+        elif size & 0xE0 == 0xC0:
+            size = int.from_bytes(bytes([size & 0x1F]) + rfile.read(2), "big")
+        elif size & 0xF0 == 0xE0:
+            size = int.from_bytes(bytes([size & 0x0F]) + rfile.read(3), "big")
+        else:
+            size = int.from_bytes(rfile.read(4), "big")
+        if size == 0:
+            return words
+        data: bytes = rfile.read(size)
+        if len(data) < size:
+            return None
+        words.append(data.decode("utf-8", "replace"))
+
+
+class Pinger(BFastData):
     """Pinger class for testing ICMP echo."""
 
     def __init__(self, timeout: int = 1) -> None:
@@ -130,4 +186,284 @@ class Pinger(BData):
         return None
 
 
+class RouterTimeouts(object):
+    """Per-router time budget in seconds.
+
+    'connect' - TCP connection, 'login' - login dialog, 'command' - reply
+    of a command or a batch of prefetched commands, 'total' - all stages
+    of a router from the ICMP check to the last menu.
+    """
+
+    __slots__ = ("connect", "login", "command", "total")
+
+    def __init__(
+        self,
+        connect: float = 5.0,
+        login: float = 10.0,
+        command: float = 30.0,
+        total: float = 120.0,
+    ) -> None:
+        """RouterTimeouts constructor."""
+        self.connect: float = connect
+        self.login: float = login
+        self.command: float = command
+        self.total: float = total
+
+
+class Deadline(object):
+    """Running time budget of a router.
+
+    'limit' returns the stage timeout cut to the rest of the total budget
+    and remembers which of them was used, so a timeout is reported as the
+    stage or the total budget one. TimeoutError is raised when nothing is
+    left.
+    """
+
+    __slots__ = ("timeouts", "end", "stage")
+
+    def __init__(self, timeouts: RouterTimeouts) -> None:
+        """Deadline constructor, the budget starts now."""
+        self.timeouts: RouterTimeouts = timeouts
+        self.end: float = time.monotonic() + timeouts.total
+        self.stage: str = "total"
+
+    @property
+    def remaining(self) -> float:
+        """Returns rest of the total budget in seconds."""
+        return self.end - time.monotonic()
+
+    def check(self) -> None:
+        """Raises TimeoutError if total budget is used up."""
+        if self.remaining <= 0:
+            self.stage = "total"
+            raise TimeoutError("router time budget exceeded")
+
+    def limit(self, stage: str) -> float:
+        """Returns timeout for the stage: 'connect', 'login' or 'command'."""
+        self.check()
+        timeout: float = getattr(self.timeouts, stage)
+        remaining: float = self.remaining
+        if remaining < timeout:
+            self.stage = "total"
+            return remaining
+        self.stage = stage
+        return timeout
+
+
+class PipelinedAPI(API):
+    """RouterOS API connector with pipelined, tagged commands.
+
+    'prefetch' writes all commands at once, each with its own '.tag', and
+    sorts the replies by tag, so the commands cost a single round trip.
+    Results are kept until the same command is called by 'execute', which
+    is what Element.load does, so the menu elements are loaded without
+    further network traffic. Other commands go through API unchanged.
+    With 'deadline' set, the connection, login dialog and every command
+    are limited by the router time budget, 'timed_out' returns the stage
+    which used it up.
+
+    The connection socket and the socket factory are private in API, they
+    are accessed only by '_API__get_socket' and '__socket' below. API also
+    restores the socket timeout from its private data key after the alive
+    check, so the command limit is set there. The names are listed in
+    API_INTERNALS and API_DATA_KEYS and checked by the tests, jsktoolbox is
+    pinned to the version they were written against.
+    """
+
+    # private API members used by this class
+    API_INTERNALS: Tuple[str, ...] = ("_API__get_socket", "_API__socket")
+    # private API data keys used by this class
+    API_DATA_KEYS: Tuple[str, ...] = (_Keys.API_TIMEOUT,)
+
+    def __init__(
+        self,
+        ip_address: Optional[Address] = None,
+        port: int = 8728,
+        login: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 60.0,
+        use_ssl: bool = False,
+        debug: bool = False,
+        verbose: bool = False,
+    ) -> None:
+        """PipelinedAPI constructor."""
+        super().__init__(
+            ip_address, port, login, password, timeout, use_ssl, debug, verbose
+        )
+        self._data[_Keys.PREFETCHED] = {}
+        self._data[_Keys.OUTPUTS] = None
+        self._data[_Keys.DEADLINE] = None
+        self._data[_Keys.TIMED_OUT] = None
+        self._data[_Keys.SSL] = use_ssl
+
+    @property
+    def deadline(self) -> Optional[Deadline]:
+        """Returns router time budget."""
+        return self._data[_Keys.DEADLINE]
+
+    @deadline.setter
+    def deadline(self, value: Optional[Deadline]) -> None:
+        """Sets router time budget."""
+        self._data[_Keys.DEADLINE] = value
+
+    @property
+    def timed_out(self) -> Optional[str]:
+        """Returns stage which timed out: connect, login, command or total."""
+        return self._data[_Keys.TIMED_OUT]
+
+    def connect(self) -> bool:
+        """Try to connect, a timeout of login dialog closes the connection."""
+        try:
+            return super().connect()
+        except TimeoutError:
+            self.__timeout()
+            self.disconnect()
+            return False
+
+    def _API__get_socket(self) -> bool:
+        """Opens API socket within the time budget.
+
+        Replaces the private API method, which connects without a timeout.
+        """
+        deadline: Optional[Deadline] = self.deadline
+        if deadline is None or self._data[_Keys.SSL]:
+            return API._API__get_socket(self)  # type: ignore
+        try:
+            skt: socket.socket = socket.create_connection(
+                (str(self.address), self.port), deadline.limit("connect")
+            )
+            skt.settimeout(deadline.limit("login"))
+        except OSError as ex:
+            if isinstance(ex, TimeoutError):
+                self.__timeout()
+            self.__socket = None
+            self.errors().append(f"socket connection error: {ex}")
+            return False
+        self.__socket = skt
+        return True
+
+    @property
+    def __socket(self) -> Optional[socket.socket]:
+        """Returns connection socket, private in API."""
+        return self._API__socket  # type: ignore
+
+    @__socket.setter
+    def __socket(self, value: Optional[socket.socket]) -> None:
+        """Sets connection socket, private in API."""
+        self._API__socket = value
+
+    def prefetch(self, commands: List[str]) -> bool:
+        """Sends commands in one batch and keeps the replies.
+
+        ### Arguments:
+        - commands [List[str]] - API commands without arguments,
+          for example: '/ip/address/print'.
+
+        ### Returns:
+        bool - True if all replies were received. On failure the connection
+        is closed and 'execute' connects again.
+        """
+        skt: Optional[socket.socket] = self.__socket
+        if skt is None or not commands:
+            return False
+        prefetched: Dict[str, Tuple[List[Dict[str, str]], List[Dict[str, str]]]] = {}
+        out = bytearray()
+        for tag, command in enumerate(commands):
+            prefetched[command] = ([], [])
+            encode_sentence(out, [command, f".tag={tag}"])
+        pending: Set[int] = set(range(len(commands)))
+        deadline: Optional[Deadline] = self.deadline
+        rfile: BinaryIO = skt.makefile("rb")
+        try:
+            if deadline is not None:
+                skt.settimeout(deadline.limit("command"))
+            skt.sendall(out)
+            while pending:
+                if deadline is not None:
+                    deadline.check()
+                words: Optional[List[str]] = read_sentence(rfile)
+                if words is None or words[0] == "!fatal":
+                    raise ConnectionError("connection closed by remote end")
+                tag: Optional[int] = None
+                attrs: Dict[str, str] = {}
+                for word in words[1:]:
+                    if word.startswith(".tag="):
+                        tag = int(word[5:])
+                    elif word.startswith("="):
+                        key, _, value = word[1:].partition("=")
+                        attrs[key] = value
+                if tag is None or tag not in pending:
+                    continue
+                stdout, stderr = prefetched[commands[tag]]
+                if words[0] == "!re":
+                    stdout.append(attrs)
+                elif words[0] == "!trap":
+                    stderr.append(attrs)
+                elif words[0] == "!done":
+                    pending.discard(tag)
+        except (OSError, ValueError) as e:
+            if isinstance(e, TimeoutError):
+                self.__timeout()
+            self.errors().append(f"prefetch error: {e}")
+            self.disconnect()
+            return False
+        finally:
+            rfile.close()
+        self._data[_Keys.PREFETCHED] = prefetched
+        return True
+
+    def execute(self, commands: Union[str, List]) -> bool:
+        """Execute commands, prefetched replies are used once."""
+        prefetched: Dict[str, Tuple[List[Dict[str, str]], List[Dict[str, str]]]] = (
+            self._data[_Keys.PREFETCHED]
+        )
+        if isinstance(commands, str) and commands in prefetched:
+            stdout, stderr = prefetched.pop(commands)
+            self._data[_Keys.OUTPUTS] = ([stdout], [stderr])
+            return not stderr
+        self._data[_Keys.OUTPUTS] = None
+        if self.deadline is None:
+            return super().execute(commands)
+        try:
+            # restored by API after the alive check
+            self._data[_Keys.API_TIMEOUT] = self.deadline.limit("command")
+            ret: bool = super().execute(commands)
+        except TimeoutError:
+            # the rest of the router dialog is dropped
+            self.__timeout()
+            self.disconnect()
+            raise
+        if self.timed_out:
+            # reconnection timed out
+            raise TimeoutError(f"{self.timed_out} timeout")
+        return ret
+
+    def outputs(self) -> Tuple:
+        """Get list of results after executed commands."""
+        if self._data[_Keys.OUTPUTS] is not None:
+            return self._data[_Keys.OUTPUTS]
+        return super().outputs()
+
+    def abort(self) -> None:
+        """Breaks pending reads from another thread.
+
+        The socket is shut down, not closed, so the thread waiting for a
+        reply gets an error and closes the connection itself.
+        """
+        skt: Optional[socket.socket] = self.__socket
+        if skt is None:
+            return None
+        try:
+            skt.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def __timeout(self) -> None:
+        """Records stage which used up the time budget."""
+        deadline: Optional[Deadline] = self.deadline
+        self._data[_Keys.TIMED_OUT] = (
+            deadline.stage if deadline is not None else "command"
+        )
+
+
 # #[EOF]#######################################################################
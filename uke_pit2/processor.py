@@ -7,64 +7,96 @@
   Purpose: processor class.
 """
 
-from operator import and_
-from tabnanny import verbose
-import time
-
-from typing import Optional, List, Tuple
-from threading import Event, Thread
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, List, Set, Tuple
+from threading import Event, Lock, Thread
 from inspect import currentframe
 from queue import Queue, Empty
 
-from sqlalchemy import delete
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
 
 from jsktoolbox.attribtool import ReadOnlyClass
-from jsktoolbox.logstool.logs import LoggerClient, LoggerQueue
+from jsktoolbox.logstool.logs import LoggerQueue
 from jsktoolbox.libs.base_th import ThBaseObject
-from jsktoolbox.netaddresstool.ipv4 import Address, Network
+from jsktoolbox.netaddresstool.ipv4 import Address
 from jsktoolbox.raisetool import Raise
-from jsktoolbox.devices.network.connectors import API
 from jsktoolbox.devices.mikrotik.routerboard import RouterBoard
 from jsktoolbox.datetool import Timestamp
 
 
-from uke_pit2.base import BLogs, BVerbose
+from uke_pit2.base import BDebug, BFastData, BLogs, BMetrics, BVerbose
+from uke_pit2.checkpoint import CrawlCheckpoint, CrawlState
 from uke_pit2.db_models.spider import (
+    TAssignmentVersion,
     TConnection,
     TCustomer,
     TInterface,
     TInterfaceName,
     TNodeAssignment,
     TRouter,
+    TRouterVersion,
     TFlow,
 )
 from uke_pit2.db_models.update import TLastUpdate
-from uke_pit2.network import Pinger
-from uke_pit2.rb import IRouterBoardCollector, RBData, RouterBoardVersion
-from uke_pit2.db import DbConfig, Database
+from uke_pit2.frontier import IFrontier, LifoFrontier, RouterHistory
+from uke_pit2.ipv4 import int_to_str
+from uke_pit2.logs import LogsClient
+from uke_pit2.metrics import CrawlMetrics
+from uke_pit2.network import Deadline, Pinger, PipelinedAPI, RouterTimeouts
+from uke_pit2.rb import (
+    CollectorCache,
+    CollectorRegistry,
+    IRouterBoardCollector,
+    OspfLsdb,
+    RBData,
+    RouterBoardVersion,
+    release_elements,
+)
+from uke_pit2.db import DbBackends, DbConfig, Database
+from uke_pit2.shutdown import ShutdownCoordinator
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
     """Internal Keys container class."""
 
-    ACH: str = "__api_connector_handler__"
-    DATA: str = "__router_data__"
+    ACTIVE: str = "__active__"
+    CHECKPOINT: str = "__checkpoint__"
+    COMPLETE: str = "__complete__"
     DATABASE: str = "__database__"
+    DB_BACKEND: str = "__db_backend__"
     DB_DATA: str = "__db_database__"
     DB_HOST: str = "__db_host__"
     DB_PASS: str = "__db_password__"
     DB_PORT: str = "__db_port__"
     DB_USER: str = "__db_username__"
-    IP: str = "__host_ip__"
+    FRONTIER: str = "__frontier__"
+    HISTORY: str = "__history__"
+    LOCK: str = "__lock__"
     PASS: str = "__passwords_list__"
+    PINGER: str = "__pinger__"
+    PORT: str = "__port__"
+    PROCESSOR: str = "__processor__"
+    PURGE: str = "__purge__"
     QUEUE: str = "__comms_queue__"
     RUNTIME: str = "__runtime__"
+    SHUTDOWN: str = "__shutdown__"
+    STOP: str = "__stop__"
+    TIMEOUTS: str = "__timeouts__"
+    VERSIONS: str = "__versions__"
+    WORKERS: str = "__workers__"
+
 
+class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose, BMetrics, BFastData):
+    """Database Processor class for router board object.
 
-class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
-    """Database Processor class for router board object."""
+    Routers are written in transactions of up to BATCH items, a transaction
+    is also committed whenever the queue is drained.
+    """
+
+    BATCH: int = 50
 
     def __init__(
         self,
@@ -72,6 +104,9 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         comms_queue: Queue,
         debug: bool = False,
         verbose: bool = False,
+        metrics: Optional[CrawlMetrics] = None,
+        versions: Optional[CollectorCache] = None,
+        history: Optional[RouterHistory] = None,
     ) -> None:
         """Processor constructor.
 
@@ -80,6 +115,11 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         - comms_queue [Queue] - communication queue.
         - debug [bool] - debug flag.
         - verbose [bool] - verbose flag.
+        - metrics [Optional[CrawlMetrics]] - phase timings registry.
+        - versions [Optional[CollectorCache]] - collector selection cache,
+          loaded from database at start.
+        - history [Optional[RouterHistory]] - routers connections and
+          customers counts for the run list ordering, loaded at start.
         """
         # init thread
         Thread.__init__(self, name=f"{self._c_name}")
@@ -90,9 +130,15 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         # verbose
         self.verbose = verbose
         # logger
-        self.logs = LoggerClient(logger_queue, f"{self._c_name}")
+        self.logs = LogsClient(logger_queue, f"{self._c_name}")
         # communication queue
         self.__comms_queue = comms_queue
+        # timings
+        self.metrics = metrics
+        # collector selection cache
+        self._data[_Keys.VERSIONS] = versions
+        # previous run counts
+        self._data[_Keys.HISTORY] = history
         # set runtime
         self._set_data(_Keys.RUNTIME, set_default_type=int, value=Timestamp.now)
 
@@ -114,6 +160,7 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         if not self.logs or not self.logs.logs_queue or self._debug is None:
             return None
         conf = DbConfig()
+        conf.backend = self.db_backend
         conf.host = self.db_host  # type: ignore
         conf.port = self.db_port  # type: ignore
         conf.database = self.db_database  # type: ignore
@@ -141,46 +188,65 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         session.add(tlu)
         session.commit()
 
+        # cached collector selection
+        self.__load_versions(session)
+        # run list ordering
+        self.__load_history(session)
+
         # stats counters
         stat_routers: int = 0
         stat_connections: int = 0
         stat_customers: int = 0
 
+        # routers written in the current transaction
+        batch: List[RBData] = []
+
         while True:
             if self.__comms_queue.empty() and self._stop_event.is_set():
                 break
             try:
-                item: RBData = self.__comms_queue.get(block=False)
-                self.logs.message_info = f"Update router information: {item.router_id}"
-                self.logs.message_info = f" connections count: {len(item.routers)}"
-                self.logs.message_info = f" customers count: {len(item.customers)}"
-
-                # stats
-                stat_routers += 1
-                stat_connections += len(item.routers)
-                stat_customers += len(item.customers)
-
-                # update router information
-                rid: int = self.__update_routers(session, item)
-                if item.customers:
-                    self.__update_router_customers(session, item, rid)
-                if item.routers:
-                    self.__update_router_connections(session, item, rid)
-
+                item: RBData = self.__comms_queue.get(timeout=self.sleep_period)
             except Empty:
-                time.sleep(0.2)
+                # queue is drained, close the transaction
+                self.__commit(session, batch)
                 continue
+            self.logs.info("Update router information: %s", item.router_id)
+            self.logs.info(" connections count: %d", len(item.routers))
+            self.logs.info(" customers count: %d", len(item.customers))
+
+            # stats
+            stat_routers += 1
+            stat_connections += len(item.routers)
+            stat_customers += len(item.customers)
+
+            # update router information
+            try:
+                with self._timer("db_write"):
+                    self.__write(session, item)
             except Exception as ex:
+                self._count("db_write_failed")
                 self.logs.message_critical = (
                     f"exception was thrown while processing the queue: {ex}"
                 )
+                # the transaction is lost, write previous items separately
+                session.rollback()
+                self.__replay(session, batch)
+                batch.clear()
                 continue
-
-        # clean up
-        self.__purge_customers(session=session)
-        self.__purge_connections(session=session)
-        self.__purge_routers(session=session)
-        self.__purge_updates(session=session)
+            batch.append(item)
+            if len(batch) >= self.BATCH:
+                self.__commit(session, batch)
+        self.__commit(session, batch)
+
+        # clean up, records missing from a partial crawl are not outdated
+        if self.purge:
+            with self._timer("db_purge"):
+                self.__purge_customers(session=session)
+                self.__purge_connections(session=session)
+                self.__purge_routers(session=session)
+                self.__purge_updates(session=session)
+        else:
+            self.logs.message_notice = "partial crawl, purge skipped"
 
         session.close()
 
@@ -195,6 +261,44 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         if self._debug:
             self.logs.message_debug = "stopped."
 
+    def __write(self, session: Session, item: RBData) -> None:
+        """Writes router data to the current transaction."""
+        rid: int = self.__update_routers(session, item)
+        if item.collector:
+            self.__update_router_version(session, item, rid)
+        if item.customers:
+            self.__update_router_customers(session, item, rid)
+        if item.routers:
+            self.__update_router_connections(session, item, rid)
+
+    def __commit(self, session: Session, batch: List[RBData]) -> None:
+        """Commits routers batch, on error writes items one by one."""
+        if not batch:
+            return None
+        try:
+            with self._timer("db_commit"):
+                session.commit()
+        except Exception as ex:
+            session.rollback()
+            self.logs.message_error = (
+                f"commit of {len(batch)} routers failed: {ex}, retrying one by one"
+            )
+            self.__replay(session, batch)
+        batch.clear()
+
+    def __replay(self, session: Session, batch: List[RBData]) -> None:
+        """Writes and commits every router in a separate transaction."""
+        for item in batch:
+            try:
+                self.__write(session, item)
+                session.commit()
+            except Exception as ex:
+                session.rollback()
+                self._count("db_write_failed")
+                self.logs.message_critical = (
+                    f"cannot write router {item.router_id} data: {ex}"
+                )
+
     def stop(self) -> None:
         """Sets stop event."""
         if self._stop_event:
@@ -304,6 +408,7 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                 count = 0
                 r_count = 0
                 c_count = 0
+                a_count = 0
                 for router, assignment, connection, customer in rows:
                     count += 1
 
@@ -314,29 +419,40 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                         c_count += 1
                         session.delete(connection)
                     if assignment:
+                        a_count += 1
                         session.delete(assignment)
                     if customer:
                         session.delete(customer)
                     # if flow:
                     #     session.delete(flow)
+                if a_count:
+                    # web service reloads its assignment index
+                    session.execute(
+                        update(TAssignmentVersion)
+                        .where(TAssignmentVersion.id == 1)
+                        .values(version=TAssignmentVersion.version + 1)
+                    )
                 session.commit()
                 self.logs.message_info = f"purge {count} records: {r_count} routers and {c_count} connections."
 
+            # versions of purged routers
+            session.execute(
+                delete(TRouterVersion).where(
+                    TRouterVersion.rid.not_in(select(TRouter.id))
+                )
+            )
+            session.commit()
+
     def __update_router_connections(
         self, session: Session, data: RBData, router_record_id: int
     ) -> None:
         """Update information about inter-router connections."""
         runtime: Optional[int] = self._get_data(_Keys.RUNTIME)
         if runtime and session and data and data.routers:
-            for item in data.routers:
-                inf = inf_name_id = cid = network = vid = None  # type: ignore
-                if "interface" in item:
-                    inf: str = item["interface"]
-                if "network" in item:
-                    network: Network = item["network"]
-                if "vlan-id" in item and item["vlan-id"]:
-                    vid: int = item["vlan-id"]
-                else:
+            for _, address, inf, vid, network in data.routers.records():
+                if address is None or network is None:
+                    continue
+                if not vid:
                     vid = 1
 
                 # check interface name
@@ -349,7 +465,7 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                     row = TInterfaceName()
                     row.name = inf
                     session.add(row)
-                    session.commit()
+                    session.flush()
                 inf_name_id: int = row.id
 
                 # check connection
@@ -358,7 +474,7 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                     .filter(
                         TConnection.rid == router_record_id,
                         TConnection.vlan_id == vid,
-                        TConnection.network == int(network.network),
+                        TConnection.network == network[0],
                     )
                     .first()
                 )
@@ -366,12 +482,12 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                     row.last_update = runtime
                 else:
                     row = TConnection()
-                    row.network = int(network.network)
+                    row.network = network[0]
                     row.rid = router_record_id
                     row.vlan_id = vid
                     row.last_update = runtime
                     session.add(row)
-                session.commit()
+                session.flush()
                 cid: int = row.id
 
                 # check interface
@@ -388,7 +504,76 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
                     row.if_id = inf_name_id
                     row.last_update = runtime
                     session.add(row)
-                session.commit()
+
+    def __load_versions(self, session: Session) -> None:
+        """Loads cached collector selection of routers."""
+        versions: Optional[CollectorCache] = self._data[_Keys.VERSIONS]
+        if versions is None:
+            return None
+        try:
+            rows = session.execute(
+                select(
+                    TRouter.router_id,
+                    TRouterVersion.collector,
+                    TRouterVersion.firmware,
+                    TRouterVersion.runs,
+                ).join(TRouterVersion, TRouterVersion.rid == TRouter.id)
+            ).all()
+        except Exception as ex:
+            session.rollback()
+            self.logs.message_error = f"cannot load routers versions: {ex}"
+            rows = []
+        versions.load(tuple(row) for row in rows)
+        self.logs.info("loaded %d cached routers versions", len(versions))
+
+    def __load_history(self, session: Session) -> None:
+        """Loads routers connections and customers counts."""
+        history: Optional[RouterHistory] = self._data[_Keys.HISTORY]
+        if history is None:
+            return None
+        connections = (
+            select(TConnection.rid, func.count(TConnection.id).label("count"))
+            .group_by(TConnection.rid)
+            .subquery()
+        )
+        customers = (
+            select(TCustomer.rid, func.count(TCustomer.id).label("count"))
+            .group_by(TCustomer.rid)
+            .subquery()
+        )
+        try:
+            rows = session.execute(
+                select(
+                    TRouter.router_id,
+                    func.coalesce(connections.c.count, 0),
+                    func.coalesce(customers.c.count, 0),
+                )
+                .outerjoin(connections, connections.c.rid == TRouter.id)
+                .outerjoin(customers, customers.c.rid == TRouter.id)
+            ).all()
+        except Exception as ex:
+            session.rollback()
+            self.logs.message_error = f"cannot load routers history: {ex}"
+            rows = []
+        history.load(tuple(row) for row in rows)
+        self.logs.info("loaded history of %d routers", len(history))
+
+    def __update_router_version(
+        self, session: Session, data: RBData, router_record_id: int
+    ) -> None:
+        """Update cached collector selection of router."""
+        row: Optional[TRouterVersion] = (
+            session.query(TRouterVersion)
+            .filter(TRouterVersion.rid == router_record_id)
+            .first()
+        )
+        if not row:
+            row = TRouterVersion()
+            row.rid = router_record_id
+            session.add(row)
+        row.collector = data.collector  # type: ignore
+        row.firmware = data.firmware or ""
+        row.runs = data.version_runs
 
     def __update_router_customers(
         self, session: Session, data: RBData, router_record_id: int
@@ -396,27 +581,23 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         """Update router customers information."""
         runtime: Optional[int] = self._get_data(_Keys.RUNTIME)
         if runtime and session and data and data.customers:
-            for item in data.customers:
-                if "name" in item and "address" in item:
-                    row: Optional[TCustomer] = (
-                        session.query(TCustomer)
-                        .filter(TCustomer.name == item["name"])
-                        .first()
-                    )
-                    if row:
-                        if row.rid != router_record_id:
-                            row.rid = router_record_id
-                        if row.ip != int(Address(item["address"])):
-                            row.ip = int(Address(item["address"]))
-                        row.last_update = runtime
-                    else:
-                        customer = TCustomer()
-                        customer.rid = router_record_id
-                        customer.name = item["name"]
-                        customer.ip = int(Address(item["address"]))
-                        customer.last_update = runtime
-                        session.add(customer)
-                    session.commit()
+            for name, ip in data.customers.records():
+                row: Optional[TCustomer] = (
+                    session.query(TCustomer).filter(TCustomer.name == name).first()
+                )
+                if row:
+                    if row.rid != router_record_id:
+                        row.rid = router_record_id
+                    if row.ip != ip:
+                        row.ip = ip
+                    row.last_update = runtime
+                else:
+                    customer = TCustomer()
+                    customer.rid = router_record_id
+                    customer.name = name
+                    customer.ip = ip
+                    customer.last_update = runtime
+                    session.add(customer)
 
     def __update_routers(self, session: Session, data: RBData) -> int:
         """Check and update routers information in database.
@@ -437,29 +618,30 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
             )
             if row:
                 if self.verbose:
-                    self.logs.message_debug = (
-                        f"found router in database: {Address(row.router_id)}"
+                    self.logs.debug(
+                        "found router in database: %s", int_to_str(row.router_id)
                     )
                 row.last_update = runtime
             else:
                 if self.verbose:
-                    self.logs.message_debug = (
-                        f"add router to database: {data.router_id}"
-                    )
+                    self.logs.debug("add router to database: %s", data.router_id)
                 row = TRouter()
                 row.router_id = int(data.router_id)
                 row.last_update = runtime
                 session.add(row)
 
-            session.commit()
+            session.flush()
             if self.verbose:
-                self.logs.message_debug = (
-                    f"record id for router {Address(row.router_id)}: {row.id}"
+                self.logs.debug(
+                    "record id for router %s: %d", int_to_str(row.router_id), row.id
                 )
         return row.id
 
     def __check_config(self) -> bool:
         """Check if the connection variables are set."""
+        if self.db_backend == DbBackends.SQLITE:
+            # file path or ':memory:'
+            return self.db_database is not None
         if (
             self.db_database
             and self.db_host
@@ -480,6 +662,28 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         """Sets communication queue."""
         self._set_data(key=_Keys.QUEUE, value=comms_queue)
 
+    @property
+    def purge(self) -> bool:
+        """Returns purge flag, outdated records are removed after a full crawl."""
+        return self._get_data(
+            key=_Keys.PURGE, set_default_type=bool, default_value=True
+        )  # type: ignore
+
+    @purge.setter
+    def purge(self, value: bool) -> None:
+        """Sets purge flag, must be set before 'stop'."""
+        self._set_data(key=_Keys.PURGE, value=value)
+
+    @property
+    def db_backend(self) -> str:
+        return self._get_data(
+            key=_Keys.DB_BACKEND, set_default_type=str, default_value=DbBackends.MYSQL
+        )  # type: ignore
+
+    @db_backend.setter
+    def db_backend(self, value: str) -> None:
+        self._set_data(key=_Keys.DB_BACKEND, value=value)
+
     @property
     def db_host(self) -> Optional[Address]:
         return self._get_data(key=_Keys.DB_HOST, set_default_type=Optional[Address])
@@ -533,160 +737,308 @@ class DbProcessor(Thread, ThBaseObject, BLogs, BVerbose):
         self._set_data(key=_Keys.DATABASE, set_default_type=Database, value=database)
 
 
-class Processor(Thread, ThBaseObject, BLogs, BVerbose):
-    """Processor class for router board object."""
+class Processor(BLogs, BDebug, BVerbose, BMetrics, BFastData):
+    """Router board collector job.
+
+    'collect' does not keep any per-router state on the object, so a single
+    instance may be shared by the long-lived worker threads of a pool.
+    The API connection is opened and closed inside the 'collect' call.
+    All menus used by the collectors are requested at once as tagged
+    commands, so collecting a router costs about one round trip instead
+    of one per menu. With 'versions' cache, a collector selected in one of
+    the previous runs is used without the RouterOS version check; if it
+    fails, the version is checked again.
+    Open connections are tracked, so 'cancel' can break API calls still
+    waiting for replies after 'stop'.
+    Every router has its own time budget ('timeouts'), started before the
+    ICMP check and shared by all password attempts and menus; a router
+    which used it up is dropped and counted as 'timeout_<stage>'.
+    """
 
     def __init__(
         self,
         logger_queue: LoggerQueue,
-        ip: Address,
         passwords: List[str],
         debug: bool = False,
         verbose: bool = False,
+        metrics: Optional[CrawlMetrics] = None,
+        port: int = 8728,
+        pinger: Optional[Pinger] = None,
+        versions: Optional[CollectorCache] = None,
+        timeouts: Optional[RouterTimeouts] = None,
     ) -> None:
         """Processor constructor.
 
         ### Arguments:
         - logger_queue [LoggerQueue] - logger queue for communication.
-        - ip [Address] - router ip address.
         - passwords [List[str]] - list of router passwords
         - debug [bool] - debug flag.
         - verbose [bool] - verbose flag for debugging.
+        - metrics [Optional[CrawlMetrics]] - phase timings registry.
+        - port [int] - RouterOS API port.
+        - pinger [Optional[Pinger]] - ICMP checker, system ping if None.
+        - versions [Optional[CollectorCache]] - cached collector selection.
+        - timeouts [Optional[RouterTimeouts]] - per-router time budget.
         """
-        # init thread
-        Thread.__init__(self, name=f"{self._c_name} [{ip}]")
-        self._stop_event = Event()
-        self.sleep_period = 0.2
-        # set ip
-        self.ip = ip
+        self._data[_Keys.STOP] = Event()
+        self._data[_Keys.TIMEOUTS] = (
+            timeouts if timeouts is not None else RouterTimeouts()
+        )
+        self._data[_Keys.ACTIVE] = set()
+        self._data[_Keys.LOCK] = Lock()
+        self._data[_Keys.PORT] = port
+        self._data[_Keys.VERSIONS] = versions
         # set passwords
         self.__passwords = passwords
         # debug
-        self._debug = debug
+        self.debug = debug
         # verbose
         self.verbose = verbose
         # logger
-        self.logs = LoggerClient(logger_queue, f"{self._c_name} {ip}")
-        # data container
-        self._data[_Keys.DATA] = None
-
-    def run(self) -> None:
-        """Start processor."""
-        if self._debug:
-            self.logs.message_debug = "starting..."
+        self.logs = LogsClient(logger_queue, f"{self._c_name}")
+        # icmp checker, the system command is probed only once
+        self._data[_Keys.PINGER] = pinger if pinger is not None else Pinger()
+        # timings
+        self.metrics = metrics
 
-        # the main procedure
-        if not self.has_stop_set:
-            # check icmp to ip
-            self.__check_icmp()
-
-        if not self.has_stop_set:
-            # connector handler
-            conn = None
-            for passwd in self.__passwords:
-                if self._debug:
-                    self.logs.message_debug = f"Try to connect..."
-                conn = API(
-                    ip_address=self.ip,
-                    port=8728,
-                    login="admin",
-                    password=passwd,
-                    debug=True if self._debug else False,
-                )
-                try:
-                    if conn.connect() and conn.is_alive:
-                        if self._debug:
-                            self.logs.message_debug = f"connected"
-                        self.api_handler = conn
-                        break
-                except Exception as e:
-                    self.logs.message_debug = f"{e}"
-            if not self.api_handler or not self.api_handler.is_alive:
-                if self._debug:
-                    self.logs.message_debug = f"cannot connect"
-                self.stop()
-
-        if not self.has_stop_set:
-            # router board dialogs
-            self.__router_board_dialogs()
+    def collect(self, ip: Address) -> Optional[RBData]:
+        """Collects router board data.
 
-        if self._debug:
-            self.logs.message_debug = "stopped"
+        ### Arguments:
+        - ip [Address] - router ip address.
 
-    def stop(self) -> None:
-        """Sets stop event."""
-        if self._stop_event:
-            if self._debug:
-                self.logs.message_debug = "stopping..."
-            self._stop_event.set()
+        ### Returns:
+        Optional[RBData] - collected data with router-id set, or None.
+        """
+        if self.debug:
+            self.logs.debug("[%s] starting...", ip)
+        deadline = Deadline(self._data[_Keys.TIMEOUTS])
+        if self.has_stop_set or not self.__check_icmp(ip):
+            return None
+        conn: Optional[PipelinedAPI] = self.__connect(ip, deadline)
+        if conn is None:
+            self._count("connect_failed")
+            return None
+        try:
+            if self.has_stop_set:
+                return None
+            data: Optional[RBData] = self.__router_board_dialogs(conn, ip)
+            if data is not None:
+                data.router_id = ip
+                self._count("collected")
+            else:
+                self._count("collect_failed")
+            return data
+        except TimeoutError:
+            self.__timeout(ip, conn.timed_out or deadline.stage)
+            return None
+        finally:
+            self.__disconnect(ip, conn)
+            if self.debug:
+                self.logs.debug("[%s] stopped", ip)
 
-    def __del__(self) -> None:
-        """Destructor for class."""
-        if self.api_handler and self.api_handler.is_alive:
-            if self._debug:
-                self.logs.message_debug = "closing connection"
-            self.api_handler.disconnect()
+    def lsdb(self, ip: Address) -> List[Address]:
+        """Reads router-ids from OSPF link-state database of the router.
 
-    def __check_icmp(self) -> None:
-        """Check ipv4 responses."""
-        test = Pinger()
-        if not test.is_alive(self.ip):
-            if self._debug:
-                self.logs.message_debug = f"host not responding."
-            self.stop()
+        ### Arguments:
+        - ip [Address] - router ip address.
 
-    def __router_board_dialogs(self) -> None:
-        """RB procedures."""
-        if self.api_handler and self.logs.logs_queue:
+        ### Returns:
+        List[Address] - router-ids of the router areas, empty on failure.
+        """
+        deadline = Deadline(self._data[_Keys.TIMEOUTS])
+        if self.has_stop_set or not self.__check_icmp(ip):
+            return []
+        conn: Optional[PipelinedAPI] = self.__connect(ip, deadline)
+        if conn is None:
+            self._count("connect_failed")
+            return []
+        try:
+            if not self.logs.logs_queue:
+                return []
             rb = RouterBoard(
-                connector=self.api_handler,
+                connector=conn,
                 qlog=self.logs.logs_queue,
-                debug=True if self._debug else False,
-                verbose=True if self.verbose else False,
+                debug=self.debug,
+                verbose=self.verbose,
             )
+            with self._timer("bootstrap"):
+                ids: List[int] = OspfLsdb(
+                    logger_queue=self.logs.logs_queue,
+                    rb_handler=rb,
+                    debug=self.debug,
+                    metrics=self.metrics,
+                ).router_ids()
+            release_elements(rb)
+            self._count("bootstrap_routers", len(ids))
+            return [Address(rid) for rid in ids]
+        except Exception as e:
+            self.logs.message_warning = f"[{ip}] OSPF LSDB reading error: {e}"
+            return []
+        finally:
+            self.__disconnect(ip, conn)
 
-            # check system version
+    def stop(self) -> None:
+        """Sets stop event, running jobs are finished after current stage."""
+        if self.debug:
+            self.logs.message_debug = "stopping..."
+        self._data[_Keys.STOP].set()
+
+    def cancel(self) -> int:
+        """Breaks API calls of running jobs, returns number of connections."""
+        with self._data[_Keys.LOCK]:
+            active: List[PipelinedAPI] = list(self._data[_Keys.ACTIVE])
+        for conn in active:
+            conn.abort()
+        if active:
+            self._count("cancelled", len(active))
+        return len(active)
+
+    @property
+    def has_stop_set(self) -> bool:
+        """Returns stop flag."""
+        return self._data[_Keys.STOP].is_set()
+
+    def __check_icmp(self, ip: Address) -> bool:
+        """Check ipv4 responses."""
+        with self._timer("icmp"):
+            alive: bool = self._data[_Keys.PINGER].is_alive(ip)
+        if not alive:
+            self._count("icmp_failed")
+            if self.debug:
+                self.logs.debug("[%s] host not responding.", ip)
+            return False
+        return True
+
+    def __timeout(self, ip: Address, stage: str) -> None:
+        """Counts router dropped after timeout of the stage."""
+        self._count(f"timeout_{stage}")
+        self.logs.message_warning = f"[{ip}] {stage} timeout, router skipped"
+
+    def __connect(self, ip: Address, deadline: Deadline) -> Optional[PipelinedAPI]:
+        """Returns connected API object or None."""
+        timeouts: RouterTimeouts = self._data[_Keys.TIMEOUTS]
+        for nr, passwd in enumerate(self.__passwords, 1):
+            if self.has_stop_set:
+                break
+            if self.debug:
+                self.logs.debug("[%s] Try to connect...", ip)
+            conn = PipelinedAPI(
+                ip_address=ip,
+                port=self._data[_Keys.PORT],
+                login="admin",
+                password=passwd,
+                timeout=timeouts.command,
+                debug=self.debug,
+            )
+            conn.deadline = deadline
+            # login dialog may be cancelled too
+            with self._data[_Keys.LOCK]:
+                self._data[_Keys.ACTIVE].add(conn)
+            try:
+                with self._timer("connect", f"password {nr}"):
+                    connected: bool = conn.connect() and conn.is_alive
+                if connected:
+                    if self.debug:
+                        self.logs.debug("[%s] connected", ip)
+                    return conn
+            except Exception as e:
+                self.logs.debug("[%s] %s", ip, e)
+            self.__disconnect(ip, conn)
+            if conn.timed_out:
+                # next password would wait for the same router
+                self.__timeout(ip, conn.timed_out)
+                break
+        if self.debug:
+            self.logs.debug("[%s] cannot connect", ip)
+        return None
+
+    def __disconnect(self, ip: Address, conn: PipelinedAPI) -> None:
+        """Closes API connection."""
+        if self.debug:
+            self.logs.debug("[%s] closing connection", ip)
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.ACTIVE].discard(conn)
+        try:
+            conn.disconnect()
+        except Exception as e:
+            self.logs.debug("[%s] %s", ip, e)
+
+    def __router_board_dialogs(
+        self, conn: PipelinedAPI, ip: Address
+    ) -> Optional[RBData]:
+        """RB procedures."""
+        if not self.logs.logs_queue:
+            return None
+        versions: Optional[CollectorCache] = self._data[_Keys.VERSIONS]
+        cached: Optional[Tuple[str, str, int]] = (
+            versions.get(int(ip)) if versions is not None else None
+        )
+        menus: List[str] = list(RouterBoardVersion.MENUS)
+        if cached is None:
+            menus.insert(0, RouterBoardVersion.MENU)
+        with self._timer("pipeline"):
+            if not conn.prefetch([f"{menu}print" for menu in menus]):
+                if conn.timed_out:
+                    raise TimeoutError("menus reading timeout")
+                # menus are read one by one on a new connection
+                self._count("pipeline_failed")
+
+        rb = RouterBoard(
+            connector=conn,
+            qlog=self.logs.logs_queue,
+            debug=self.debug,
+            verbose=self.verbose,
+        )
+        try:
             csv = RouterBoardVersion(
                 logger_queue=self.logs.logs_queue,
                 rb_handler=rb,
-                debug=True if self._debug else False,
-                verbose=True if self.verbose else False,
+                debug=self.debug,
+                verbose=self.verbose,
+                metrics=self.metrics,
             )
+            data: Optional[RBData] = None
+
+            # collector selected in one of the previous runs
+            if cached is not None:
+                name, firmware, runs = cached
+                collector_class: Optional[type] = CollectorRegistry.get(name)
+                if collector_class is not None:
+                    try:
+                        data = self.__collect(csv.create_collector(collector_class))
+                    except TimeoutError:
+                        raise
+                    except Exception as e:
+                        self.logs.debug("[%s] cached collector error: %s", ip, e)
+                if data is not None:
+                    self._count("version_cached")
+                    data.collector = name
+                    data.firmware = firmware
+                    data.version_runs = runs + 1
+                    return data
+                # check the version again
+                self._count("version_invalidated")
 
+            # check system version
             collector: Optional[IRouterBoardCollector] = csv.get_collector()
-
-            if collector:
-                # self.logs.message_debug = f"{collector}"
-                collector.collect()
-                # self.logs.message_debug = f"{collector.get_data()}"
-                self._data[_Keys.DATA] = collector.get_data()
-                # collector.dump()  # type: ignore
-
-    def router_data(self) -> Optional[RBData]:
-        """Returns collected Router Board data."""
-        return self._data[_Keys.DATA]
-
-    @property
-    def api_handler(self) -> Optional[API]:
-        """Returns API object."""
-        return self._get_data(key=_Keys.ACH, set_default_type=Optional[API])
-
-    @api_handler.setter
-    def api_handler(self, api: API) -> None:
-        """Sets API object."""
-        self._set_data(key=_Keys.ACH, value=api)
-
-    @property
-    def ip(self) -> Address:
-        """Returns IPv4 router board address."""
-        return self._get_data(
-            key=_Keys.IP, set_default_type=Address, default_value=Address("127.0.0.1")
-        )  # type: ignore
-
-    @ip.setter
-    def ip(self, value: Address) -> None:
-        """Sets IPv4 router board address."""
-        self._set_data(key=_Keys.IP, value=value)
+            data = self.__collect(collector)
+            if data is not None:
+                data.collector = collector.__class__.__name__
+                data.firmware = csv.firmware
+                data.version_runs = 0
+            return data
+        finally:
+            # menu tables are freed without waiting for the garbage collector
+            release_elements(rb)
+
+    @staticmethod
+    def __collect(collector: Optional[IRouterBoardCollector]) -> Optional[RBData]:
+        """Runs collector, returns collected data or None."""
+        if collector is None:
+            return None
+        collector.collect()
+        return collector.get_data()
 
     @property
     def __passwords(self) -> List[str]:
@@ -707,12 +1059,255 @@ class Processor(Thread, ThBaseObject, BLogs, BVerbose):
             )
         self.__passwords.extend(value)
 
+
+class Crawler(BLogs, BDebug, BFastData):
+    """OSPF neighbors walk over a pool of Processor jobs.
+
+    Collected RBData objects are put to the communication queue and
+    router-ids of neighbors not seen before are added to the run list.
+    With 'bootstrap' set, the run list is seeded with all router-ids from
+    the OSPF link-state database of the start router, so the pool is busy
+    from the start; the neighbors walk still picks up routers outside of
+    the start router areas.
+    With 'checkpoint' set, the run list, seen and processed router-ids are
+    saved periodically and when the walk is broken, so an interrupted crawl
+    can be continued with 'resume'.
+    The order of the run list is set by 'frontier', depth-first if None.
+    After a break, running jobs get STOP_TIMEOUT seconds to finish, then
+    their API calls are cancelled; both stages are timed by the shutdown
+    coordinator.
+    """
+
+    STOP_TIMEOUT: float = 10.0
+    CANCEL_TIMEOUT: float = 2.0
+
+    def __init__(
+        self,
+        logger_queue: LoggerQueue,
+        processor: Processor,
+        comms_queue: Queue,
+        workers: int = 5,
+        debug: bool = False,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        shutdown: Optional[ShutdownCoordinator] = None,
+        frontier: Optional[IFrontier] = None,
+    ) -> None:
+        """Crawler constructor.
+
+        ### Arguments:
+        - logger_queue [LoggerQueue] - logger queue for communication.
+        - processor [Processor] - router board collector job.
+        - comms_queue [Queue] - database processor queue.
+        - workers [int] - number of concurrent jobs.
+        - debug [bool] - debug flag.
+        - checkpoint [Optional[CrawlCheckpoint]] - crawl state file.
+        - shutdown [Optional[ShutdownCoordinator]] - shutdown stages timings.
+        - frontier [Optional[IFrontier]] - run list ordering.
+        """
+        self.logs = LogsClient(logger_queue, f"{self._c_name}")
+        self.debug = debug
+        self._data[_Keys.PROCESSOR] = processor
+        self._data[_Keys.QUEUE] = comms_queue
+        self._data[_Keys.WORKERS] = workers
+        self._data[_Keys.CHECKPOINT] = checkpoint
+        self._data[_Keys.COMPLETE] = False
+        self._data[_Keys.SHUTDOWN] = (
+            shutdown if shutdown is not None else ShutdownCoordinator()
+        )
+        self._data[_Keys.FRONTIER] = (
+            frontier if frontier is not None else LifoFrontier()
+        )
+
     @property
-    def has_stop_set(self) -> bool:
-        """Returns stop flag."""
-        if self._stop_event:
-            return self._stop_event.is_set()
-        return False
+    def complete(self) -> bool:
+        """Returns True if the last walk was not broken."""
+        return self._data[_Keys.COMPLETE]
+
+    @property
+    def shutdown(self) -> ShutdownCoordinator:
+        """Returns shutdown coordinator."""
+        return self._data[_Keys.SHUTDOWN]
+
+    def run(
+        self,
+        start_ip: Address,
+        limit: int = 0,
+        stop: Optional[Callable[[], bool]] = None,
+        bootstrap: bool = False,
+        resume: bool = False,
+    ) -> int:
+        """Walks the network from start_ip.
+
+        ### Arguments:
+        - start_ip [Address] - originating router.
+        - limit [int] - maximum number of routers, no limit if 0.
+        - stop [Optional[Callable[[], bool]]] - returns True to break the walk.
+        - bootstrap [bool] - seed the run list from the start router LSDB.
+        - resume [bool] - continue the walk saved in checkpoint.
+
+        ### Returns:
+        int - number of processed routers.
+        """
+        processor: Processor = self._data[_Keys.PROCESSOR]
+        comms_queue: Queue = self._data[_Keys.QUEUE]
+        run_limit: int = self._data[_Keys.WORKERS]
+        checkpoint: Optional[CrawlCheckpoint] = self._data[_Keys.CHECKPOINT]
+        frontier: IFrontier = self._data[_Keys.FRONTIER]
+        visited: Set[int] = {int(start_ip)}
+        th_run: Dict[Future, int] = {}
+        completed: List[int] = []
+        count: int = 0
+        self._data[_Keys.COMPLETE] = False
+        frontier.clear()
+
+        state: Optional[CrawlState] = None
+        if resume:
+            if checkpoint is not None:
+                state = checkpoint.load()
+            if state is None:
+                self.logs.message_warning = "checkpoint not found, starting new crawl"
+        if state is not None:
+            if state.start != int(start_ip):
+                self.logs.message_warning = (
+                    f"checkpoint was started from {Address(state.start)}"
+                )
+            visited = set(state.visited)
+            for rid in state.frontier:
+                frontier.push(rid)
+            completed = state.completed
+            self.logs.message_notice = (
+                f"resuming crawl: {len(completed)} routers processed, "
+                f"{len(frontier)} in run list"
+            )
+        else:
+            if bootstrap:
+                seeds: List[int] = [
+                    int(ip) for ip in processor.lsdb(start_ip) if ip != start_ip
+                ]
+                visited.update(seeds)
+                for rid in reversed(seeds):
+                    frontier.push(rid)
+                self.logs.message_notice = (
+                    f"OSPF LSDB bootstrap: {len(seeds)} routers added to run list"
+                )
+            # in depth-first order the start router is collected first
+            frontier.push(int(start_ip))
+
+        # long-lived workers, connections are closed inside the job
+        executor = ThreadPoolExecutor(
+            max_workers=run_limit, thread_name_prefix="Processor"
+        )
+        try:
+            while frontier or th_run:
+
+                # add new jobs to run list, the address is created for the job
+                while frontier and len(th_run) < run_limit:
+                    rid: int = frontier.pop()
+                    th_run[executor.submit(processor.collect, Address(rid))] = rid
+
+                # check run list
+                done, _ = wait(th_run, timeout=0.2, return_when=FIRST_COMPLETED)
+                for job in done:
+                    rid = th_run.pop(job)
+                    count += 1
+                    completed.append(rid)
+                    rb: Optional[RBData] = None
+                    try:
+                        rb = job.result()
+                    except Exception as e:
+                        self.logs.message_error = (
+                            f"[{int_to_str(rid)}] collector error: {e}"
+                        )
+                    if rb:
+                        # add to database queue
+                        comms_queue.put(rb)
+                    if rb and rb.routers:
+                        # add neighbor routers
+                        for neighbor, *_ in rb.routers.records():
+                            if neighbor is not None and neighbor not in visited:
+                                if self.debug:
+                                    self.logs.debug(
+                                        "add %s to router list", int_to_str(neighbor)
+                                    )
+                                visited.add(neighbor)
+                                frontier.push(neighbor)
+
+                if limit > 0 and count >= limit:
+                    # short procedure for debugging purpose
+                    break
+
+                if stop is not None and stop():
+                    # TERM or INT signal was set
+                    break
+
+                if checkpoint is not None:
+                    self.__save(
+                        checkpoint, start_ip, frontier, th_run, visited, completed
+                    )
+            else:
+                self._data[_Keys.COMPLETE] = True
+        finally:
+            # cleanup after break, running jobs end after current stage
+            processor.stop()
+            running: List[Future] = list(th_run)
+            if not self.shutdown.run(
+                "workers",
+                lambda timeout: self.__join(running, timeout),
+                self.STOP_TIMEOUT,
+            ):
+                # jobs are waiting for router replies
+                processor.cancel()
+                self.shutdown.run(
+                    "cancel",
+                    lambda timeout: self.__join(running, timeout),
+                    self.CANCEL_TIMEOUT,
+                )
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if checkpoint is not None:
+            if self.complete:
+                checkpoint.remove()
+            else:
+                # results of the running jobs are dropped, run them again
+                self.__save(
+                    checkpoint, start_ip, frontier, th_run, visited, completed, True
+                )
+                self.logs.message_notice = (
+                    f"crawl state saved to '{checkpoint.path}', "
+                    f"{len(frontier) + len(th_run)} routers left in run list"
+                )
+        return count
+
+    @staticmethod
+    def __join(jobs: List[Future], timeout: float) -> bool:
+        """Waits for jobs, returns True if all of them are finished."""
+        _, running = wait(jobs, timeout=timeout)
+        return not running
+
+    def __save(
+        self,
+        checkpoint: CrawlCheckpoint,
+        start_ip: Address,
+        frontier: IFrontier,
+        th_run: Dict[Future, int],
+        visited: Set[int],
+        completed: List[int],
+        force: bool = False,
+    ) -> None:
+        """Saves crawl state, running jobs stay in the run list.
+
+        The lists are copied only when the checkpoint is written.
+        """
+        try:
+            checkpoint.save(
+                int(start_ip),
+                chain(frontier, th_run.values()),
+                visited,
+                completed,
+                force,
+            )
+        except OSError as e:
+            self.logs.message_error = f"checkpoint writing error: {e}"
 
 
 # #[EOF]#######################################################################
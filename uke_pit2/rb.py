@@ -8,19 +8,43 @@
 """
 
 import re
+import sys
 
 from abc import ABC, abstractmethod
-from typing import Optional, Union, List, Dict, Any
+from array import array
+from threading import Event, Lock
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Type,
+    Union,
+)
 
 from jsktoolbox.attribtool import ReadOnlyClass
-from jsktoolbox.logstool.logs import LoggerClient, LoggerQueue
-from jsktoolbox.libs.base_data import BData
+from jsktoolbox.logstool.logs import LoggerQueue
 from jsktoolbox.netaddresstool.ipv4 import Address, Network
 from jsktoolbox.devices.mikrotik.routerboard import RouterBoard
 from jsktoolbox.devices.mikrotik.elements.libs.search import RBQuery
 from jsktoolbox.devices.mikrotik.base import Element
 
-from uke_pit2.base import BLogs, BDebug, BVerbose, BRouterBoard
+from uke_pit2.base import (
+    BDebug,
+    BFastData,
+    BLogs,
+    BMetrics,
+    BRouterBoard,
+    BVerbose,
+)
+from uke_pit2.ipv4 import in_network, int_to_str, str_to_int, str_to_network
+from uke_pit2.logs import LogsClient
+from uke_pit2.metrics import CrawlMetrics
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
@@ -33,22 +57,223 @@ class _Keys(object, metaclass=ReadOnlyClass):
     VLAN: str = "__vlan__"
 
     # RBData keys
+    COLLECTOR: str = "__rb_collector__"
     CUSTOMERS: str = "__rb_data_customers__"
+    FIRMWARE: str = "__rb_firmware__"
     ROUTERS: str = "__rb_data_routers__"
     RID: str = "__rb_router_id__"
+    VRUNS: str = "__rb_version_runs__"
+
+    # CollectorCache keys
+    ENTRIES: str = "__entries__"
+    LOCK: str = "__lock__"
+    READY: str = "__ready__"
+    REVALIDATE: str = "__revalidate__"
+
+
+class RouterColumns(object):
+    """Compact storage for neighbor routers data.
+
+    Records are kept in parallel 'array' columns with interned interface
+    names. Items are returned as dicts, the same as produced by collectors:
+    {'router-id': Address, 'address': Address, 'interface': str,
+    'vlan-id': Optional[int], 'network': Optional[Network]}.
+    Hot paths should use 'add' and 'records' with int addresses.
+    """
+
+    # flags
+    RID: int = 0x01
+    ADDRESS: int = 0x02
+    NETWORK: int = 0x04
+
+    __slots__ = (
+        "__flags",
+        "__rid",
+        "__address",
+        "__network",
+        "__prefix",
+        "__vlan",
+        "__interface",
+    )
 
+    def __init__(self) -> None:
+        """RouterColumns constructor."""
+        self.__flags = array("B")
+        self.__rid = array("I")
+        self.__address = array("I")
+        self.__network = array("I")
+        self.__prefix = array("B")
+        self.__vlan = array("H")
+        self.__interface: List[str] = []
+
+    def add(
+        self,
+        router_id: Optional[int],
+        address: Optional[int],
+        interface: str = "",
+        vlan_id: Optional[int] = None,
+        network: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """Adds router record.
+
+        ### Arguments:
+        - router_id [Optional[int]] - neighbor router-id,
+        - address [Optional[int]] - neighbor address,
+        - interface [str] - local interface name,
+        - vlan_id [Optional[int]] - vlan-id of local interface,
+        - network [Optional[Tuple[int, int]]] - (network, prefix) of connection.
+        """
+        flags: int = 0
+        if router_id is not None:
+            flags |= self.RID
+        if address is not None:
+            flags |= self.ADDRESS
+        if network is not None:
+            flags |= self.NETWORK
+        else:
+            network = (0, 0)
+        self.__flags.append(flags)
+        self.__rid.append(router_id or 0)
+        self.__address.append(address or 0)
+        self.__network.append(network[0])
+        self.__prefix.append(network[1])
+        self.__vlan.append(int(vlan_id) if vlan_id else 0)
+        self.__interface.append(sys.intern(interface or ""))
+
+    def append(self, item: Dict[str, Any]) -> None:
+        """Adds router record in collector dict format."""
+        network: Optional[Network] = item.get("network")
+        self.add(
+            int(item["router-id"]) if item.get("router-id") is not None else None,
+            int(item["address"]) if item.get("address") is not None else None,
+            item.get("interface") or "",
+            item.get("vlan-id"),
+            (
+                (int(network.network), int(network.mask.cidr))
+                if network is not None
+                else None
+            ),
+        )
+
+    def records(
+        self,
+    ) -> Iterator[
+        Tuple[
+            Optional[int],
+            Optional[int],
+            str,
+            Optional[int],
+            Optional[Tuple[int, int]],
+        ]
+    ]:
+        """Iterates over (router-id, address, interface, vlan-id, network) tuples."""
+        for index, flags in enumerate(self.__flags):
+            yield (
+                self.__rid[index] if flags & self.RID else None,
+                self.__address[index] if flags & self.ADDRESS else None,
+                self.__interface[index],
+                self.__vlan[index] or None,
+                (
+                    (self.__network[index], self.__prefix[index])
+                    if flags & self.NETWORK
+                    else None
+                ),
+            )
 
-class RBData(BData):
-    """Router board data container class."""
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """Returns router record as dict."""
+        flags: int = self.__flags[index]
+        out: Dict[str, Any] = {}
+        if flags & self.RID:
+            out["router-id"] = Address(self.__rid[index])
+        if flags & self.ADDRESS:
+            out["address"] = Address(self.__address[index])
+            out["interface"] = self.__interface[index]
+            out["vlan-id"] = self.__vlan[index] or None
+            out["network"] = (
+                Network([Address(self.__network[index]), self.__prefix[index]])
+                if flags & self.NETWORK
+                else None
+            )
+        return out
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterates over router records."""
+        for index in range(len(self.__flags)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        """Returns number of records."""
+        return len(self.__flags)
+
+    def __repr__(self) -> str:
+        return f"{list(self)}"
+
+
+class CustomerColumns(object):
+    """Compact storage for connected customers data.
+
+    Addresses are kept in 'array' column, items are returned as dicts:
+    {'name': str, 'address': str}.
+    """
+
+    __slots__ = ("__name", "__address")
 
     def __init__(self) -> None:
+        """CustomerColumns constructor."""
+        self.__name: List[str] = []
+        self.__address = array("I")
+
+    def add(self, name: str, address: int) -> None:
+        """Adds customer record."""
+        self.__address.append(address)
+        self.__name.append(name)
+
+    def append(self, item: Dict[str, str]) -> None:
+        """Adds customer record in collector dict format."""
+        self.add(item["name"], str_to_int(item["address"]))
+
+    def records(self) -> Iterator[Tuple[str, int]]:
+        """Iterates over (name, address) tuples."""
+        return zip(self.__name, self.__address)
+
+    def __getitem__(self, index: int) -> Dict[str, str]:
+        """Returns customer record as dict."""
+        return {
+            "name": self.__name[index],
+            "address": int_to_str(self.__address[index]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """Iterates over customer records."""
+        for index in range(len(self.__name)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        """Returns number of records."""
+        return len(self.__name)
+
+    def __repr__(self) -> str:
+        return f"{list(self)}"
+
+
+class RBData(BFastData):
+    """Router board data container class."""
+
+    def __init__(
+        self,
+        routers: Optional[RouterColumns] = None,
+        customers: Optional[CustomerColumns] = None,
+    ) -> None:
         """RBData constructor."""
-        self._data[_Keys.ROUTERS] = []
-        self._data[_Keys.CUSTOMERS] = []
+        self._data[_Keys.ROUTERS] = routers if routers is not None else RouterColumns()
+        self._data[_Keys.CUSTOMERS] = (
+            customers if customers is not None else CustomerColumns()
+        )
 
     @property
-    def customers(self) -> List[Dict[str, str]]:
-        """Returns list of dict for connected customers."""
+    def customers(self) -> CustomerColumns:
+        """Returns connected customers records."""
         return self._data[_Keys.CUSTOMERS]
 
     @property
@@ -62,10 +287,42 @@ class RBData(BData):
         self._set_data(key=_Keys.RID, value=address)
 
     @property
-    def routers(self) -> List[Dict[str, Any]]:
-        """Returns list of dict for neighbor routers."""
+    def routers(self) -> RouterColumns:
+        """Returns neighbor routers records."""
         return self._data[_Keys.ROUTERS]
 
+    @property
+    def collector(self) -> Optional[str]:
+        """Returns name of the collector class used."""
+        return self._get_data(key=_Keys.COLLECTOR, set_default_type=Optional[str])
+
+    @collector.setter
+    def collector(self, value: Optional[str]) -> None:
+        """Sets name of the collector class used."""
+        self._set_data(key=_Keys.COLLECTOR, value=value)
+
+    @property
+    def firmware(self) -> Optional[str]:
+        """Returns router firmware version."""
+        return self._get_data(key=_Keys.FIRMWARE, set_default_type=Optional[str])
+
+    @firmware.setter
+    def firmware(self, value: Optional[str]) -> None:
+        """Sets router firmware version."""
+        self._set_data(key=_Keys.FIRMWARE, value=value)
+
+    @property
+    def version_runs(self) -> int:
+        """Returns number of runs with cached collector since version check."""
+        return self._get_data(
+            key=_Keys.VRUNS, set_default_type=int, default_value=0
+        )  # type: ignore
+
+    @version_runs.setter
+    def version_runs(self, value: int) -> None:
+        """Sets number of runs with cached collector since version check."""
+        self._set_data(key=_Keys.VRUNS, value=value)
+
     def __repr__(self) -> str:
         return f"{self._c_name}(router-id: {self.router_id}, routers: {self.routers}, customers: {self.customers})"
 
@@ -82,76 +339,266 @@ class IRouterBoardCollector(ABC):
         """Returns collected data."""
 
 
-class RouterBoardVersion(BLogs, BDebug, BVerbose, BRouterBoard):
+class CollectorRegistry(object):
+    """Registry of the collector classes by RouterOS firmware version.
+
+    A collector for a new RouterOS version is added by decorating its
+    class with 'CollectorRegistry.register(pattern)', RouterBoardVersion
+    does not need any changes.
+    """
+
+    __collectors: Dict[str, Tuple[Pattern[str], type]] = {}
+
+    @classmethod
+    def register(cls, pattern: str) -> Callable[[type], type]:
+        """Returns class decorator registering collector for firmware pattern.
+
+        ### Arguments:
+        - pattern [str] - regular expression matched with 'current-firmware'.
+        """
+
+        def decorator(collector: type) -> type:
+            cls.__collectors[collector.__name__] = (re.compile(pattern), collector)
+            return collector
+
+        return decorator
+
+    @classmethod
+    def find(cls, firmware: str) -> Optional[type]:
+        """Returns collector class for firmware version or None."""
+        for pattern, collector in cls.__collectors.values():
+            if pattern.match(firmware):
+                return collector
+        return None
+
+    @classmethod
+    def get(cls, name: str) -> Optional[type]:
+        """Returns collector class by name or None."""
+        item: Optional[Tuple[Pattern[str], type]] = cls.__collectors.get(name)
+        return item[1] if item is not None else None
+
+
+class CollectorCache(BFastData):
+    """Per-router cache of the detected collector class and firmware.
+
+    Entries are loaded from database by DbProcessor, until then every
+    lookup misses. A cached collector is used for 'revalidate' runs, after
+    that the RouterOS version is checked again.
+    """
+
+    def __init__(self, revalidate: int = 10) -> None:
+        """CollectorCache constructor.
+
+        ### Arguments:
+        - revalidate [int] - number of runs using cached entry.
+        """
+        self._data[_Keys.ENTRIES] = {}
+        self._data[_Keys.LOCK] = Lock()
+        self._data[_Keys.READY] = Event()
+        self._data[_Keys.REVALIDATE] = revalidate
+
+    def load(self, rows: Iterable[Tuple[int, str, str, int]]) -> None:
+        """Loads (router-id, collector, firmware, runs) entries."""
+        with self._data[_Keys.LOCK]:
+            for router_id, collector, firmware, runs in rows:
+                self._data[_Keys.ENTRIES][router_id] = (collector, firmware, runs)
+        self._data[_Keys.READY].set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for entries loading, returns True if loaded."""
+        return self._data[_Keys.READY].wait(timeout)
+
+    def get(self, router_id: int) -> Optional[Tuple[str, str, int]]:
+        """Returns (collector, firmware, runs) if entry is still valid."""
+        if not self._data[_Keys.READY].is_set():
+            return None
+        with self._data[_Keys.LOCK]:
+            entry: Optional[Tuple[str, str, int]] = self._data[_Keys.ENTRIES].get(
+                router_id
+            )
+        if entry is None or entry[2] >= self._data[_Keys.REVALIDATE]:
+            return None
+        return entry
+
+    def __len__(self) -> int:
+        """Returns number of entries."""
+        return len(self._data[_Keys.ENTRIES])
+
+
+def release_elements(rb: RouterBoard) -> int:
+    """Breaks Element tree of the router board, returns number of elements.
+
+    Every element keeps a reference to its parent, so the tree with the
+    loaded menu tables is freed only by the cyclic garbage collector.
+    Without child references the tree is freed as soon as it is dropped.
+    """
+    count: int = 0
+    stack: List[Any] = [rb]
+    while stack:
+        item = stack.pop()
+        stack.extend(item.elements.values())
+        item.elements.clear()
+        count += 1
+    return count
+
+
+class RouterBoardVersion(BLogs, BDebug, BVerbose, BRouterBoard, BMetrics):
     """ROS Version checker class."""
 
+    # menu read by the version check
+    MENU: str = "/system/routerboard/"
+    # menus read by the collectors of every version
+    MENUS: Tuple[str, ...] = (
+        "/interface/ethernet/",
+        "/interface/vlan/",
+        "/routing/ospf/neighbor/",
+        "/ip/address/",
+        "/ppp/active/",
+    )
+
     def __init__(
         self,
         logger_queue: LoggerQueue,
         rb_handler: RouterBoard,
         debug: bool = False,
         verbose: bool = False,
+        metrics: Optional[CrawlMetrics] = None,
     ) -> None:
         """Collector constructor."""
 
-        self.logs = LoggerClient(logger_queue, self._c_name)
+        self.logs = LogsClient(logger_queue, self._c_name)
         self.rb = rb_handler
         self.debug = debug
         self.verbose = verbose
+        self.metrics = metrics
+        self.firmware = None
 
-    def get_collector(self) -> Optional[IRouterBoardCollector]:
-        """Returns collector proper for rb version."""
+    def get_firmware(self) -> Optional[str]:
+        """Returns 'current-firmware' of router board or None."""
 
         if self.rb:
-            out: Optional[Element] = self.rb.element(
-                "/system/routerboard/", auto_load=True
-            )
+            with self._timer("fetch", self.MENU):
+                out: Optional[Element] = self.rb.element(self.MENU, auto_load=True)
             if out:
                 rbq = RBQuery()
                 rbq.add_attrib("current-firmware")
-                if self.debug and self.verbose:
-                    self.logs.message_debug = f"{out.search(rbq.query)}"
                 search_query: Optional[Union[List[Any], Dict[Any, Any]]] = out.search(
                     rbq.query
                 )
+                if self.debug and self.verbose:
+                    self.logs.message_debug = f"{search_query}"
                 if (
                     search_query
                     and isinstance(search_query, Dict)
                     and "current-firmware" in search_query
                 ):
-                    ver = search_query["current-firmware"]
-                    if self.debug:
-                        self.logs.message_debug = f"The version is: {ver}"
-
-                    if re.match(r"^6\.", ver):
-                        if self.logs.logs_queue:
-                            return RouterBoardCollector6(
-                                logger_queue=self.logs.logs_queue,
-                                rb_handler=self.rb,
-                                debug=self.debug,
-                            )
-                    elif re.match(r"^7\.", ver):
-                        if self.logs.logs_queue:
-                            return RouterBoardCollector7(
-                                logger_queue=self.logs.logs_queue,
-                                rb_handler=self.rb,
-                                debug=self.debug,
-                            )
+                    return search_query["current-firmware"]
+        return None
 
+    def get_collector(self) -> Optional[IRouterBoardCollector]:
+        """Returns collector proper for rb version."""
+
+        ver: Optional[str] = self.get_firmware()
+        if ver is None:
+            return None
+        if self.debug:
+            self.logs.message_debug = f"The version is: {ver}"
+        self.firmware = ver
+        collector: Optional[type] = CollectorRegistry.find(ver)
+        if collector is None:
+            self.logs.message_warning = f"collector for version '{ver}' not found"
+            return None
+        return self.create_collector(collector)
+
+    def create_collector(self, collector: type) -> Optional[IRouterBoardCollector]:
+        """Returns collector object of given class."""
+
+        if self.rb and self.logs.logs_queue:
+            return collector(
+                logger_queue=self.logs.logs_queue,
+                rb_handler=self.rb,
+                debug=self.debug,
+                metrics=self.metrics,
+            )
         return None
 
+    @property
+    def firmware(self) -> Optional[str]:
+        """Returns firmware version found by 'get_collector'."""
+        return self._get_data(key=_Keys.FIRMWARE, set_default_type=Optional[str])
+
+    @firmware.setter
+    def firmware(self, value: Optional[str]) -> None:
+        """Sets firmware version."""
+        self._set_data(key=_Keys.FIRMWARE, value=value)
+
 
-class __Collector(BLogs, BDebug, BRouterBoard):
+class OspfLsdb(BLogs, BDebug, BRouterBoard, BMetrics):
+    """OSPF link-state database reader.
+
+    Every router of an area keeps the router LSA of all the other routers
+    of the area, so originators of the router LSAs give the full list of
+    the area router-ids from a single router.
+    """
+
+    def __init__(
+        self,
+        logger_queue: LoggerQueue,
+        rb_handler: RouterBoard,
+        debug: bool = False,
+        metrics: Optional[CrawlMetrics] = None,
+    ) -> None:
+        """OspfLsdb constructor."""
+
+        self.logs = LogsClient(logger_queue, self._c_name)
+        self.rb = rb_handler
+        self.debug = debug
+        self.metrics = metrics
+
+    def router_ids(self) -> List[int]:
+        """Returns router-ids of router LSA originators, in LSDB order."""
+        out: Dict[int, None] = {}
+        if not self.rb:
+            return []
+        # example (ROS 7):
+        # {'.id': '*2', 'instance': 'default-v2', 'area': 'backbone', 'type': 'router', 'originator': '10.1.0.165',
+        # 'id': '10.1.0.165', 'sequence': '0x80000a3c', 'age': '1093', 'checksum': '0x5a6b', 'body': '...'}
+        # ROS 6 has the same 'area', 'type', 'id' and 'originator' fields
+        with self._timer("fetch", "/routing/ospf/lsa/"):
+            lsa: Optional[Element] = self.rb.element(
+                "/routing/ospf/lsa/", auto_load=True
+            )
+        if not lsa:
+            return []
+        rbq = RBQuery()
+        rbq.add_attrib("type", "router")
+        search: Optional[Union[List[Any], Dict[Any, Any]]] = lsa.search(rbq.query)
+        if isinstance(search, Dict):
+            search = [search]
+        for item in search or []:
+            if "originator" in item:
+                out[str_to_int(item["originator"])] = None
+        if self.debug:
+            self.logs.debug("found %d router LSA", len(out))
+        return list(out)
+
+
+class __Collector(BLogs, BDebug, BRouterBoard, BMetrics, BFastData):
     """Private Collector main class."""
 
     def __init__(
-        self, logger_queue: LoggerQueue, rb_handler: RouterBoard, debug: bool = False
+        self,
+        logger_queue: LoggerQueue,
+        rb_handler: RouterBoard,
+        debug: bool = False,
+        metrics: Optional[CrawlMetrics] = None,
     ) -> None:
         """Collector constructor."""
 
-        self.logs = LoggerClient(logger_queue, "RouterBoardCollector")
+        self.logs = LogsClient(logger_queue, "RouterBoardCollector")
         self.rb = rb_handler
         self.debug = debug
+        self.metrics = metrics
 
         # init tables
         self._data[_Keys.ETHER] = None
@@ -160,6 +607,19 @@ class __Collector(BLogs, BDebug, BRouterBoard):
         self._data[_Keys.NEIGHBOR] = None
         self._data[_Keys.PPP] = None
 
+    def _release(self) -> None:
+        """Drops references to the menu elements."""
+        self.ethers = None
+        self.vlans = None
+        self.neighbors = None
+        self.addresses = None
+        self.ppp = None
+
+    def _element(self, path: str) -> Optional[Element]:
+        """Returns loaded menu element, the fetch time goes to metrics."""
+        with self._timer("fetch", path):
+            return self.rb.element(path, auto_load=True)  # type: ignore
+
     def __get_vlan_interface(
         self, interface: str
     ) -> tuple[Optional[str], Optional[int]]:
@@ -185,23 +645,12 @@ class __Collector(BLogs, BDebug, BRouterBoard):
         return real_interface, vlan_id
 
     def __get_neighbor_interface(
-        self, address: Address
-    ) -> tuple[str, Optional[int], Optional[Network]]:
-        """Returns real interface name and optional vlan-id."""
-        # neighbor = RBQuery()
-        # neighbor.add_attrib("address", str(address))
-
-        # if self.neighbors:
-        #     neighbor_search: Optional[Union[List[Any], Dict[Any, Any]]] = (
-        #         self.neighbors.search(neighbor.query)
-        #     )
-        #     if neighbor_search and isinstance(neighbor_search, List):
-        #         self.logs.message_debug = f"{neighbor_search}"
-
-        # compare addresses
+        self, address: int
+    ) -> Tuple[str, Optional[int], Optional[Tuple[int, int]]]:
+        """Returns real interface name, optional vlan-id and (network, prefix)."""
         interface: str = ""
         vlan_id: Optional[int] = None
-        network: Optional[Network] = None
+        network: Optional[Tuple[int, int]] = None
 
         addresses = RBQuery()
         addresses.add_attrib("dynamic", "false")
@@ -214,10 +663,9 @@ class __Collector(BLogs, BDebug, BRouterBoard):
             if search and isinstance(search, List):
                 for item in search:
                     if "address" in item:
-                        network = Network(item["address"])
-                        if address >= network.network and address <= network.broadcast:
+                        network = str_to_network(item["address"])
+                        if in_network(address, *network):
                             # found item
-                            # self.logs.message_debug = f"{search}"
                             interface = item["interface"]
                             break
 
@@ -235,9 +683,25 @@ class __Collector(BLogs, BDebug, BRouterBoard):
 
         return interface, vlan_id, network
 
-    def _build_routers_data(self) -> List[Dict[str, Any]]:
-        """Build and returns list of routers data from collected elements."""
-        out: List[Dict[str, Any]] = []
+    def __add_router(self, out: RouterColumns, item: Dict[str, Any]) -> None:
+        """Adds neighbor record to routers data."""
+        router_id: Optional[int] = None
+        if "router-id" in item:
+            router_id = str_to_int(item["router-id"])
+        if "address" in item:
+            address: int = str_to_int(item["address"])
+            # search for interface
+            inf: str
+            vlan_id: Optional[int]
+            network: Optional[Tuple[int, int]]
+            inf, vlan_id, network = self.__get_neighbor_interface(address)
+            out.add(router_id, address, inf, vlan_id, network)
+        else:
+            out.add(router_id, None)
+
+    def _build_routers_data(self) -> RouterColumns:
+        """Build and returns routers data from collected elements."""
+        out = RouterColumns()
         neighbors = RBQuery()
         neighbors.add_attrib("state", "Full")
         if self.neighbors:
@@ -246,44 +710,14 @@ class __Collector(BLogs, BDebug, BRouterBoard):
             )
             if search and isinstance(search, List):
                 for item in search:
-                    tmp: Dict[str, Any] = {}
-                    if "router-id" in item:
-                        tmp["router-id"] = Address(item["router-id"])
-                    if "address" in item:
-                        tmp["address"] = Address(item["address"])
-                        # search for interface
-                        inf: str
-                        vlan_id: Optional[int]
-                        network: Optional[Network]
-                        inf, vlan_id, network = self.__get_neighbor_interface(
-                            Address(item["address"])
-                        )
-                        tmp["interface"] = inf
-                        tmp["vlan-id"] = vlan_id
-                        tmp["network"] = network
-                    out.append(tmp)
+                    self.__add_router(out, item)
             elif search and isinstance(search, Dict):
-                tmp: Dict[str, Any] = {}
-                if "router-id" in search:
-                    tmp["router-id"] = Address(search["router-id"])
-                if "address" in search:
-                    tmp["address"] = Address(search["address"])
-                    # search for interface
-                    inf: str
-                    vlan_id: Optional[int]
-                    network: Optional[Network]
-                    inf, vlan_id, network = self.__get_neighbor_interface(
-                        Address(search["address"])
-                    )
-                    tmp["interface"] = inf
-                    tmp["vlan-id"] = vlan_id
-                    tmp["network"] = network
-                out.append(tmp)
+                self.__add_router(out, search)
         return out
 
-    def _build_customers_data(self) -> List[Dict[str, str]]:
-        """Builds and returns connected customer list."""
-        out: List[Dict[str, str]] = []
+    def _build_customers_data(self) -> CustomerColumns:
+        """Builds and returns connected customers data."""
+        out = CustomerColumns()
         customer = RBQuery()
         customer.add_attrib("service", "pppoe")
         if self.ppp:
@@ -298,19 +732,11 @@ class __Collector(BLogs, BDebug, BRouterBoard):
                     # {'.id': '*80000068', 'name': 'D4:CA:6D:D5:82:E3', 'service': 'pppoe', 'caller-id': 'B4:FB:E4:BE:86:DB',
                     # 'address': '10.30.214.21', 'uptime': '5d18h59m42s', 'encoding': '', 'session-id': '0x81000068', 'limit-bytes-in': '0',
                     # 'limit-bytes-out': '0', 'radius': 'true'}
-                    tmp: Dict[str, str] = {}
                     if "name" in item and "address" in item:
-                        tmp["name"] = item["name"]
-                        tmp["address"] = item["address"]
-                    if tmp:
-                        out.append(tmp)
+                        out.add(item["name"], str_to_int(item["address"]))
             elif search and isinstance(search, Dict):
-                tmp: Dict[str, str] = {}
                 if "name" in search and "address" in search:
-                    tmp["name"] = search["name"]
-                    tmp["address"] = search["address"]
-                if tmp:
-                    out.append(tmp)
+                    out.add(search["name"], str_to_int(search["address"]))
         return out
 
     @property
@@ -361,6 +787,7 @@ class __Collector(BLogs, BDebug, BRouterBoard):
         # self.logs.message_debug = f"{self.ppp}"
 
 
+@CollectorRegistry.register(r"^6\.")
 class RouterBoardCollector6(IRouterBoardCollector, __Collector):
     """Collector class for ROS 6."""
 
@@ -386,7 +813,7 @@ class RouterBoardCollector6(IRouterBoardCollector, __Collector):
         # 'tx-rx-65-127': '20979172934', 'tx-rx-128-255': '2202001769', 'tx-rx-256-511': '1194620381', 'tx-rx-512-1023': '1250729860',
         # 'tx-rx-1024-1518': '55351848828', 'rx-unicast': '24732296476', 'tx-unicast': '59818934528', 'running': 'true',
         # 'disabled': 'false', 'comment': 'SOHO'}
-        self.ethers = self.rb.element("/interface/ethernet/", auto_load=True)
+        self.ethers = self._element("/interface/ethernet/")
 
         # vlans
         # example:
@@ -397,41 +824,37 @@ class RouterBoardCollector6(IRouterBoardCollector, __Collector):
         # 'l2mtu': '1588', 'mac-address': 'DC:2C:6E:0F:57:67', 'arp': 'enabled', 'arp-timeout': 'auto', 'loop-protect': 'default',
         # 'loop-protect-status': 'off', 'loop-protect-send-interval': '5s', 'loop-protect-disable-time': '5m', 'vlan-id': '222',
         # 'interface': 'ether9', 'use-service-tag': 'false', 'running': 'true', 'disabled': 'false'}
-        self.vlans = self.rb.element("/interface/vlan/", auto_load=True)
+        self.vlans = self._element("/interface/vlan/")
 
         # ospf-neighbors
         # example:
         # {'.id': '*30C5B8', 'instance': 'default', 'router-id': '10.1.68.154', 'address': '10.0.68.226', 'interface': 'vlan154-air_kosowo',
         # 'priority': '1', 'dr-address': '0.0.0.0', 'backup-dr-address': '0.0.0.0', 'state': 'Full', 'state-changes': '8',
         # 'ls-retransmits': '0', 'ls-requests': '0', 'db-summaries': '0', 'adjacency': '14w6d14h42m11s'}
-        self.neighbors = self.rb.element("/routing/ospf/neighbor/", auto_load=True)
+        self.neighbors = self._element("/routing/ospf/neighbor/")
 
         # address
         # example:
         # {'.id': '*A', 'address': '10.0.68.225/30', 'network': '10.0.68.224', 'interface': 'vlan154-air_kosowo',
         # 'actual-interface': 'vlan154-air_kosowo', 'invalid': 'false', 'dynamic': 'false', 'disabled': 'false'}
-        self.addresses = self.rb.element("/ip/address/", auto_load=True)
+        self.addresses = self._element("/ip/address/")
 
         # ppp
         # example
         # {'.id': '*80000077', 'name': '48:8F:5A:7C:13:3A', 'service': 'pppoe', 'caller-id': 'B8:69:F4:B7:52:BB',
         # 'address': '10.30.246.13', 'uptime': '3d17h14m31s', 'encoding': '', 'session-id': '0x81300077', 'limit-bytes-in': '0',
         # 'limit-bytes-out': '0', 'radius': 'true'}
-        self.ppp = self.rb.element("/ppp/active/", auto_load=True)
+        self.ppp = self._element("/ppp/active/")
 
     def get_data(self) -> RBData:
-        """Returns RBData objects."""
-        out = RBData()
-        # routers
-        for item in self._build_routers_data():
-            out.routers.append(item)
-        # customers
-        for item in self._build_customers_data():
-            out.customers.append(item)
-
+        """Returns RBData objects, menu elements are released."""
+        with self._timer("build"):
+            out = RBData(self._build_routers_data(), self._build_customers_data())
+        self._release()
         return out
 
 
+@CollectorRegistry.register(r"^7\.")
 class RouterBoardCollector7(IRouterBoardCollector, __Collector):
     """Collector class for ROS 7."""
 
@@ -459,7 +882,7 @@ class RouterBoardCollector7(IRouterBoardCollector, __Collector):
         # 'tx-pause': '0', 'tx-multicast': '257942994', 'tx-underrun': '0', 'tx-excessive-collision': '0', 'tx-multiple-collision': '0',
         # 'tx-single-collision': '0', 'tx-deferred': '0', 'tx-late-collision': '0', 'tx-fcs-error': '63', 'tx-carrier-sense-error': '0',
         # 'running': 'true', 'disabled': 'false'}
-        self.ethers = self.rb.element("/interface/ethernet/", auto_load=True)
+        self.ethers = self._element("/interface/ethernet/")
 
         # vlans
         # example:
@@ -467,37 +890,32 @@ class RouterBoardCollector7(IRouterBoardCollector, __Collector):
         # 'arp-timeout': 'auto', 'loop-protect': 'default', 'loop-protect-status': 'off', 'loop-protect-send-interval': '5s',
         # 'loop-protect-disable-time': '5m', 'vlan-id': '165', 'interface': 'sfp-sfpplus2', 'use-service-tag': 'false', 'running': 'true',
         # 'disabled': 'false'}
-        self.vlans = self.rb.element("/interface/vlan/", auto_load=True)
+        self.vlans = self._element("/interface/vlan/")
 
         # ospf-neighbors
         # example:
         # {'.id': '*F3FED9A8', 'instance': 'ospf-lan', 'area': 'ospf-area-backbone', 'address': '10.0.0.74', 'router-id': '10.1.0.165',
         # 'state': 'Full', 'state-changes': '4', 'ls-retransmits': '2', 'adjacency': '1h49m55s', 'timeout': '32s', 'dynamic': 'true'}
-        self.neighbors = self.rb.element("/routing/ospf/neighbor/", auto_load=True)
+        self.neighbors = self._element("/routing/ospf/neighbor/")
 
         # address
         # example:
         # {'.id': '*25', 'address': '10.0.0.73/30', 'network': '10.0.0.72', 'interface': 'vlan165-dude', 'actual-interface': 'vlan165-dude',
         # 'invalid': 'false', 'dynamic': 'false', 'disabled': 'false'}
-        self.addresses = self.rb.element("/ip/address/", auto_load=True)
+        self.addresses = self._element("/ip/address/")
 
         # ppp
         # example
         # {'.id': '*80000068', 'name': 'D4:CA:6D:D5:82:E3', 'service': 'pppoe', 'caller-id': 'B4:FB:E4:BE:86:DB',
         # 'address': '10.30.214.21', 'uptime': '5d18h59m42s', 'encoding': '', 'session-id': '0x81000068', 'limit-bytes-in': '0',
         # 'limit-bytes-out': '0', 'radius': 'true'}
-        self.ppp = self.rb.element("/ppp/active/", auto_load=True)
+        self.ppp = self._element("/ppp/active/")
 
     def get_data(self) -> RBData:
-        """Returns RBData objects."""
-        out = RBData()
-        # routers
-        for item in self._build_routers_data():
-            out.routers.append(item)
-        # customers
-        for item in self._build_customers_data():
-            out.customers.append(item)
-
+        """Returns RBData objects, menu elements are released."""
+        with self._timer("build"):
+            out = RBData(self._build_routers_data(), self._build_customers_data())
+        self._release()
         return out
 
 
@@ -0,0 +1,930 @@
+# -*- coding: utf-8 -*-
+"""
+  report.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 14:52:08
+
+  Purpose: UKE PIT report generator.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from inspect import currentframe
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import Select, exists, func, select
+from sqlalchemy.orm import Session, aliased
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.datetool import Timestamp
+from jsktoolbox.libs.base_data import BData
+from jsktoolbox.logstool.logs import LoggerQueue
+from jsktoolbox.raisetool import Raise
+
+from uke_pit2.aggregate import CustomerAggregator
+from uke_pit2.base import BDebug, BLogs, BVerbose
+from uke_pit2.db import Database
+from uke_pit2.db_models.lms import TLmsDivision, TNetNode
+from uke_pit2.db_models.spider import (
+    TConnection,
+    TCustomer,
+    TDivisions,
+    TFlow,
+    TForeign,
+    TInterface,
+    TInterfaceName,
+    TMedium,
+    TNodeAssignment,
+    TRouter,
+)
+from uke_pit2.db_models.update import TLastUpdate
+from uke_pit2.ipv4 import int_to_str
+from uke_pit2.logs import LogsClient
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    AFFECTED: str = "__affected__"
+    COLUMNS: str = "__columns__"
+    DATABASE: str = "__database__"
+    INCREMENTAL: str = "__incremental__"
+    IP_COLUMNS: str = "__ip_columns__"
+    KEYS: str = "__keys__"
+    NAME: str = "__name__"
+    OUTPUT_DIR: str = "__output_dir__"
+    PARTITION: str = "__partition__"
+    SECTIONS: str = "__sections__"
+    SOURCES: str = "__sources__"
+    STATEMENT: str = "__statement__"
+    TIMINGS: str = "__timings__"
+    WORKERS: str = "__workers__"
+    YIELD_PER: str = "__yield_per__"
+
+
+class ReportSection(BData):
+    """Definition of a single report section.
+
+    A section is written to '<name>.csv' file. The select statement is
+    built on demand, columns listed in 'ip_columns' hold IPv4 addresses
+    stored as int and are converted to dotted notation. 'sources' are the
+    mapping classes of tables the section is built from.
+
+    A section with 'keys' and 'partition' set can be generated in parts.
+    The partition key is the first column of the section, rows are ordered
+    by it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[str],
+        statement: Optional[Callable[[], Select]],
+        sources: Sequence[Any],
+        ip_columns: Sequence[int] = (),
+        keys: Optional[Callable[[], Select]] = None,
+        partition: Optional[Callable[[Select, Sequence[Any]], Select]] = None,
+        affected: Optional[Callable[[Session, Set[int]], Set[Any]]] = None,
+    ) -> None:
+        """ReportSection constructor.
+
+        ### Arguments:
+        - name [str] - section name and output file base name,
+        - columns [Sequence[str]] - header of the section,
+        - statement [Optional[Callable[[], Select]]] - select statement factory,
+          None for sections which override 'rows',
+        - sources [Sequence[Any]] - mapping classes of source tables,
+        - ip_columns [Sequence[int]] - indexes of columns with int IPv4 addresses,
+        - keys [Optional[Callable[[], Select]]] - factory of ordered partition keys select,
+        - partition [Optional[Callable[[Select, Sequence[Any]], Select]]] - restricts
+          statement to given partition keys,
+        - affected [Optional[Callable[[Session, Set[int]], Set[Any]]]] - returns
+          additional partition keys affected by reassignment of given routers.
+        """
+        self._set_data(key=_Keys.NAME, set_default_type=str, value=name)
+        self._set_data(key=_Keys.COLUMNS, set_default_type=List, value=list(columns))
+        self._set_data(key=_Keys.STATEMENT, value=statement)
+        self._set_data(key=_Keys.SOURCES, set_default_type=List, value=list(sources))
+        self._set_data(
+            key=_Keys.IP_COLUMNS, set_default_type=Tuple, value=tuple(ip_columns)
+        )
+        self._set_data(key=_Keys.KEYS, value=keys)
+        self._set_data(key=_Keys.PARTITION, value=partition)
+        self._set_data(key=_Keys.AFFECTED, value=affected)
+
+    def __repr__(self) -> str:
+        return f"{self._c_name}(name='{self.name}')"
+
+    @property
+    def name(self) -> str:
+        """Returns section name."""
+        return self._get_data(key=_Keys.NAME)  # type: ignore
+
+    @property
+    def filename(self) -> str:
+        """Returns output file name."""
+        return f"{self.name}.csv"
+
+    @property
+    def columns(self) -> List[str]:
+        """Returns section columns names."""
+        return self._get_data(key=_Keys.COLUMNS)  # type: ignore
+
+    @property
+    def ip_columns(self) -> Tuple[int, ...]:
+        """Returns indexes of IPv4 columns."""
+        return self._get_data(key=_Keys.IP_COLUMNS)  # type: ignore
+
+    @property
+    def sources(self) -> List[Any]:
+        """Returns mapping classes of source tables."""
+        return self._get_data(key=_Keys.SOURCES)  # type: ignore
+
+    @property
+    def statement(self) -> Select:
+        """Returns new select statement for section."""
+        return self._get_data(key=_Keys.STATEMENT)()  # type: ignore
+
+    @property
+    def partitioned(self) -> bool:
+        """Returns True if section can be generated in parts."""
+        return (
+            self._get_data(key=_Keys.KEYS) is not None
+            and self._get_data(key=_Keys.PARTITION) is not None
+        )
+
+    def keys(self, session: Session) -> List[Any]:
+        """Returns ordered list of partition keys."""
+        if not self.partitioned:
+            return []
+        return list(session.scalars(self._get_data(key=_Keys.KEYS)()))  # type: ignore
+
+    def affected(self, session: Session, routers: Set[int]) -> Set[Any]:
+        """Returns additional partition keys affected by routers reassignment."""
+        callback = self._get_data(key=_Keys.AFFECTED)
+        if not routers or callback is None:
+            return set()
+        return callback(session, routers)
+
+    def rows(
+        self,
+        session: Session,
+        yield_per: int = 1000,
+        keys: Optional[Sequence[Any]] = None,
+    ) -> Iterator[Sequence[Any]]:
+        """Returns generator of section rows.
+
+        Rows are fetched in batches of 'yield_per' from a server-side cursor.
+        If 'keys' are given, only rows of these partition keys are returned.
+        """
+        ip_columns: Tuple[int, ...] = self.ip_columns
+        statement: Select = self.statement
+        if keys is not None and self.partitioned:
+            statement = self._get_data(key=_Keys.PARTITION)(statement, keys)  # type: ignore
+        result = session.execute(statement, execution_options={"yield_per": yield_per})
+        try:
+            for row in result:
+                if not ip_columns:
+                    yield row
+                    continue
+                yield self._convert(row, ip_columns)
+        finally:
+            result.close()
+
+    @staticmethod
+    def _convert(row: Sequence[Any], ip_columns: Tuple[int, ...]) -> List[Any]:
+        """Returns row with IPv4 columns in dotted notation."""
+        out: List[Any] = list(row)
+        for idx in ip_columns:
+            if out[idx] is not None:
+                out[idx] = int_to_str(out[idx])
+        return out
+
+
+class NodeCustomersSection(ReportSection):
+    """Section of per node customer counts and address ranges.
+
+    Rows are computed in memory by CustomerAggregator instead of a select.
+    """
+
+    def rows(
+        self,
+        session: Session,
+        yield_per: int = 1000,
+        keys: Optional[Sequence[Any]] = None,
+    ) -> Iterator[Sequence[Any]]:
+        """Returns generator of section rows."""
+        ip_columns: Tuple[int, ...] = self.ip_columns
+        for row in CustomerAggregator(yield_per=yield_per).nodes(session):
+            yield self._convert(row, ip_columns)
+
+
+def _divisions() -> Select:
+    """Returns select statement for divisions section."""
+    return (
+        select(
+            TDivisions.did,
+            TDivisions.ident,
+            TDivisions.main,
+            TLmsDivision.shortname,
+            TLmsDivision.name,
+            TLmsDivision.ten,
+        )
+        .join(TLmsDivision, TLmsDivision.id == TDivisions.did)
+        .order_by(TDivisions.did)
+    )
+
+
+def _foreign() -> Select:
+    """Returns select statement for foreign operators section."""
+    return select(TForeign.id, TForeign.ident, TForeign.name, TForeign.tin).order_by(
+        TForeign.id
+    )
+
+
+def _nodes() -> Select:
+    """Returns select statement for nodes section."""
+    return (
+        select(
+            TNetNode.id,
+            TNetNode.name,
+            TNetNode.type,
+            TNetNode.status,
+            TNetNode.ownership,
+            TNetNode.divisionid,
+            TNetNode.longitude,
+            TNetNode.latitude,
+        )
+        .where(exists().where(TNodeAssignment.nid == TNetNode.id))
+        .order_by(TNetNode.id)
+    )
+
+
+def _assigned_nodes() -> Select:
+    """Returns select statement for ordered ids of nodes with routers."""
+    return select(TNodeAssignment.nid).distinct().order_by(TNodeAssignment.nid)
+
+
+# assignment of the first router of the link, partition key of links section
+_NA1 = aliased(TNodeAssignment, name="na1")
+
+
+def _links() -> Select:
+    """Returns select statement for inter nodes links section."""
+    NA2 = aliased(TNodeAssignment)
+    R1 = aliased(TRouter)
+    R2 = aliased(TRouter)
+    C1 = aliased(TConnection)
+    C2 = aliased(TConnection)
+    IF1 = aliased(TInterface)
+    IF2 = aliased(TInterface)
+    IFN1 = aliased(TInterfaceName)
+    IFN2 = aliased(TInterfaceName)
+    return (
+        select(
+            _NA1.nid,
+            NA2.nid,
+            R1.router_id,
+            IFN1.name,
+            R2.router_id,
+            IFN2.name,
+            C1.network,
+            C1.vlan_id,
+        )
+        .select_from(R1)
+        .join(_NA1, _NA1.rid == R1.id)
+        .join(C1, C1.rid == R1.id)
+        .join(IF1, IF1.cid == C1.id)
+        .join(IFN1, IFN1.id == IF1.if_id)
+        .join(C2, C1.network == C2.network)
+        .join(IF2, IF2.cid == C2.id)
+        .join(IFN2, IFN2.id == IF2.if_id)
+        .join(R2, C2.rid == R2.id)
+        .join(NA2, NA2.rid == R2.id)
+        # every link only once
+        .where(C1.rid != C2.rid, _NA1.nid < NA2.nid)
+        .order_by(_NA1.nid, NA2.nid, C1.network)
+    )
+
+
+def _links_partition(statement: Select, keys: Sequence[int]) -> Select:
+    """Restricts links section to given nodes."""
+    return statement.where(_NA1.nid.in_(keys))
+
+
+def _links_affected(session: Session, routers: Set[int]) -> Set[int]:
+    """Returns nodes of routers sharing a network with given routers."""
+    C1 = aliased(TConnection)
+    C2 = aliased(TConnection)
+    return set(
+        session.scalars(
+            select(TNodeAssignment.nid)
+            .distinct()
+            .select_from(C1)
+            .join(C2, C1.network == C2.network)
+            .join(TNodeAssignment, TNodeAssignment.rid == C2.rid)
+            .where(C1.rid.in_(routers), C1.rid != C2.rid)
+        )
+    )
+
+
+def _flows() -> Select:
+    """Returns select statement for flows section."""
+    return (
+        select(
+            TFlow.id,
+            TFlow.node1_id,
+            TFlow.node2_id,
+            TFlow.foreign_id,
+            TFlow.speed,
+            TMedium.name,
+            TFlow.desc,
+        )
+        .outerjoin(TMedium, TMedium.id == TFlow.medium_id)
+        .order_by(TFlow.node1_id, TFlow.node2_id)
+    )
+
+
+def _customers() -> Select:
+    """Returns select statement for customer endpoints section."""
+    return (
+        select(
+            TNodeAssignment.nid,
+            TRouter.router_id,
+            TCustomer.name,
+            TCustomer.ip,
+        )
+        .select_from(TCustomer)
+        .join(TRouter, TRouter.id == TCustomer.rid)
+        .join(TNodeAssignment, TNodeAssignment.rid == TCustomer.rid)
+        .order_by(TNodeAssignment.nid, TCustomer.ip)
+    )
+
+
+def _customers_partition(statement: Select, keys: Sequence[int]) -> Select:
+    """Restricts customers section to given nodes."""
+    return statement.where(TNodeAssignment.nid.in_(keys))
+
+
+SECTIONS: List[ReportSection] = [
+    ReportSection(
+        "divisions",
+        ["division_id", "ident", "main", "shortname", "name", "tin"],
+        _divisions,
+        [TDivisions, TLmsDivision],
+    ),
+    ReportSection("foreign", ["id", "ident", "name", "tin"], _foreign, [TForeign]),
+    ReportSection(
+        "nodes",
+        [
+            "node_id",
+            "name",
+            "type",
+            "status",
+            "ownership",
+            "division_id",
+            "longitude",
+            "latitude",
+        ],
+        _nodes,
+        [TNetNode, TNodeAssignment],
+    ),
+    ReportSection(
+        "links",
+        [
+            "node1_id",
+            "node2_id",
+            "router1",
+            "interface1",
+            "router2",
+            "interface2",
+            "network",
+            "vlan_id",
+        ],
+        _links,
+        [
+            TLastUpdate,
+            TRouter,
+            TConnection,
+            TInterface,
+            TInterfaceName,
+            TNodeAssignment,
+        ],
+        (2, 4, 6),
+        _assigned_nodes,
+        _links_partition,
+        _links_affected,
+    ),
+    ReportSection(
+        "flows",
+        ["id", "node1_id", "node2_id", "foreign_id", "speed", "medium", "desc"],
+        _flows,
+        [TFlow, TMedium],
+    ),
+    ReportSection(
+        "customers",
+        ["node_id", "router_id", "name", "ip"],
+        _customers,
+        [TLastUpdate, TRouter, TCustomer, TNodeAssignment],
+        (1, 3),
+        _assigned_nodes,
+        _customers_partition,
+    ),
+    NodeCustomersSection(
+        "node_customers",
+        ["node_id", "routers", "customers", "first_ip", "last_ip"],
+        None,
+        [TLastUpdate, TCustomer, TNodeAssignment],
+        (3, 4),
+    ),
+]
+
+
+class Report(BDebug, BVerbose, BLogs):
+    """UKE PIT report generator class.
+
+    Every section is streamed from the database straight into its own file
+    in 'output_dir', whole tables are never loaded into memory.
+
+    With 'workers' greater than 1 sections, and chunks of partitioned
+    sections, are generated concurrently, each job with its own database
+    session. Partial files are merged in sections and keys order, so the
+    output does not depend on the jobs completion order.
+
+    In incremental mode a manifest with fingerprints of the source tables
+    is kept in 'output_dir'. Sections with unchanged sources are reused.
+    Partitioned sections are stored per node, after a change of routers
+    assignment only the affected nodes are generated again.
+    """
+
+    MANIFEST: str = "manifest.json"
+    PARTS_DIR: str = ".parts"
+
+    def __init__(
+        self,
+        logger_queue: LoggerQueue,
+        database: Database,
+        output_dir: str,
+        debug: bool = False,
+        verbose: bool = False,
+        yield_per: int = 1000,
+        workers: int = 1,
+        incremental: bool = False,
+    ) -> None:
+        """Report constructor.
+
+        ### Arguments:
+        - logger_queue [LoggerQueue] - logger queue for logs subsystem communication,
+        - database [Database] - connected database object,
+        - output_dir [str] - directory for report files,
+        - debug [bool] - debugging flag, default: False,
+        - verbose [bool] - verbose debugging flag,
+        - yield_per [int] - number of rows fetched from cursor at once,
+        - workers [int] - number of concurrent jobs, 1 for sequential generation,
+        - incremental [bool] - reuse sections of the previous report if possible.
+        """
+        self.logs = LogsClient(logger_queue, self._c_name)
+        self.debug = debug
+        self.verbose = verbose
+        self._set_data(key=_Keys.DATABASE, set_default_type=Database, value=database)
+        self._set_data(key=_Keys.OUTPUT_DIR, set_default_type=str, value=output_dir)
+        self._set_data(key=_Keys.YIELD_PER, set_default_type=int, value=yield_per)
+        self._set_data(key=_Keys.WORKERS, set_default_type=int, value=max(1, workers))
+        self._set_data(key=_Keys.INCREMENTAL, set_default_type=bool, value=incremental)
+        self._set_data(key=_Keys.SECTIONS, set_default_type=List, value=list(SECTIONS))
+        self._set_data(key=_Keys.TIMINGS, set_default_type=Dict, value={})
+
+    @property
+    def output_dir(self) -> str:
+        """Returns output dir path."""
+        return self._get_data(key=_Keys.OUTPUT_DIR)  # type: ignore
+
+    @property
+    def sections(self) -> List[ReportSection]:
+        """Returns list of report sections."""
+        return self._get_data(key=_Keys.SECTIONS)  # type: ignore
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Returns section generation times in seconds."""
+        return self._get_data(key=_Keys.TIMINGS)  # type: ignore
+
+    @property
+    def workers(self) -> int:
+        """Returns number of concurrent jobs."""
+        return self._get_data(key=_Keys.WORKERS)  # type: ignore
+
+    @property
+    def incremental(self) -> bool:
+        """Returns incremental mode flag."""
+        return self._get_data(key=_Keys.INCREMENTAL)  # type: ignore
+
+    def generate(self, force: bool = False) -> bool:
+        """Generate all report sections.
+
+        ### Arguments:
+        - force [bool] - in incremental mode ignore the previous manifest.
+
+        Returns True if all sections were written.
+        """
+        if not os.path.isdir(self.output_dir):
+            try:
+                os.makedirs(self.output_dir)
+            except OSError as ex:
+                self.logs.message_critical = (
+                    f"cannot create output dir: '{self.output_dir}': {ex}"
+                )
+                return False
+
+        database: Database = self._get_data(key=_Keys.DATABASE)  # type: ignore
+        session: Optional[Session] = database.session
+        if not session:
+            self.logs.message_critical = "database session error"
+            return False
+
+        start: float = time.perf_counter()
+        manifest: Dict[str, Any] = {}
+        try:
+            if self.incremental:
+                manifest = self.__state(session)
+                plan = self.__plan_incremental(
+                    session, manifest, {} if force else self.__load_manifest()
+                )
+            else:
+                plan = self.__plan(session)
+        finally:
+            session.close()
+
+        failed: List[str] = self.__run(plan)
+        if self.incremental:
+            for name in failed:
+                manifest["sections"].pop(name, None)
+            self.__save_manifest(manifest)
+        self.timings["total"] = time.perf_counter() - start
+        self.logs.message_notice = (
+            f"report generated in {self.timings['total']:.3f}s: '{self.output_dir}'"
+        )
+        return not failed
+
+    @staticmethod
+    def fingerprint(session: Session, table: Any) -> str:
+        """Returns fingerprint of the table content.
+
+        Tables maintained by the spider carry 'last_update' of the run, so
+        rows count and the newest stamp are enough. Other tables are small
+        and edited by hand, their whole content is hashed.
+        """
+        if hasattr(table, "last_update"):
+            row = session.execute(
+                select(func.count(), func.max(table.last_update), func.max(table.id))
+            ).one()
+            return ":".join(str(item) for item in row)
+        digest = hashlib.sha256()
+        result = session.execute(
+            select(table.__table__).order_by(*table.__table__.primary_key.columns),
+            execution_options={"yield_per": 1000},
+        )
+        for row in result:
+            digest.update(repr(tuple(row)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def __state(self, session: Session) -> Dict[str, Any]:
+        """Returns manifest of the current database state."""
+        sources: Dict[str, str] = {}
+        for section in self.sections:
+            for table in section.sources:
+                if table.__tablename__ not in sources:
+                    sources[table.__tablename__] = self.fingerprint(session, table)
+        assignment: Dict[str, List[int]] = {}
+        for rid, nid in session.execute(
+            select(TNodeAssignment.rid, TNodeAssignment.nid).order_by(
+                TNodeAssignment.rid, TNodeAssignment.nid
+            )
+        ):
+            assignment.setdefault(str(rid), []).append(nid)
+        return {
+            "version": 1,
+            "generated": Timestamp.now,
+            "sources": sources,
+            "assignment": assignment,
+            "sections": {},
+        }
+
+    def __load_manifest(self) -> Dict[str, Any]:
+        """Returns manifest of the previous report or empty dict."""
+        path: str = os.path.join(self.output_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                manifest: Dict[str, Any] = json.load(file)
+            if manifest.get("version") == 1:
+                return manifest
+        except (OSError, ValueError) as ex:
+            self.logs.message_warning = f"cannot read manifest: {ex}"
+        return {}
+
+    def __save_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Writes manifest of the generated report."""
+        path: str = os.path.join(self.output_dir, self.MANIFEST)
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(manifest, file)
+            os.replace(f"{path}.tmp", path)
+        except OSError as ex:
+            self.logs.message_warning = f"cannot write manifest: {ex}"
+
+    def __parts_dir(self, section: ReportSection) -> str:
+        """Returns directory of section parts stored per partition key."""
+        return os.path.join(self.output_dir, self.PARTS_DIR, section.name)
+
+    def __chunks(self, keys: List[Any]) -> List[List[Any]]:
+        """Splits keys into up to 'workers' contiguous chunks."""
+        size: int = -(-len(keys) // self.workers) or 1
+        return [keys[idx : idx + size] for idx in range(0, len(keys), size)]
+
+    def __plan(self, session: Session) -> List[Dict[str, Any]]:
+        """Returns generation plan for every section."""
+        plan: List[Dict[str, Any]] = []
+        for section in self.sections:
+            path: str = os.path.join(self.output_dir, section.filename)
+            chunks: List[Optional[List[Any]]] = []
+            if section.partitioned and self.workers > 1:
+                chunks.extend(self.__chunks(section.keys(session)))
+            if not chunks:
+                chunks.append(None)
+            parts: List[str] = [f"{path}.part{idx}" for idx in range(len(chunks))]
+            plan.append(
+                {
+                    "section": section,
+                    "jobs": [(keys, part, False) for keys, part in zip(chunks, parts)],
+                    "parts": parts,
+                    "temporary": True,
+                }
+            )
+        return plan
+
+    def __plan_incremental(
+        self, session: Session, current: Dict[str, Any], previous: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Returns generation plan reusing results of the previous report."""
+        plan: List[Dict[str, Any]] = []
+        old_sources: Dict[str, str] = previous.get("sources", {})
+        old_sections: Dict[str, str] = previous.get("sections", {})
+
+        # routers with changed node assignment and their old and new nodes
+        old_map: Dict[str, List[int]] = previous.get("assignment", {})
+        new_map: Dict[str, List[int]] = current["assignment"]
+        routers: Set[int] = set()
+        nodes: Set[int] = set()
+        for rid in set(old_map) | set(new_map):
+            if old_map.get(rid) != new_map.get(rid):
+                routers.add(int(rid))
+                nodes.update(old_map.get(rid, []))
+                nodes.update(new_map.get(rid, []))
+
+        for section in self.sections:
+            path: str = os.path.join(self.output_dir, section.filename)
+            signature: str = hashlib.sha256(
+                "|".join(
+                    current["sources"][table.__tablename__] for table in section.sources
+                ).encode("utf-8")
+            ).hexdigest()
+            current["sections"][section.name] = signature
+            reusable: bool = old_sections.get(section.name) == signature
+
+            if not section.partitioned:
+                if reusable and os.path.exists(path):
+                    plan.append({"section": section, "reused": True})
+                else:
+                    plan.append(
+                        {
+                            "section": section,
+                            "jobs": [(None, f"{path}.part0", False)],
+                            "parts": [f"{path}.part0"],
+                            "temporary": True,
+                        }
+                    )
+                continue
+
+            parts_dir: str = self.__parts_dir(section)
+            keys: List[Any] = section.keys(session)
+            missing: Set[Any] = {
+                key
+                for key in keys
+                if not os.path.exists(os.path.join(parts_dir, f"{key}.csv"))
+            }
+            changed: List[str] = [
+                table.__tablename__
+                for table in section.sources
+                if old_sources.get(table.__tablename__)
+                != current["sources"][table.__tablename__]
+            ]
+            todo: List[Any] = keys
+            if reusable and not missing:
+                if os.path.exists(path):
+                    plan.append({"section": section, "reused": True})
+                    continue
+                todo = []
+            elif old_sections.get(section.name) and changed == [
+                TNodeAssignment.__tablename__
+            ]:
+                affected: Set[Any] = nodes | section.affected(session, routers)
+                todo = [key for key in keys if key in affected or key in missing]
+            else:
+                shutil.rmtree(parts_dir, ignore_errors=True)
+            os.makedirs(parts_dir, exist_ok=True)
+
+            # parts of nodes without routers
+            names: Set[str] = {f"{key}.csv" for key in keys}
+            for name in os.listdir(parts_dir):
+                if name not in names:
+                    os.remove(os.path.join(parts_dir, name))
+
+            if self.verbose:
+                self.logs.message_debug = (
+                    f"section '{section.name}': "
+                    f"{len(todo)} of {len(keys)} part(s) to build"
+                )
+            plan.append(
+                {
+                    "section": section,
+                    "jobs": [(chunk, parts_dir, True) for chunk in self.__chunks(todo)],
+                    "parts": [os.path.join(parts_dir, f"{key}.csv") for key in keys],
+                    "temporary": False,
+                }
+            )
+        return plan
+
+    def __run(self, plan: List[Dict[str, Any]]) -> List[str]:
+        """Runs jobs of the plan and merges partial files.
+
+        Returns names of failed sections.
+        """
+        failed: List[str] = []
+        futures: List[List[Future]] = []
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=self._c_name
+        ) as executor:
+            for item in plan:
+                futures.append(
+                    [
+                        executor.submit(self.__job, item["section"], *job)
+                        for job in item.get("jobs", [])
+                    ]
+                )
+
+        # deterministic merge: sections and keys order
+        for item, jobs in zip(plan, futures):
+            section: ReportSection = item["section"]
+            if item.get("reused"):
+                self.timings[section.name] = 0.0
+                self.logs.message_info = f"section '{section.name}': reused"
+                continue
+            count: int = 0
+            seconds: float = 0.0
+            try:
+                for future in jobs:
+                    count += future.result()[0]
+                    seconds += future.result()[1]
+                self.__merge(section, item["parts"])
+                self.timings[section.name] = seconds
+                self.logs.message_info = (
+                    f"section '{section.name}': {count} rows "
+                    f"in {seconds:.3f}s ({len(jobs)} job(s))"
+                )
+            except Exception as ex:
+                self.logs.message_error = (
+                    f"section '{section.name}' generation error: {ex}"
+                )
+                failed.append(section.name)
+                if not item["temporary"]:
+                    # stored parts are not reliable anymore
+                    shutil.rmtree(self.__parts_dir(section), ignore_errors=True)
+            finally:
+                if item["temporary"]:
+                    for part in item["parts"]:
+                        if os.path.exists(part):
+                            os.remove(part)
+        return failed
+
+    def __job(
+        self,
+        section: ReportSection,
+        keys: Optional[List[Any]],
+        target: str,
+        split: bool,
+    ) -> Tuple[int, float]:
+        """Writes partial file(s) in own database session.
+
+        With 'split' set, 'target' is a directory and rows are written to
+        a separate file per partition key.
+
+        Returns number of rows and time in seconds.
+        """
+        start: float = time.perf_counter()
+        database: Database = self._get_data(key=_Keys.DATABASE)  # type: ignore
+        session: Optional[Session] = database.session
+        if not session:
+            raise Raise.error(
+                "database session error",
+                ConnectionError,
+                self._c_name,
+                currentframe(),
+            )
+        try:
+            if split:
+                count: int = self.__write_split(session, section, target, keys or [])
+            else:
+                count = self.__write(session, section, target, keys, False)
+        finally:
+            session.close()
+        return count, time.perf_counter() - start
+
+    def __write(
+        self,
+        session: Session,
+        section: ReportSection,
+        path: str,
+        keys: Optional[List[Any]],
+        header: bool,
+    ) -> int:
+        """Streams section rows to file and returns number of rows."""
+        count: int = 0
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if header:
+                writer.writerow(section.columns)
+            for row in section.rows(
+                session, self._get_data(key=_Keys.YIELD_PER), keys  # type: ignore
+            ):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def __write_split(
+        self, session: Session, section: ReportSection, directory: str, keys: List[Any]
+    ) -> int:
+        """Streams section rows to a file per partition key."""
+        count: int = 0
+        written: List[str] = []
+        file = None
+        writer = None
+        try:
+            for row in section.rows(
+                session, self._get_data(key=_Keys.YIELD_PER), keys  # type: ignore
+            ):
+                name: str = os.path.join(directory, f"{row[0]}.csv")
+                if writer is None or name != written[-1]:
+                    if file is not None:
+                        file.close()
+                    written.append(name)
+                    file = open(f"{name}.tmp", "w", newline="", encoding="utf-8")
+                    writer = csv.writer(file)
+                writer.writerow(row)
+                count += 1
+        finally:
+            if file is not None:
+                file.close()
+        for name in written:
+            os.replace(f"{name}.tmp", name)
+        # keys without rows
+        for key in keys:
+            name = os.path.join(directory, f"{key}.csv")
+            if name not in written:
+                open(name, "w").close()
+        return count
+
+    def __merge(self, section: ReportSection, parts: List[str]) -> None:
+        """Concatenates partial files into section file."""
+        path: str = os.path.join(self.output_dir, section.filename)
+        tmp_path: str = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", newline="", encoding="utf-8") as file:
+                csv.writer(file).writerow(section.columns)
+                for part in parts:
+                    with open(part, "r", newline="", encoding="utf-8") as src:
+                        shutil.copyfileobj(src, file)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# #[EOF]#######################################################################
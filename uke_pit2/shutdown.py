@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+  shutdown.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 20.10.2026, 14:18:05
+
+  Purpose: Staged shutdown with deadlines and timings.
+"""
+
+import time
+
+from typing import Callable, List
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from uke_pit2.base import BFastData
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    STAGES: str = "__stages__"
+
+
+class ShutdownStage(object):
+    """Shutdown stage result: name, duration and finished flag."""
+
+    __slots__ = ("name", "duration", "finished")
+
+    def __init__(self, name: str, duration: float, finished: bool) -> None:
+        """ShutdownStage constructor."""
+        self.name: str = name
+        self.duration: float = duration
+        self.finished: bool = finished
+
+
+class ShutdownCoordinator(BFastData):
+    """Runs shutdown stages in order and records how long each one took.
+
+    A stage is a callable receiving its deadline in seconds and returning
+    True if it finished in time. A stage that timed out does not stop the
+    following ones, so the logs and database are closed even with a hung
+    worker.
+    """
+
+    def __init__(self) -> None:
+        """ShutdownCoordinator constructor."""
+        self._data[_Keys.STAGES] = []
+
+    @property
+    def stages(self) -> List[ShutdownStage]:
+        """Returns list of finished stages."""
+        return self._data[_Keys.STAGES]
+
+    def run(self, name: str, action: Callable[[float], bool], timeout: float) -> bool:
+        """Runs shutdown stage.
+
+        ### Arguments:
+        - name [str] - stage name for summary.
+        - action [Callable[[float], bool]] - stage procedure, gets 'timeout'.
+        - timeout [float] - stage deadline in seconds.
+
+        ### Returns:
+        bool - True if the stage finished before the deadline.
+        """
+        start: float = time.perf_counter()
+        try:
+            finished: bool = bool(action(timeout))
+        except Exception:
+            finished = False
+        self.stages.append(ShutdownStage(name, time.perf_counter() - start, finished))
+        return finished
+
+    def summary(self) -> List[str]:
+        """Returns summary lines for logs."""
+        return [
+            f"* shutdown {item.name}: {item.duration:.3f}s"
+            + ("" if item.finished else " (timeout)")
+            for item in self.stages
+        ]
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,544 @@
+# -*- coding: utf-8 -*-
+"""
+  simulator.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 22:31:47
+
+  Purpose: RouterOS API simulator with synthetic OSPF topology for local
+  crawl benchmarks.
+"""
+
+import random
+import selectors
+import socket
+import threading
+import time
+
+from inspect import currentframe
+from queue import Queue
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.libs.base_data import BData
+from jsktoolbox.netaddresstool.ipv4 import Address
+from jsktoolbox.raisetool import Raise
+
+from uke_pit2.ipv4 import int_to_str
+from uke_pit2.network import Pinger, encode_sentence, read_sentence
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal _Keys container class."""
+
+    CONNECTIONS: str = "__connections__"
+    DOWN: str = "__down__"
+    FAILURE: str = "__failure_rate__"
+    HUNG: str = "__hung__"
+    LATENCY: str = "__latency__"
+    LISTENERS: str = "__listeners__"
+    PASSWORD: str = "__password__"
+    PORT: str = "__port__"
+    RANDOM: str = "__random__"
+    ROUTERS: str = "__routers__"
+    SELECTOR: str = "__selector__"
+    THREAD: str = "__thread__"
+    TOPOLOGY: str = "__topology__"
+
+
+class Topology(BData):
+    """Synthetic OSPF network topology.
+
+    Routers get router-id from 127.1.0.0/16, so every router is reachable on
+    a separate loopback address. Inter-router links are /30 networks from
+    10.0.0.0/8 on vlan interfaces, optionally nested 'vlan_depth' times
+    (QinQ chain) over ether1. Routers marked as concentrators serve
+    'ppp_sessions' PPPoE customers from 100.64.0.0/10. The first
+    'area_ratio' part of routers (a connected subtree) is in the backbone
+    area, the rest in 'area1'; the LSDB of a router holds router LSAs of
+    its own area only.
+    """
+
+    BASE_ID: int = 0x7F010000
+    BASE_LINK: int = 0x0A000000
+    BASE_PPP: int = 0x64400000
+
+    def __init__(
+        self,
+        routers: int = 100,
+        extra_links: int = 50,
+        vlan_depth: int = 1,
+        concentrators: int = 5,
+        ppp_sessions: int = 1000,
+        ros7_ratio: float = 0.5,
+        area_ratio: float = 1.0,
+        seed: int = 0,
+    ) -> None:
+        """Topology constructor.
+
+        ### Arguments:
+        - routers [int] - number of routers, up to 65534,
+        - extra_links [int] - links added over the spanning tree,
+        - vlan_depth [int] - number of nested vlans per link,
+        - concentrators [int] - number of PPPoE concentrators,
+        - ppp_sessions [int] - active PPPoE sessions per concentrator,
+        - ros7_ratio [float] - part of routers with RouterOS 7,
+        - area_ratio [float] - part of routers in the backbone area,
+        - seed [int] - random generator seed.
+        """
+        if routers < 1 or routers > 0xFFFE:
+            raise Raise.error(
+                f"Expected routers in range 1..65534, received: '{routers}'.",
+                ValueError,
+                self._c_name,
+                currentframe(),
+            )
+        rnd = random.Random(seed)
+        self._data[_Keys.ROUTERS] = {}
+        menus: Dict[int, Dict[str, List[Dict[str, str]]]] = self._data[_Keys.ROUTERS]
+        for nr in range(routers):
+            rid: int = self.BASE_ID + nr + 1
+            menus[rid] = {
+                "/system/identity/": [{"name": f"r{nr + 1}"}],
+                "/system/routerboard/": [
+                    {
+                        "routerboard": "true",
+                        "model": "CCR2004-1G-12S+2XS",
+                        "current-firmware": (
+                            "7.14.3" if rnd.random() < ros7_ratio else "6.49.13"
+                        ),
+                    }
+                ],
+                "/interface/ethernet/": [
+                    {".id": "*1", "name": "ether1", "running": "true"}
+                ],
+                "/interface/vlan/": [],
+                "/routing/ospf/neighbor/": [],
+                "/routing/ospf/lsa/": [],
+                "/ip/address/": [
+                    {
+                        "address": f"{int_to_str(rid)}/32",
+                        "network": int_to_str(rid),
+                        "interface": "lo",
+                        "dynamic": "false",
+                        "disabled": "false",
+                    }
+                ],
+                "/ppp/active/": [],
+            }
+
+        # preferential attachment spanning tree gives a long-tailed degree
+        # distribution, extra links close loops
+        edges: Set[Tuple[int, int]] = set()
+        ends: List[int] = [0]
+        for nr in range(1, routers):
+            peer: int = rnd.choice(ends)
+            edges.add((peer, nr))
+            ends.extend((peer, nr))
+        for _ in range(extra_links * 10):
+            if len(edges) >= routers - 1 + extra_links or routers < 3:
+                break
+            left, right = sorted(rnd.sample(range(routers), 2))
+            edges.add((left, right))
+        for link, (left, right) in enumerate(sorted(edges)):
+            self.__add_link(link, self.BASE_ID + left + 1, self.BASE_ID + right + 1)
+        for vlan_depth_nr in range(1, vlan_depth):
+            for menu in menus.values():
+                self.__nest_vlans(menu, vlan_depth_nr)
+
+        # every router of an area has the same LSDB
+        backbone: int = max(1, int(routers * area_ratio))
+        for nr, rid in enumerate(sorted(menus)):
+            area: str = "backbone" if nr < backbone else "area1"
+            lsdb: List[Dict[str, str]] = menus[
+                self.BASE_ID + (1 if nr < backbone else backbone + 1)
+            ]["/routing/ospf/lsa/"]
+            lsdb.append(
+                {
+                    ".id": f"*{nr + 1:X}",
+                    "area": area,
+                    "type": "router",
+                    "id": int_to_str(rid),
+                    "originator": int_to_str(rid),
+                    "sequence": "0x80000002",
+                    "age": "600",
+                }
+            )
+            menus[rid]["/routing/ospf/lsa/"] = lsdb
+
+        # pppoe concentrators
+        ids: List[int] = sorted(menus)
+        customer: int = 0
+        for rid in rnd.sample(ids, min(concentrators, routers)):
+            ppp: List[Dict[str, str]] = menus[rid]["/ppp/active/"]
+            for _ in range(ppp_sessions):
+                customer += 1
+                ppp.append(
+                    {
+                        ".id": f"*{customer:X}",
+                        "name": ":".join(
+                            f"{(customer >> shift) & 0xFF:02X}"
+                            for shift in (40, 32, 24, 16, 8, 0)
+                        ),
+                        "service": "pppoe",
+                        "address": int_to_str(self.BASE_PPP + customer),
+                        "uptime": "1d2h3m4s",
+                        "radius": "true",
+                    }
+                )
+
+    def __add_link(self, link: int, left: int, right: int) -> None:
+        """Adds /30 link between routers."""
+        menus: Dict[int, Dict[str, List[Dict[str, str]]]] = self._data[_Keys.ROUTERS]
+        network: int = self.BASE_LINK + link * 4
+        vlan_id: int = link % 4000 + 10
+        for rid, peer, host, peer_host in (
+            (left, right, network + 1, network + 2),
+            (right, left, network + 2, network + 1),
+        ):
+            menu: Dict[str, List[Dict[str, str]]] = menus[rid]
+            name: str = f"vlan{vlan_id}-l{link}"
+            menu["/interface/vlan/"].append(
+                {"name": name, "vlan-id": f"{vlan_id}", "interface": "ether1"}
+            )
+            menu["/ip/address/"].append(
+                {
+                    "address": f"{int_to_str(host)}/30",
+                    "network": int_to_str(network),
+                    "interface": name,
+                    "dynamic": "false",
+                    "disabled": "false",
+                }
+            )
+            menu["/routing/ospf/neighbor/"].append(
+                {
+                    "instance": "default",
+                    "router-id": int_to_str(peer),
+                    "address": int_to_str(peer_host),
+                    "interface": name,
+                    "state": "Full",
+                }
+            )
+
+    @staticmethod
+    def __nest_vlans(menu: Dict[str, List[Dict[str, str]]], depth: int) -> None:
+        """Moves outermost vlans of links onto a new service vlan."""
+        for item in list(menu["/interface/vlan/"]):
+            if item["interface"] != "ether1":
+                continue
+            name: str = f"svlan{depth}-{item['name']}"
+            menu["/interface/vlan/"].append(
+                {"name": name, "vlan-id": f"{100 + depth}", "interface": "ether1"}
+            )
+            item["interface"] = name
+
+    def menu(self, router_id: int, path: str) -> Optional[List[Dict[str, str]]]:
+        """Returns menu records of router or None if not found."""
+        router: Optional[Dict[str, List[Dict[str, str]]]] = self._data[
+            _Keys.ROUTERS
+        ].get(router_id)
+        if router is None:
+            return None
+        return router.get(path)
+
+    @property
+    def routers(self) -> List[int]:
+        """Returns sorted list of router-ids."""
+        return sorted(self._data[_Keys.ROUTERS])
+
+    @property
+    def start_ip(self) -> Address:
+        """Returns router-id of the first router."""
+        return Address(self.BASE_ID + 1)
+
+    @property
+    def customers(self) -> int:
+        """Returns number of PPPoE sessions."""
+        return sum(
+            len(menu["/ppp/active/"]) for menu in self._data[_Keys.ROUTERS].values()
+        )
+
+
+class SimPinger(Pinger):
+    """Pinger answering for simulated routers without ICMP."""
+
+    def __init__(self, simulator: "RouterOSSimulator") -> None:
+        """SimPinger constructor."""
+        self._data[_Keys.ROUTERS] = simulator
+
+    def is_alive(self, ip: Address) -> bool:
+        """Returns True if router is simulated and not down."""
+        return self._data[_Keys.ROUTERS].is_up(int(ip))
+
+
+class RouterOSSimulator(BData):
+    """RouterOS API (8728) protocol simulator.
+
+    Every router listens on its router-id loopback address and the common
+    port. Commands are answered from Topology menus 'latency' seconds
+    after they were received (round trip time), with probability 'failure_rate' a command gets '!trap' or the
+    connection is dropped. Routers in 'down' set do not accept
+    connections and do not answer ICMP checks of SimPinger. Routers in
+    'hung' set log in, but never answer menu commands.
+    Tagged commands ('.tag=') get the tag in every reply sentence.
+    """
+
+    def __init__(
+        self,
+        topology: Topology,
+        password: str = "admin",
+        port: int = 0,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        down_rate: float = 0.0,
+        seed: int = 0,
+        hung_rate: float = 0.0,
+    ) -> None:
+        """RouterOSSimulator constructor.
+
+        ### Arguments:
+        - topology [Topology] - simulated network,
+        - password [str] - admin password of every router,
+        - port [int] - listen port, random free port if 0,
+        - latency [float] - reply delay of every command in seconds,
+        - failure_rate [float] - probability of command failure,
+        - down_rate [float] - part of routers which are not available,
+        - seed [int] - random generator seed,
+        - hung_rate [float] - part of routers which do not answer menus.
+        """
+        rnd = random.Random(seed)
+        self._data[_Keys.TOPOLOGY] = topology
+        self._data[_Keys.PASSWORD] = password
+        self._data[_Keys.PORT] = port
+        self._data[_Keys.LATENCY] = latency
+        self._data[_Keys.FAILURE] = failure_rate
+        self._data[_Keys.RANDOM] = rnd
+        self._data[_Keys.DOWN] = {
+            rid
+            for rid in topology.routers[1:]
+            if down_rate and rnd.random() < down_rate
+        }
+        self._data[_Keys.HUNG] = {
+            rid
+            for rid in topology.routers[1:]
+            if hung_rate and rnd.random() < hung_rate
+        } - self._data[_Keys.DOWN]
+        self._data[_Keys.LISTENERS] = []
+        self._data[_Keys.CONNECTIONS] = set()
+        self._data[_Keys.SELECTOR] = None
+        self._data[_Keys.THREAD] = None
+
+    def __enter__(self) -> "RouterOSSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        """Returns listen port."""
+        return self._data[_Keys.PORT]
+
+    @property
+    def pinger(self) -> SimPinger:
+        """Returns pinger for simulated routers."""
+        return SimPinger(self)
+
+    @property
+    def topology(self) -> Topology:
+        """Returns simulated topology."""
+        return self._data[_Keys.TOPOLOGY]
+
+    @property
+    def hung(self) -> Set[int]:
+        """Returns router-ids of routers which do not answer menus."""
+        return self._data[_Keys.HUNG]
+
+    def is_up(self, router_id: int) -> bool:
+        """Returns True if router is simulated and available."""
+        return (
+            self.topology.menu(router_id, "/system/identity/") is not None
+            and router_id not in self._data[_Keys.DOWN]
+        )
+
+    def start(self) -> None:
+        """Opens listen sockets and starts acceptor thread."""
+        selector = selectors.DefaultSelector()
+        port: int = self.port
+        for rid in self.topology.routers:
+            if rid in self._data[_Keys.DOWN]:
+                continue
+            skt = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            skt.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            skt.bind((int_to_str(rid), port))
+            skt.listen(16)
+            skt.setblocking(False)
+            port = skt.getsockname()[1]
+            selector.register(skt, selectors.EVENT_READ, rid)
+            self._data[_Keys.LISTENERS].append(skt)
+        self._data[_Keys.PORT] = port
+        self._data[_Keys.SELECTOR] = selector
+        self._data[_Keys.THREAD] = threading.Thread(
+            target=self.__accept, name=self._c_name, daemon=True
+        )
+        self._data[_Keys.THREAD].start()
+
+    def stop(self) -> None:
+        """Closes all sockets."""
+        selector: Optional[selectors.BaseSelector] = self._data[_Keys.SELECTOR]
+        if selector is None:
+            return None
+        self._data[_Keys.SELECTOR] = None
+        self._data[_Keys.THREAD].join()
+        for skt in self._data[_Keys.LISTENERS]:
+            skt.close()
+        self._data[_Keys.LISTENERS].clear()
+        for conn in list(self._data[_Keys.CONNECTIONS]):
+            self.__close(conn)
+        selector.close()
+
+    def __accept(self) -> None:
+        """Acceptor loop."""
+        while self._data[_Keys.SELECTOR] is not None:
+            for key, _ in self._data[_Keys.SELECTOR].select(timeout=0.1):
+                try:
+                    conn, _ = key.fileobj.accept()  # type: ignore
+                except OSError:
+                    continue
+                conn.setblocking(True)
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._data[_Keys.CONNECTIONS].add(conn)
+                threading.Thread(
+                    target=self.__session,
+                    args=(conn, key.data),
+                    name=f"{self._c_name}-{int_to_str(key.data)}",
+                    daemon=True,
+                ).start()
+
+    def __close(self, conn: socket.socket) -> None:
+        """Closes client connection."""
+        self._data[_Keys.CONNECTIONS].discard(conn)
+        try:
+            conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.close()
+
+    def __session(self, conn: socket.socket, router_id: int) -> None:
+        """Serves API connection of router.
+
+        Replies are sent by a writer thread 'latency' seconds after the
+        command was received, so pipelined commands wait for it only once.
+        """
+        rfile: BinaryIO = conn.makefile("rb")
+        quickack: Optional[int] = getattr(socket, "TCP_QUICKACK", None)
+        outbox: Queue = Queue()
+        writer = threading.Thread(
+            target=self.__writer, args=(conn, outbox), daemon=True
+        )
+        writer.start()
+        logged: bool = False
+        try:
+            while True:
+                if quickack is not None:
+                    # client writes words byte by byte, delayed ACKs would
+                    # stall its Nagle buffered sends
+                    conn.setsockopt(socket.IPPROTO_TCP, quickack, 1)
+                words: Optional[List[str]] = read_sentence(rfile)
+                if words is None:
+                    break
+                if not words:
+                    continue
+                due: float = time.monotonic() + self._data[_Keys.LATENCY]
+                command: str = words[0]
+                attrs: Dict[str, str] = {}
+                tag: Optional[str] = None
+                for word in words[1:]:
+                    if word.startswith(".tag="):
+                        tag = word[5:]
+                    elif word.startswith("="):
+                        key, _, value = word[1:].partition("=")
+                        attrs[key] = value
+                if command == "/quit":
+                    break
+                if (
+                    self._data[_Keys.FAILURE]
+                    and self._data[_Keys.RANDOM].random() < self._data[_Keys.FAILURE]
+                ):
+                    if self._data[_Keys.RANDOM].random() < 0.5:
+                        break
+                    outbox.put((due, self.__trap("simulated failure", tag)))
+                    continue
+                if command == "/login":
+                    if attrs.get("password") == self._data[_Keys.PASSWORD]:
+                        logged = True
+                        outbox.put((due, self.__reply([], tag)))
+                    else:
+                        outbox.put(
+                            (due, self.__trap("invalid user name or password (6)", tag))
+                        )
+                    continue
+                if not logged:
+                    outbox.put((due, self.__trap("not logged in", tag)))
+                    continue
+                if (
+                    router_id in self._data[_Keys.HUNG]
+                    and command != "/system/identity/print"
+                ):
+                    # alive check passes, menus are never answered
+                    continue
+                records: Optional[List[Dict[str, str]]] = None
+                if command.endswith("/print"):
+                    records = self.topology.menu(router_id, command[:-5])
+                if records is None:
+                    outbox.put((due, self.__trap("no such command", tag)))
+                    continue
+                outbox.put((due, self.__reply(records, tag)))
+        except (OSError, ValueError):
+            pass
+        finally:
+            # close after pending replies
+            outbox.put((time.monotonic() + self._data[_Keys.LATENCY], None))
+            writer.join()
+            rfile.close()
+
+    def __writer(self, conn: socket.socket, outbox: Queue) -> None:
+        """Sends replies in order at their due time, None closes connection."""
+        try:
+            while True:
+                due, data = outbox.get()
+                delay: float = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if data is None:
+                    break
+                conn.sendall(data)
+        except OSError:
+            pass
+        finally:
+            self.__close(conn)
+
+    @staticmethod
+    def __reply(records: List[Dict[str, str]], tag: Optional[str]) -> bytearray:
+        """Returns encoded records and '!done' sentence."""
+        out = bytearray()
+        suffix: List[str] = [f".tag={tag}"] if tag is not None else []
+        for record in records:
+            encode_sentence(
+                out,
+                ["!re"] + [f"={key}={value}" for key, value in record.items()] + suffix,
+            )
+        encode_sentence(out, ["!done"] + suffix)
+        return out
+
+    @staticmethod
+    def __trap(message: str, tag: Optional[str]) -> bytearray:
+        """Returns encoded '!trap' and '!done' sentences."""
+        out = bytearray()
+        suffix: List[str] = [f".tag={tag}"] if tag is not None else []
+        encode_sentence(out, ["!trap", f"=message={message}"] + suffix)
+        encode_sentence(out, ["!done"] + suffix)
+        return out
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+  __init__.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 13:34:51
+
+  Purpose: Flask application factory.
+"""
+
+from threading import Lock
+from typing import Any, Callable, Iterable
+
+from flask import Flask
+
+
+class _DeferredInit:
+    """WSGI wrapper running the application setup on the first request.
+
+    Reading the configuration, creating the database engine and importing
+    the models and views is postponed, so importing the package and spawning
+    a worker stays cheap.
+    """
+
+    def __init__(self, app: Flask, wsgi_app: Callable) -> None:
+        self.__app: Flask = app
+        self.__wsgi_app: Callable = wsgi_app
+        self.__lock: Lock = Lock()
+        self.__ready: bool = False
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[Any]:
+        if not self.__ready:
+            self.init()
+        return self.__wsgi_app(environ, start_response)
+
+    def wrap(self, middleware: Callable[[Callable], Callable]) -> None:
+        """Wraps the application with WSGI middleware, e.g. ProxyFix."""
+        self.__wsgi_app = middleware(self.__wsgi_app)
+
+    def init(self) -> None:
+        """Runs the application setup once."""
+        with self.__lock:
+            if not self.__ready:
+                from web_service import routes
+
+                routes.init_app(self.__app)
+                self.__ready = True
+
+
+def create_app() -> Flask:
+    """Returns the web service application.
+
+    Configuration, database and views are initialized on first use.
+    """
+    app = Flask(__name__)
+    deferred = _DeferredInit(app, app.wsgi_app)
+    app.wsgi_app = deferred  # type: ignore
+    app.extensions["deferred_init"] = deferred
+    return app
+
+
+# #[EOF]#######################################################################
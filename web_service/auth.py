@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+  auth.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 11:04:17
+
+  Purpose: Login subsystem helpers.
+"""
+
+import time
+import warnings
+
+from threading import Lock
+from typing import Dict, List, Optional
+
+import bcrypt
+
+with warnings.catch_warnings():
+    # passlib 1.7.4 imports the deprecated 'crypt' module
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from passlib.context import CryptContext
+
+
+class PasswordHash:
+    """Verifier for LMS crypt(3) style password hashes.
+
+    bcrypt hashes (PHP password_hash) are checked with 'bcrypt', the older
+    md5/sha crypt schemes with passlib.
+    """
+
+    __context: CryptContext = CryptContext(
+        schemes=["sha512_crypt", "sha256_crypt", "md5_crypt", "des_crypt"]
+    )
+
+    @classmethod
+    def verify(cls, password: str, hashed: str) -> bool:
+        """Checks password against stored hash."""
+        if not password or not hashed:
+            return False
+        try:
+            if hashed.startswith("$2"):
+                return bcrypt.checkpw(
+                    password.encode("utf-8")[:72], hashed.encode("utf-8")
+                )
+            return cls.__context.verify(password, hashed)
+        except (ValueError, TypeError):
+            return False
+
+
+class LoginThrottle:
+    """In-memory failed login attempts counter.
+
+    A key is blocked for 'lockout' seconds after 'limit' failures within
+    'window' seconds, without touching the database. Keys are built from
+    the login and client address pair, so a client cannot lock out other
+    users, even when they share the proxy address. At most 'size' keys are
+    tracked, expired and then the oldest entries are dropped first.
+    """
+
+    def __init__(
+        self, limit: int = 5, window: int = 300, lockout: int = 300, size: int = 10000
+    ) -> None:
+        """LoginThrottle constructor.
+
+        ### Arguments:
+        - limit [int] - number of failures allowed in the window,
+        - window [int] - observation period in seconds,
+        - lockout [int] - blocking time in seconds,
+        - size [int] - maximum number of tracked keys.
+        """
+        self.limit: int = limit
+        self.window: int = window
+        self.lockout: int = lockout
+        self.size: int = size
+        self.__lock = Lock()
+        self.__failures: Dict[str, List[float]] = {}
+        self.__blocked: Dict[str, float] = {}
+
+    @staticmethod
+    def key(login: str, address: Optional[str]) -> str:
+        """Returns throttle key for the login and client address."""
+        return f"{login}\x00{address or ''}"
+
+    def is_blocked(self, *keys: str) -> bool:
+        """Returns True if any of the keys is blocked."""
+        now: float = time.monotonic()
+        with self.__lock:
+            for key in keys:
+                until: Optional[float] = self.__blocked.get(key)
+                if until is None:
+                    continue
+                if until > now:
+                    return True
+                del self.__blocked[key]
+        return False
+
+    def __len__(self) -> int:
+        """Returns number of tracked keys."""
+        with self.__lock:
+            return len(self.__failures) + len(self.__blocked)
+
+    def __prune(self, now: float) -> None:
+        """Drops expired entries, then the oldest ones over the size limit."""
+        self.__failures = {
+            key: attempts
+            for key, attempts in self.__failures.items()
+            if attempts and now - attempts[-1] < self.window
+        }
+        self.__blocked = {
+            key: until for key, until in self.__blocked.items() if until > now
+        }
+        # dicts keep the order of the last update
+        while self.__failures and len(self.__failures) >= self.size:
+            del self.__failures[next(iter(self.__failures))]
+        while self.__blocked and len(self.__blocked) >= self.size:
+            del self.__blocked[next(iter(self.__blocked))]
+
+    def failure(self, *keys: str) -> None:
+        """Registers failed attempt for the keys."""
+        now: float = time.monotonic()
+        with self.__lock:
+            for key in keys:
+                attempts: List[float] = [
+                    stamp
+                    for stamp in self.__failures.pop(key, [])
+                    if now - stamp < self.window
+                ]
+                if (
+                    len(self.__failures) >= self.size
+                    or len(self.__blocked) >= self.size
+                ):
+                    self.__prune(now)
+                attempts.append(now)
+                if len(attempts) >= self.limit:
+                    self.__blocked.pop(key, None)
+                    self.__blocked[key] = now + self.lockout
+                else:
+                    self.__failures[key] = attempts
+
+    def success(self, *keys: str) -> None:
+        """Clears the failure counters for the keys."""
+        with self.__lock:
+            for key in keys:
+                self.__failures.pop(key, None)
+                self.__blocked.pop(key, None)
+
+
+# #[EOF]#######################################################################
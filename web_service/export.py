@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+  export.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 09:12:40
+
+  Purpose: Streaming export of spider data.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+
+class ExportFormat(object, metaclass=ReadOnlyClass):
+    """Supported export formats container class."""
+
+    CSV: str = "csv"
+    NDJSON: str = "ndjson"
+
+    MIMETYPE = {
+        CSV: "text/csv",
+        NDJSON: "application/x-ndjson",
+    }
+
+
+class StreamExport:
+    """Encoder for streaming rows as CSV or NDJSON chunks.
+
+    Rows are encoded one by one and flushed in chunks of about 'chunk_size'
+    bytes, so the memory footprint does not depend on the number of rows.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        fmt: str = ExportFormat.CSV,
+        compress: bool = False,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """StreamExport constructor.
+
+        ### Arguments:
+        - columns [Sequence[str]] - names of the exported columns,
+        - fmt [str] - output format from ExportFormat,
+        - compress [bool] - gzip output flag,
+        - chunk_size [int] - approximate size of a single yielded chunk.
+        """
+        if fmt not in ExportFormat.MIMETYPE:
+            raise ValueError(f"Unsupported export format: '{fmt}'")
+        self.columns: List[str] = list(columns)
+        self.fmt: str = fmt
+        self.compress: bool = compress
+        self.chunk_size: int = chunk_size
+
+    @property
+    def mimetype(self) -> str:
+        """Returns mimetype for selected format, gzip file if compressed."""
+        if self.compress:
+            return "application/gzip"
+        return ExportFormat.MIMETYPE[self.fmt]
+
+    def filename(self, name: str) -> str:
+        """Returns file name with proper extension."""
+        out: str = f"{name}.{self.fmt}"
+        if self.compress:
+            out += ".gz"
+        return out
+
+    def stream(self, rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        """Returns generator of encoded chunks for given rows."""
+        compressor = None
+        if self.compress:
+            # wbits=31: gzip container
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+        buffer = io.StringIO()
+        writer: Optional[Any] = None
+        if self.fmt == ExportFormat.CSV:
+            writer = csv.writer(buffer)
+            writer.writerow(self.columns)
+
+        for row in rows:
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(dict(zip(self.columns, row))))
+                buffer.write("\n")
+            if buffer.tell() >= self.chunk_size:
+                chunk: bytes = self.__flush(buffer, compressor)
+                if chunk:
+                    yield chunk
+
+        chunk = self.__flush(buffer, compressor)
+        if compressor is not None:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+
+    def __flush(self, buffer: io.StringIO, compressor: Optional[Any]) -> bytes:
+        """Returns encoded buffer content and clears the buffer."""
+        out: bytes = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        if compressor is not None:
+            return compressor.compress(out)
+        return out
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+  extensions.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 19.10.2026, 13:20:05
+
+  Purpose: Flask extensions shared by the web service modules.
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+
+# bound to the application in routes.init_app
+db = SQLAlchemy()
+
+# #[EOF]#######################################################################
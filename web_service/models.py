@@ -8,56 +8,43 @@
 """
 
 import time
-import datetime
 
-from typing import Dict, List, Tuple, Any, TypeVar, Optional
+from threading import Lock
+from typing import Dict, List, Set, Tuple, Any, TypeVar, Optional
 
-from crypt import crypt
-
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import ForeignKey, Integer, Boolean, String, func, text, and_
-from sqlalchemy.orm import Mapped, mapped_column, Query, relationship, aliased
+from flask import g, has_request_context
+from sqlalchemy import ForeignKey, Integer, Boolean, String, text, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column, Query, relationship
 from sqlalchemy.dialects.mysql import (
-    BIGINT,
-    BINARY,
-    BIT,
-    BLOB,
-    BOOLEAN,
-    CHAR,
-    DATE,
-    DATETIME,
     DECIMAL,
-    DOUBLE,
-    ENUM,
-    FLOAT,
     INTEGER,
-    LONGBLOB,
-    LONGTEXT,
-    MEDIUMBLOB,
-    MEDIUMINT,
     MEDIUMTEXT,
-    NCHAR,
-    NUMERIC,
-    NVARCHAR,
-    REAL,
-    SET,
     SMALLINT,
     TEXT,
-    TIME,
-    TIMESTAMP,
-    TINYBLOB,
     TINYINT,
-    TINYTEXT,
-    VARBINARY,
     VARCHAR,
-    YEAR,
 )
+from sqlalchemy.ext.compiler import compiles
 
-from jsktoolbox.datetool import DateTime
 from jsktoolbox.netaddresstool.ipv4 import Address
 
-from uke_pit2.db_models.spider import TRouter
-from web_service.routes import db
+from web_service.auth import PasswordHash
+from web_service.extensions import db
+
+###
+# MySQL types without SQLite equivalent, used by the sqlite backend
+
+
+@compiles(TINYINT, "sqlite")
+def _sqlite_tinyint(type_: TINYINT, compiler: Any, **kw: Any) -> str:
+    return "INTEGER"
+
+
+@compiles(MEDIUMTEXT, "sqlite")
+def _sqlite_mediumtext(type_: MEDIUMTEXT, compiler: Any, **kw: Any) -> str:
+    return "TEXT"
+
 
 ###
 # Types bound
@@ -140,10 +127,13 @@ class LmsUser(db.Model):
 
     @classmethod
     def check_login(cls, login: str, password: str) -> bool:
-        out = cls.query.filter(cls.login == login).first()
-        if out:
-            passwd = out.passwd
-            return passwd == crypt(password, passwd)
+        out = (
+            db.session.query(cls.login, cls.passwd, cls.deleted, cls.access)
+            .filter(cls.login == login)
+            .first()
+        )
+        if out and not out.deleted and out.access:
+            return PasswordHash.verify(password, out.passwd)
         return False
 
 
@@ -404,16 +394,23 @@ class Router(db.Model):
 
     @classmethod
     def get_unbound_list(cls) -> List[Tuple[int, str]]:
+        """Returns list of routers not assigned to any node."""
+        if AssignmentIndex.ttl > 0:
+            return AssignmentIndex.unbound()
+        return cls.get_unbound_list_db()
+
+    @classmethod
+    def get_unbound_list_db(cls) -> List[Tuple[int, str]]:
+        """Returns list of unassigned routers with NOT EXISTS column query."""
         out = []
         rows = (
-            cls.query.outerjoin(NodeAssignment, Router.id == NodeAssignment.rid)
-            .filter(NodeAssignment.id == None)
-            .order_by(Router.router_id)
+            db.session.query(cls.id, cls.router_id)
+            .filter(~exists().where(NodeAssignment.rid == cls.id))
+            .order_by(cls.router_id)
             .all()
         )
-        if rows:
-            for item in rows:
-                out.append((item.id, str(Address(item.router_id))))
+        for rid, router_id in rows:
+            out.append((rid, str(Address(router_id))))
         return out
 
 
@@ -468,30 +465,13 @@ class NodeAssignment(db.Model):
 
     @classmethod
     def get_routers_list(cls, node_id: int) -> List[Tuple[int, str]]:
-        out = []
-        rows: List[Router] = (
-            Router.query.join(NodeAssignment, Router.id == NodeAssignment.rid)
-            .filter(NodeAssignment.nid == node_id)
-            .order_by(Router.router_id)
-            .all()
-        )
-        if rows:
-            for item in rows:
-                out.append((item.id, str(Address(item.router_id))))
-        return out
+        """Returns list of routers assigned to the node."""
+        return AssignmentIndex.routers(node_id)
 
     @classmethod
     def get_all(cls) -> List[Tuple[int, str]]:
-        out = []
-        rows: List[Router] = (
-            Router.query.join(NodeAssignment, Router.id == NodeAssignment.rid)
-            .order_by(Router.router_id)
-            .all()
-        )
-        if rows:
-            for item in rows:
-                out.append((item.id, str(Address(item.router_id))))
-        return out
+        """Returns list of all assigned routers."""
+        return AssignmentIndex.assigned()
 
     @classmethod
     def new(cls, node_id: str, router_id: str) -> "NodeAssignment":
@@ -502,12 +482,196 @@ class NodeAssignment(db.Model):
         return obj
 
     @classmethod
-    def remove(cls, router_id: str) -> Optional["NodeAssignment"]:
+    def remove(
+        cls, router_id: str, node_id: Optional[str] = None
+    ) -> Optional["NodeAssignment"]:
         """Returns object for remove."""
-        obj = cls.query.filter(NodeAssignment.rid == int(router_id)).first()
+        query: Query = cls.query.filter(NodeAssignment.rid == int(router_id))
+        if node_id is not None:
+            query = query.filter(NodeAssignment.nid == int(node_id))
+        obj = query.first()
         return obj
 
 
+class AssignmentVersion(db.Model):
+    """Mapping class for version of routers assignment.
+
+    The single row is bumped in the same transaction as every change of the
+    assignment table, by the web service and by the spider purge.
+    """
+
+    __tablename__: str = "uke_pit_assignment_version"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True, nullable=False, autoincrement=False
+    )
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"id='{self.id}',"
+            f"version='{self.version}'"
+            ")"
+        )
+
+    @classmethod
+    def init(cls) -> None:
+        """Creates table and version row if not exists."""
+        cls.__table__.create(db.engine, checkfirst=True)  # type: ignore
+        if db.session.get(cls, 1) is None:
+            db.session.add(cls(id=1, version=0))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # added by another worker
+                db.session.rollback()
+
+    @classmethod
+    def current(cls) -> int:
+        """Returns current version of routers assignment."""
+        version: Optional[int] = (
+            db.session.query(cls.version).filter(cls.id == 1).scalar()
+        )
+        return version or 0
+
+    @classmethod
+    def bump(cls) -> int:
+        """Increments version in current transaction, returns new version."""
+        updated: int = (
+            db.session.query(cls)
+            .filter(cls.id == 1)
+            .update({cls.version: cls.version + 1}, synchronize_session=False)
+        )
+        if not updated:
+            db.session.add(cls(id=1, version=1))
+            db.session.flush()
+        return cls.current()
+
+
+class AssignmentIndex:
+    """Cached index of routers assignment to nodes.
+
+    The index is loaded with two column queries and then kept up to date by
+    'assign' and 'release' calls from the nodes view. The assignment version
+    is read once per request and compared with the version of the index, so
+    changes made by other workers or by the spider force a reload. Routers
+    added by the spider in the meantime are picked up after 'ttl' seconds.
+    """
+
+    # cache lifetime in seconds, 0 disables the cache
+    ttl: int = 60
+
+    __lock: Lock = Lock()
+    # load time, None if not loaded
+    __loaded: Optional[float] = None
+    # AssignmentVersion of the loaded index
+    __version: int = 0
+    # [(router_id, router record id, label)] sorted by router_id
+    __routers: List[Tuple[int, int, str]] = []
+    # router record id -> set of node id
+    __nodes: Dict[int, Set[int]] = {}
+
+    @staticmethod
+    def version() -> int:
+        """Returns assignment version, read once per request."""
+        if not has_request_context():
+            return AssignmentVersion.current()
+        if "assignment_version" not in g:
+            g.assignment_version = AssignmentVersion.current()
+        return g.assignment_version
+
+    @classmethod
+    def __check(cls) -> None:
+        """Reload index if expired or changed by another worker."""
+        version: int = cls.version()
+        if (
+            cls.__loaded is not None
+            and version == cls.__version
+            and time.monotonic() - cls.__loaded < cls.ttl
+        ):
+            return None
+        routers: List[Tuple[int, int, str]] = []
+        for rid, router_id in (
+            db.session.query(Router.id, Router.router_id)
+            .order_by(Router.router_id)
+            .all()
+        ):
+            routers.append((router_id, rid, str(Address(router_id))))
+        nodes: Dict[int, Set[int]] = {}
+        for rid, nid in db.session.query(NodeAssignment.rid, NodeAssignment.nid):
+            nodes.setdefault(rid, set()).add(nid)
+        cls.__routers = routers
+        cls.__nodes = nodes
+        cls.__version = version
+        cls.__loaded = time.monotonic()
+
+    @classmethod
+    def __update(cls, version: int) -> bool:
+        """Checks if the index may be updated in place to the version."""
+        if has_request_context():
+            g.assignment_version = version
+        if cls.__loaded is None or cls.__version != version - 1:
+            # another change in between, reload on next access
+            cls.__loaded = None
+            return False
+        cls.__version = version
+        return True
+
+    @classmethod
+    def unbound(cls) -> List[Tuple[int, str]]:
+        """Returns list of routers not assigned to any node."""
+        with cls.__lock:
+            cls.__check()
+            nodes: Dict[int, Set[int]] = cls.__nodes
+            return [(rid, label) for _, rid, label in cls.__routers if rid not in nodes]
+
+    @classmethod
+    def routers(cls, node_id: int) -> List[Tuple[int, str]]:
+        """Returns list of routers assigned to the node."""
+        with cls.__lock:
+            cls.__check()
+            nodes: Dict[int, Set[int]] = cls.__nodes
+            return [
+                (rid, label)
+                for _, rid, label in cls.__routers
+                if node_id in nodes.get(rid, ())
+            ]
+
+    @classmethod
+    def assigned(cls) -> List[Tuple[int, str]]:
+        """Returns list of all assigned routers."""
+        with cls.__lock:
+            cls.__check()
+            nodes: Dict[int, Set[int]] = cls.__nodes
+            return [(rid, label) for _, rid, label in cls.__routers if rid in nodes]
+
+    @classmethod
+    def assign(cls, node_id: int, router_id: int, version: int) -> None:
+        """Updates index after adding router to the node."""
+        with cls.__lock:
+            if cls.__update(version):
+                cls.__nodes.setdefault(router_id, set()).add(node_id)
+
+    @classmethod
+    def release(cls, node_id: int, router_id: int, version: int) -> None:
+        """Updates index after removing router from the node."""
+        with cls.__lock:
+            if cls.__update(version):
+                nodes: Set[int] = cls.__nodes.get(router_id, set())
+                nodes.discard(node_id)
+                if not nodes:
+                    cls.__nodes.pop(router_id, None)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forces index reload on next access."""
+        with cls.__lock:
+            cls.__loaded = None
+
+
 class Division(db.Model):
     """Mapping class for select main lms division."""
 
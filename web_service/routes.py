@@ -7,20 +7,11 @@
   Purpose: Flask main service.
 """
 
-from copy import deepcopy
-from crypt import methods
-from ctypes.wintypes import SIZE
-from importlib import metadata
-import os, secrets, tempfile
-
-from functools import wraps
-from pathlib import Path
-from turtle import onclick
-from typing import Optional, Union, List, Any, Tuple
-
-from jsktoolbox.datetool import DateTime
+import secrets
+
+from typing import Callable, Optional, Union, List, Any, Tuple
+
 from jsktoolbox.stringtool.crypto import SimpleCrypto
-from jsktoolbox.logstool.logs import LoggerEngine, LoggerClient, LoggerQueue
 from jsktoolbox.netaddresstool.ipv4 import Address
 from jsktoolbox.libs.base_data import BData
 from jsktoolbox.attribtool import ReadOnlyClass
@@ -36,11 +27,11 @@ from flask import (
     url_for,
     abort,
     jsonify,
+    stream_with_context,
 )
 from flask_wtf import FlaskForm, Form
-from flask_wtf.file import FileField, FileRequired, FileAllowed
 from werkzeug import Response
-from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from wtforms.fields import (
     StringField,
@@ -56,69 +47,21 @@ from wtforms.fields import (
 )
 from wtforms.validators import DataRequired
 
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.engine import URL
 from sqlalchemy.util import immutabledict
-from sqlalchemy import func, text, or_, and_
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import aliased
 
 from logging.config import dictConfig
 
-from web_service.tools import WebConfig
-
-
-basedir: Path = Path(__file__).resolve().parent
-
-# configuration
-conf = WebConfig()
-DATABASE: str = conf.db_database if conf.db_database else ""
-USERNAME: str = conf.db_login if conf.db_login else ""
-PASSWORD: str = conf.db_password if conf.db_password else ""
-HOST: str = str(conf.db_host) if conf.db_host else ""
-PORT: int = conf.db_port if conf.db_port else 3306
-SALT: int = conf.salt if conf.salt else 0
-SECRET_KEY: bytes = secrets.token_bytes()
-
-url = URL(
-    "mysql+pymysql",
-    username=USERNAME,
-    password=SimpleCrypto.multiple_decrypt(SALT, PASSWORD),
-    host=HOST,
-    database=DATABASE,
-    port=PORT,
-    query=immutabledict({"charset": "utf8mb4"}),
-)
+from web_service import models
+from web_service.extensions import db
+from web_service.tools import WebConfig, PoolMetrics
+from web_service.auth import LoginThrottle
+from web_service.export import ExportFormat, StreamExport
 
-SQLALCHEMY_DATABASE_URI = url
-SQLALCHEMY_ECHO = conf.debug
-SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-# Create and initialize a new Flask app
-app = Flask(__name__)
-
-# load the config
-app.config.from_object(__name__)
-# init sqlalchemy
-db = SQLAlchemy(app)
-
-dictConfig(
-    {
-        "version": 1,
-        "formatters": {
-            "default": {
-                "format": "[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
-            }
-        },
-        "handlers": {
-            "wsgi": {
-                "class": "logging.StreamHandler",
-                "stream": "ext://flask.logging.wsgi_errors_stream",
-                "formatter": "default",
-            }
-        },
-        "root": {"level": "INFO", "handlers": ["wsgi"]},
-    }
-)
+from uke_pit2.db import DbBackends, sqlite_pragmas, sqlite_url
+from uke_pit2.ipv4 import int_to_str
 
 
 # Forms
@@ -468,8 +411,92 @@ class TransData(BData):
         return self._get_data(key=TransData.Keys.N2ID, default_value=0)  # type: ignore
 
 
-if not conf.errors:
-    from web_service import models
+# login subsystem
+login_throttle = LoginThrottle()
+# password spraying from one address, many logins
+address_throttle = LoginThrottle(limit=20)
+
+
+def init_app(app: Flask) -> None:
+    """Loads configuration, binds database and registers the views.
+
+    Called by web_service.create_app on the first request.
+    """
+    conf = WebConfig()
+    url: URL
+    if conf.db_backend == DbBackends.SQLITE:
+        url = sqlite_url(conf.db_database if conf.db_database else "")
+    else:
+        url = URL.create(
+            "mysql+pymysql",
+            username=conf.db_login if conf.db_login else "",
+            password=SimpleCrypto.multiple_decrypt(
+                conf.salt if conf.salt else 0,
+                conf.db_password if conf.db_password else "",
+            ),
+            host=str(conf.db_host) if conf.db_host else "",
+            database=conf.db_database if conf.db_database else "",
+            port=conf.db_port if conf.db_port else 3306,
+            query=immutabledict({"charset": "utf8mb4"}),
+        )
+    app.config.update(
+        SECRET_KEY=secrets.token_bytes(),
+        SQLALCHEMY_DATABASE_URI=url,
+        SQLALCHEMY_ECHO=conf.debug,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=conf.engine_options,
+        # number of rows fetched per round trip by the export cursors
+        EXPORT_YIELD_PER=1000,
+    )
+
+    # client address from X-Forwarded-For of the trusted proxies
+    if conf.proxy_count:
+
+        def proxy_fix(wsgi_app: Callable) -> Callable:
+            return ProxyFix(wsgi_app, x_for=conf.proxy_count)
+
+        deferred = app.extensions.get("deferred_init")
+        if deferred is not None:
+            deferred.wrap(proxy_fix)
+        else:
+            app.wsgi_app = proxy_fix(app.wsgi_app)  # type: ignore
+
+    dictConfig(
+        {
+            "version": 1,
+            "formatters": {
+                "default": {
+                    "format": "[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
+                }
+            },
+            "handlers": {
+                "wsgi": {
+                    "class": "logging.StreamHandler",
+                    "stream": "ext://flask.logging.wsgi_errors_stream",
+                    "formatter": "default",
+                }
+            },
+            "root": {"level": "INFO", "handlers": ["wsgi"]},
+        }
+    )
+
+    if conf.errors:
+
+        @app.route("/")
+        def index_internal_error():
+            return "Internal error."
+
+        return None
+
+    # init sqlalchemy
+    db.init_app(app)
+    with app.app_context():
+        PoolMetrics.register(db.engine)
+        if conf.db_backend == DbBackends.SQLITE:
+            sqlite_pragmas(db.engine)
+            # zero-service setup starts with an empty database
+            db.create_all()
+        models.AssignmentVersion.init()
 
     @app.route("/")
     def index() -> Union[Response, str]:
@@ -482,16 +509,22 @@ if not conf.errors:
         if "username" in session:
             return redirect("/")
         form: LoginForm = LoginForm()
-        if form.validate_on_submit():
-            if (
-                form.login.data
-                and form.passwd.data
-                and models.LmsUser.check_login(form.login.data, form.passwd.data)
-            ):
+        if form.validate_on_submit() and form.login.data and form.passwd.data:
+            key: str = login_throttle.key(form.login.data, request.remote_addr)
+            addr_key: str = address_throttle.key("", request.remote_addr)
+            if login_throttle.is_blocked(key) or address_throttle.is_blocked(addr_key):
+                flash("Zbyt wiele nieudanych prób logowania, spróbuj później.")
+                return render_template(
+                    "login.html", form=form, login="username" in session
+                )
+            if models.LmsUser.check_login(form.login.data, form.passwd.data):
+                login_throttle.success(key)
                 session["username"] = form.login.data
                 if conf.debug:
                     app.logger.info(f"{form.login.data} logged is successfully")
                 return redirect("/")
+            login_throttle.failure(key)
+            address_throttle.failure(addr_key)
         return render_template("login.html", form=form, login="username" in session)
 
     @app.route("/logout")
@@ -517,16 +550,24 @@ if not conf.errors:
                 print(f"node id: {nid}, router id: {rid}")
                 na: models.NodeAssignment = models.NodeAssignment.new(nid, rid)
                 db.session.add(na)
+                version: int = models.AssignmentVersion.bump()
                 db.session.commit()
+                models.AssignmentIndex.assign(int(nid), int(rid), version)
 
         if request.method == "POST" and "connections" in request.form:
             rid: Optional[str] = request.form.get("connections", default=None)
             print(f"to remove: {rid}")
-            if rid:
-                na_to_remove = models.NodeAssignment.remove(rid)
+            na_to_remove: Optional[models.NodeAssignment] = None
+            if rid and rid.isnumeric():
+                na_to_remove = models.NodeAssignment.remove(
+                    rid, nid if nid and nid.isnumeric() else None
+                )
             if na_to_remove:
+                pair: Tuple[int, int] = (na_to_remove.nid, na_to_remove.rid)
                 db.session.delete(na_to_remove)
+                version: int = models.AssignmentVersion.bump()
                 db.session.commit()
+                models.AssignmentIndex.release(*pair, version)
 
         # fill select lists
         node_form.nodes_load()
@@ -677,6 +718,7 @@ if not conf.errors:
 
         nodes_form: NodesSelectForm = NodesSelectForm()
         data_list: List[Tuple] = []
+        nid: Optional[str] = None
 
         if request.method == "POST":
             nid = request.form.get("nodes", default=None)
@@ -695,7 +737,7 @@ if not conf.errors:
                 )
                 if rows:
                     for item in rows:
-                        data_list.append((item.name, str(Address(item.ip))))
+                        data_list.append((item.name, int_to_str(item.ip)))
 
         nodes_form.nodes_load()
 
@@ -704,6 +746,7 @@ if not conf.errors:
             form=nodes_form,
             data=data_list,
             data_count=len(data_list),
+            nid=nid,
             login="username" in session,
         )
 
@@ -877,11 +920,151 @@ if not conf.errors:
             login="username" in session,
         )
 
-else:
+    def export_response(
+        name: str, columns: List[str], query: Any, ip_columns: Tuple[int, ...]
+    ) -> Response:
+        """Returns streamed response for export query.
+
+        ### Arguments:
+        - name [str] - base name of the exported file,
+        - columns [List[str]] - header of the exported table,
+        - query [Query] - column query for export,
+        - ip_columns [Tuple[int, ...]] - indexes of columns with IPv4 stored as int.
+        """
+        fmt: str = request.args.get("format", default=ExportFormat.CSV).lower()
+        compress: bool = request.args.get("gzip", default="0") in ("1", "true", "yes")
+        try:
+            exporter = StreamExport(columns, fmt, compress)
+        except ValueError:
+            abort(400)
+
+        def rows():
+            # server-side cursor, rows are fetched in batches
+            for row in query.execution_options(
+                yield_per=app.config["EXPORT_YIELD_PER"]
+            ):
+                row = list(row)
+                for idx in ip_columns:
+                    row[idx] = int_to_str(row[idx])
+                yield row
+
+        # compressed export is a .gz file, not a transfer encoding
+        headers = {
+            "Content-Disposition": f"attachment; filename={exporter.filename(name)}"
+        }
+        return Response(
+            stream_with_context(exporter.stream(rows())),
+            mimetype=exporter.mimetype,
+            headers=headers,
+        )
+
+    @app.route("/internal/pool", methods=["GET"])
+    def internal_pool() -> Response:
+        # disabled unless enabled in config, then for logged in users only
+        if not conf.pool_metrics:
+            abort(404)
+        if "username" not in session:
+            abort(403)
+        return jsonify(PoolMetrics.dump(db.engine.pool))
 
-    @app.route("/")
-    def index_internal_error():
-        return "Internal error."
+    @app.route("/export/customers", methods=["GET"])
+    def export_customers() -> Response:
+        if "username" not in session:
+            return redirect(url_for("login"))
+
+        nid: Optional[str] = request.args.get("nid", default=None)
+        if nid is not None and not nid.isnumeric():
+            abort(400)
+
+        query = (
+            db.session.query(
+                models.NodeAssignment.nid,
+                models.Customer.name,
+                models.Customer.ip,
+                models.Customer.last_update,
+            )
+            .select_from(models.Customer)
+            .join(
+                models.NodeAssignment,
+                models.NodeAssignment.rid == models.Customer.rid,
+            )
+            .order_by(models.NodeAssignment.nid, models.Customer.ip)
+        )
+        if nid is not None:
+            query = query.filter(models.NodeAssignment.nid == int(nid))
+
+        return export_response(
+            f"customers_{nid}" if nid else "customers",
+            ["nid", "name", "ip", "last_update"],
+            query,
+            (2,),
+        )
+
+    @app.route("/export/links", methods=["GET"])
+    def export_links() -> Response:
+        if "username" not in session:
+            return redirect(url_for("login"))
+
+        nid: Optional[str] = request.args.get("nid", default=None)
+        if nid is not None and not nid.isnumeric():
+            abort(400)
+
+        NA1 = aliased(models.NodeAssignment)
+        NA2 = aliased(models.NodeAssignment)
+        R1 = aliased(models.Router)
+        R2 = aliased(models.Router)
+        C1 = aliased(models.Connection)
+        C2 = aliased(models.Connection)
+        IF1 = aliased(models.Interface)
+        IF2 = aliased(models.Interface)
+        IFN1 = aliased(models.InterfaceName)
+        IFN2 = aliased(models.InterfaceName)
+
+        query = (
+            db.session.query(
+                NA1.nid,
+                NA2.nid,
+                R1.router_id,
+                IFN1.name,
+                R2.router_id,
+                IFN2.name,
+                C1.network,
+                C1.vlan_id,
+            )
+            .select_from(R1)
+            .join(NA1, NA1.rid == R1.id)
+            .join(C1, C1.rid == R1.id)
+            .join(IF1, IF1.cid == C1.id)
+            .join(IFN1, IFN1.id == IF1.if_id)
+            .join(C2, C1.network == C2.network)
+            .join(IF2, IF2.cid == C2.id)
+            .join(IFN2, IFN2.id == IF2.if_id)
+            .join(R2, C2.rid == R2.id)
+            .join(NA2, NA2.rid == R2.id)
+            .filter(C1.rid != C2.rid, NA1.nid != NA2.nid)
+            .order_by(NA1.nid, NA2.nid, C1.network)
+        )
+        if nid is not None:
+            query = query.filter(NA1.nid == int(nid))
+        else:
+            # every link only once
+            query = query.filter(NA1.nid < NA2.nid)
+
+        return export_response(
+            f"links_{nid}" if nid else "links",
+            [
+                "node1_id",
+                "node2_id",
+                "router1",
+                "interface1",
+                "router2",
+                "interface2",
+                "network",
+                "vlan_id",
+            ],
+            query,
+            (2, 4, 6),
+        )
 
 
 # #[EOF]#######################################################################
@@ -7,8 +7,15 @@
   Purpose: tools for project.
 """
 
+import time
+
 from inspect import currentframe
-from typing import Optional, Any
+from threading import Lock
+from typing import Optional, Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
 
 from jsktoolbox.attribtool import NoDynamicAttributes, ReadOnlyClass
 from jsktoolbox.configtool.main import Config as ConfigTool
@@ -18,16 +25,26 @@ from jsktoolbox.libs.base_data import BData
 from jsktoolbox.stringtool.crypto import SimpleCrypto
 from jsktoolbox.netaddresstool.ipv4 import Address
 
+from uke_pit2.db import DbBackends, sqlite_engine_options
+
 
 class _Keys(object, metaclass=ReadOnlyClass):
     """Keys definition container class."""
 
+    DB_BACKEND: str = "db_backend"
     DB_DATABASE: str = "db_database"
     DB_HOST: str = "db_host"
     DB_LOGIN: str = "db_user"
     DB_PASSWORD: str = "db_password"
+    DB_POOL_OVERFLOW: str = "db_pool_max_overflow"
+    DB_POOL_PRE_PING: str = "db_pool_pre_ping"
+    DB_POOL_RECYCLE: str = "db_pool_recycle"
+    DB_POOL_SIZE: str = "db_pool_size"
+    DB_POOL_TIMEOUT: str = "db_pool_timeout"
     DB_PORT: str = "db_port"
     DEBUG: str = "debug"
+    POOL_METRICS: str = "pool_metrics"
+    PROXY_COUNT: str = "proxy_count"
     SALT: str = "salt"
 
 
@@ -78,6 +95,105 @@ class _ModuleConfig(BData):
         )
 
 
+class PoolMetrics:
+    """Connection pool counters collected from the public pool events."""
+
+    __lock: Lock = Lock()
+    __data: Dict[str, float] = {
+        "checkins": 0,
+        "checkouts": 0,
+        "connects": 0,
+        "invalidated": 0,
+        "timeouts": 0,
+        "wait_total": 0.0,
+        "wait_max": 0.0,
+    }
+
+    @classmethod
+    def register(cls, engine: Engine) -> None:
+        """Registers pool event listeners of engine, once per engine.
+
+        The listeners are kept by the pool dispatcher, so they survive pool
+        recreation on 'engine.dispose()' and invalidation.
+        """
+        for name, listener in (
+            ("checkin", _on_checkin),
+            ("checkout", _on_checkout),
+            ("connect", _on_connect),
+            ("invalidate", _on_invalidate),
+        ):
+            if not event.contains(engine, name, listener):
+                event.listen(engine, name, listener)
+
+    @classmethod
+    def add_wait(cls, seconds: float, timeout: bool = False) -> None:
+        """Registers time spent waiting for a connection."""
+        with cls.__lock:
+            if timeout:
+                cls.__data["timeouts"] += 1
+            cls.__data["wait_total"] += seconds
+            if seconds > cls.__data["wait_max"]:
+                cls.__data["wait_max"] = seconds
+
+    @classmethod
+    def add(cls, name: str) -> None:
+        """Increments counter."""
+        with cls.__lock:
+            cls.__data[name] += 1
+
+    @classmethod
+    def dump(cls, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        """Returns metrics dict with the current pool state."""
+        with cls.__lock:
+            out: Dict[str, Any] = dict(cls.__data)
+        count: float = out["checkouts"] + out["timeouts"]
+        out["wait_avg"] = out["wait_total"] / count if count else 0.0
+        if isinstance(pool, QueuePool):
+            out["size"] = pool.size()
+            out["checked_in"] = pool.checkedin()
+            out["checked_out"] = pool.checkedout()
+            out["overflow"] = pool.overflow()
+        return out
+
+
+def _on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+    PoolMetrics.add("checkins")
+
+
+def _on_checkout(
+    dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+) -> None:
+    PoolMetrics.add("checkouts")
+
+
+def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+    PoolMetrics.add("connects")
+
+
+def _on_invalidate(
+    dbapi_connection: Any, connection_record: Any, exception: Any
+) -> None:
+    PoolMetrics.add("invalidated")
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool measuring the time of the public 'connect' call.
+
+    The time includes waiting for a free connection and opening a new one.
+    Counters come from the pool events registered by PoolMetrics.register.
+    """
+
+    def connect(self) -> Any:
+        start: float = time.perf_counter()
+        try:
+            out = QueuePool.connect(self)
+        except exc.TimeoutError:
+            PoolMetrics.add_wait(time.perf_counter() - start, timeout=True)
+            raise
+        PoolMetrics.add_wait(time.perf_counter() - start)
+        return out
+
+
 class WebConfig(NoDynamicAttributes):
     """docstring for WebConfig."""
 
@@ -113,6 +229,14 @@ class WebConfig(NoDynamicAttributes):
         if self.salt is None or not isinstance(self.salt, int):
             test = False
 
+        if self.db_backend not in (DbBackends.MYSQL, DbBackends.SQLITE):
+            test = False
+
+        # sqlite needs the database path only, ':memory:' must be set explicitly
+        if self.db_backend == DbBackends.SQLITE:
+            self.__errors = not test or not self.db_database
+            return None
+
         if self.db_host is None or not isinstance(self.db_host, Address):
             test = False
 
@@ -164,6 +288,13 @@ class WebConfig(NoDynamicAttributes):
             value=False,
             desc="[boolean] debug logging level.",
         )
+        # add db_backend variable
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_BACKEND,
+            value=DbBackends.MYSQL,
+            desc="[str] database backend: 'mysql' or 'sqlite'.",
+        )
         # add db_host variable
         self.__cf__.set(
             self.__main_section__,
@@ -182,7 +313,7 @@ class WebConfig(NoDynamicAttributes):
             self.__main_section__,
             varname=_Keys.DB_DATABASE,
             value="",
-            desc="[str] LMS database name.",
+            desc="[str] LMS database name, for sqlite: absolute file path or ':memory:'.",
         )
         # add db_login variable
         self.__cf__.set(
@@ -199,6 +330,52 @@ class WebConfig(NoDynamicAttributes):
             desc="[str] LMS database encrypted password.",
         )
 
+        # add connection pool variables
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_POOL_SIZE,
+            value=4,
+            desc="[int] connection pool size, should match gunicorn threads per worker.",
+        )
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_POOL_OVERFLOW,
+            value=2,
+            desc="[int] number of connections allowed above the pool size.",
+        )
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_POOL_RECYCLE,
+            value=1800,
+            desc="[int] connection lifetime in seconds, must be lower than mysql wait_timeout.",
+        )
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_POOL_TIMEOUT,
+            value=10,
+            desc="[int] seconds to wait for a free connection from the pool.",
+        )
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.DB_POOL_PRE_PING,
+            value=True,
+            desc="[boolean] test connections for liveness on checkout.",
+        )
+        # add pool_metrics variable
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.POOL_METRICS,
+            value=False,
+            desc="[boolean] expose pool metrics on /internal/pool to logged in users.",
+        )
+        # add proxy_count variable
+        self.__cf__.set(
+            self.__main_section__,
+            varname=_Keys.PROXY_COUNT,
+            value=0,
+            desc="[int] number of trusted reverse proxies setting X-Forwarded-For, 0: none.",
+        )
+
         test: bool = False
         try:
             test = self.save()
@@ -256,6 +433,15 @@ class WebConfig(NoDynamicAttributes):
             return salt
         return None
 
+    @property
+    def db_backend(self) -> str:
+        if self.__m_conf__ is None:
+            return DbBackends.MYSQL
+        tmp = self.__m_conf__._get(_Keys.DB_BACKEND)
+        if tmp and isinstance(tmp, str):
+            return tmp
+        return DbBackends.MYSQL
+
     @property
     def db_host(self) -> Optional[Address]:
         if self.__m_conf__ is None:
@@ -315,6 +501,76 @@ class WebConfig(NoDynamicAttributes):
             if not test:
                 print("Configuration update error.")
 
+    def __get_int(self, varname: str, default: int) -> int:
+        """Returns int variable or default value."""
+        if self.__m_conf__ is None:
+            return default
+        tmp = self.__m_conf__._get(varname)
+        if tmp is not None and isinstance(tmp, int) and not isinstance(tmp, bool):
+            return tmp
+        return default
+
+    @property
+    def db_pool_size(self) -> int:
+        return self.__get_int(_Keys.DB_POOL_SIZE, 4)
+
+    @property
+    def db_pool_max_overflow(self) -> int:
+        return self.__get_int(_Keys.DB_POOL_OVERFLOW, 2)
+
+    @property
+    def db_pool_recycle(self) -> int:
+        return self.__get_int(_Keys.DB_POOL_RECYCLE, 1800)
+
+    @property
+    def db_pool_timeout(self) -> int:
+        return self.__get_int(_Keys.DB_POOL_TIMEOUT, 10)
+
+    @property
+    def db_pool_pre_ping(self) -> bool:
+        if self.__m_conf__ is None:
+            return True
+        tmp = self.__m_conf__._get(_Keys.DB_POOL_PRE_PING)
+        if tmp is not None and isinstance(tmp, bool):
+            return tmp
+        return True
+
+    @property
+    def pool_metrics(self) -> bool:
+        if self.__m_conf__ is None:
+            return False
+        tmp = self.__m_conf__._get(_Keys.POOL_METRICS)
+        if tmp is not None and isinstance(tmp, bool):
+            return tmp
+        return False
+
+    @property
+    def proxy_count(self) -> int:
+        """Returns number of trusted reverse proxies in front of the service."""
+        return max(self.__get_int(_Keys.PROXY_COUNT, 0), 0)
+
+    @property
+    def engine_options(self) -> Dict[str, Any]:
+        """Returns SQLAlchemy engine options for the connection pool."""
+        if self.db_backend == DbBackends.SQLITE:
+            out: Dict[str, Any] = sqlite_engine_options(self.db_database or "")
+            if out["poolclass"] is QueuePool:
+                out.update(
+                    poolclass=MeteredQueuePool,
+                    pool_size=self.db_pool_size,
+                    max_overflow=self.db_pool_max_overflow,
+                    pool_timeout=self.db_pool_timeout,
+                )
+            return out
+        return {
+            "poolclass": MeteredQueuePool,
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_pool_max_overflow,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
+
     @property
     def errors(self) -> bool:
         return self.__errors
@@ -8,9 +8,11 @@
   Purpose: 
 """
 
-from web_service import routes
+from web_service import create_app
+
+app = create_app()
 
 if __name__ == "__main__":
-    routes.app.run()
+    app.run()
 
 # #[EOF]#######################################################################